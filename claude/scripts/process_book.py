@@ -8,19 +8,47 @@ into chunks and embeddings, creating the foundation for our RAG oracle.
 The Four Blocks: Anger, Anxiety, Depression, Guilt → The Four Immeasurables
 """
 
+import dataclasses
 import json
 import os
 import sys
-from typing import Any
+import time
+from typing import Any, Iterable, Iterator
 from pathlib import Path
 
-import pdfplumber
-from openai import OpenAI
 
-# 🌟 Initialize the cosmic API connection
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# 🎨 Borrow the shared embedding forge from the repo-level scripts/ folder
+SHARED_SCRIPTS = Path(__file__).resolve().parents[2] / "scripts"
+if str(SHARED_SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(SHARED_SCRIPTS))
+
+from rag_ingest import DEFAULT_CACHE_PATH, EmbeddingCache  # noqa: E402
+from rag_ingest.ann import build_ann_index, format_ann_report, remove_ann_index  # noqa: E402
+from rag_ingest.chunk_ids import assign_chunk_ids, load_chunk_ids, write_chunk_diff  # noqa: E402
+from rag_ingest.chunking import describe, make_chunker  # noqa: E402
+from rag_ingest.corpus import slugify  # noqa: E402
+from rag_ingest.classify import KeywordClassifier  # noqa: E402
+from rag_ingest.dedup import DEFAULT_DEDUP_LOG_DIR, DEFAULT_THRESHOLD, find_near_duplicates, write_dedup_log  # noqa: E402
+from rag_ingest.dimensions import api_dimensions, resolve_dimensions  # noqa: E402
+from rag_ingest.hedge import Hedger, HedgePolicy  # noqa: E402
+from rag_ingest.page_cache import DEFAULT_PAGE_CACHE_PATH, PageCache  # noqa: E402
+from rag_ingest.pdf_extract import PageText, iter_pages  # noqa: E402
+from rag_ingest.providers import (  # noqa: E402
+    DEFAULT_PROVIDER,
+    cache_path_for,
+    describe_provider,
+    make_provider,
+    offline_output_path,
+    shared_client,
+)
+from rag_ingest.store import remove_binary_store, write_binary_store  # noqa: E402
+from rag_ingest.telemetry import RunTelemetry  # noqa: E402
+from rag_ingest.tokens import count_tokens  # noqa: E402
+from rag_ingest.writer import atomic_replace, temp_path_for  # noqa: E402
 
 # 🎭 Constants for the ritual
+EMBEDDING_MODEL = "text-embedding-3-small"
+DEFAULT_CHUNKER = "word:size=1000,overlap=100,min_chars=50"  # 🧮 see rag_ingest/chunking.py
 BLOCKS = ["Anger", "Anxiety", "Depression", "Guilt"]
 CHAPTERS = {
     "Mental Contamination": "Mental Contamination",
@@ -36,125 +64,258 @@ CHAPTERS = {
     "Healthy Body, Healthy Mind": "Healthy Living",
     "Lessons From the 10 Ox-Herding Pictures": "Ox-Herding",
 }
+BLOCK_CLASSIFIER = KeywordClassifier([(block, [block]) for block in BLOCKS])  # 🎨 one scan per chunk
 
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """🌊 Extract the river of text from the sacred PDF scroll"""
+def extract_pages_from_pdf(
+    pdf_path: str,
+    workers: int | None = None,
+    page_cache_path: Path | None = None,
+) -> Iterator[PageText]:
+    """🌊 Stream the sacred PDF scroll page by page (page-parallel, page-cached)"""
     print("🌐 ✨ PDF EXTRACTION AWAKENS!")
     
-    with pdfplumber.open(pdf_path) as pdf:
-        full_text = ""
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                full_text += text + "\n"
+    page_cache = PageCache(page_cache_path) if page_cache_path else None
+    characters = 0
+    try:
+        for page in iter_pages(pdf_path, workers=workers, cache=page_cache):
+            characters += len(page.text)
+            yield page
+    finally:
+        if page_cache:
+            page_cache.close()
+            print(page_cache.summary())
     
-    print(f"💎 Extracted {len(full_text)} characters of wisdom")
-    return full_text
+    print(f"💎 Extracted {characters} characters of wisdom")
 
 
 def detect_block_type(chunk: str) -> str:
     """🎨 Detect which emotional block this chunk addresses"""
-    chunk_lower = chunk.lower()
-    for block in BLOCKS:
-        if block.lower() in chunk_lower:
-            return block
-    return "General"
+    return BLOCK_CLASSIFIER.classify(chunk)
 
 
-def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> list[dict[str, Any]]:
-    """✨ Transform flowing text into digestible wisdom nuggets"""
-    print(f"🎪 📦 CHUNKING RITUAL BEGINS! (size={chunk_size}, overlap={overlap})")
+def chunk_text(pages: Iterable[PageText], chunker: str = DEFAULT_CHUNKER) -> list[dict[str, Any]]:
+    """✨ Transform the streaming pages into digestible wisdom nuggets (with page citations)"""
+    strategy = make_chunker(chunker)
+    print(f"🎪 📦 CHUNKING RITUAL BEGINS! ({describe(strategy)})")
     
     chunks = []
-    tokens = text.split()
-    
-    for i in range(0, len(tokens), chunk_size - overlap):
-        chunk_tokens = tokens[i : i + chunk_size]
-        chunk_text = " ".join(chunk_tokens)
-        
-        if len(chunk_text.strip()) > 50:  # 🌙 Only keep meaningful chunks
-            chunks.append({
-                "text": chunk_text,
-                "start_idx": i,
-                "end_idx": i + len(chunk_tokens),
-                "block_type": detect_block_type(chunk_text)
-            })
+    # 🌙 Windows close as the pages stream past
+    for chunk in strategy.chunk(pages):
+        chunks.append({
+            "text": chunk.text,
+            "block_type": detect_block_type(chunk.text),
+            "provenance": chunk.provenance(),
+        })
     
     print(f"🎉 ✨ CHUNKING MASTERPIECE COMPLETE! {len(chunks)} wisdom nuggets created")
     return chunks
 
 
-def get_embedding(text: str) -> list[float]:
-    """🔮 Transform text into crystallized vector wisdom"""
-    response = client.embeddings.create(
-        input=text,
-        model="text-embedding-3-small"
-    )
+def remove_near_duplicates(chunks: list[dict[str, Any]], mode: str, threshold: float) -> list[dict[str, Any]]:
+    """👯 Drop near-duplicate chunks (`drop`) or mark them with their twin's position (`flag`)"""
+    if mode == "off":
+        return chunks
+    duplicates = find_near_duplicates([chunk["text"] for chunk in chunks], threshold)
+    log_path = DEFAULT_DEDUP_LOG_DIR / "process_book.duplicates.jsonl"
+    write_dedup_log(log_path, duplicates, [{"text": c["text"][:200], **c["provenance"]} for c in chunks])
+    print(f"👯 {'Flagged' if mode == 'flag' else 'Dropped'} {len(duplicates)} near-duplicate chunks "
+          f"(Jaccard >= {threshold}); log: {log_path}")
+    if mode == "flag":
+        for duplicate in duplicates:
+            chunks[duplicate.position]["duplicate_of"] = duplicate.duplicate_of
+        return chunks
+    dropped = {duplicate.position for duplicate in duplicates}
+    return [chunk for position, chunk in enumerate(chunks) if position not in dropped]
+
+
+def get_embedding(
+    text: str,
+    dimensions: int | None = None,
+    provider: str = DEFAULT_PROVIDER,
+    hedger: Hedger | None = None,
+) -> list[float]:
+    """🔮 Transform text into crystallized vector wisdom (the provider's client is built on first use;
+    with a `hedger`, a straggling request is sent again and the first answer wins)"""
+    extra = {"dimensions": dimensions} if dimensions else {}
+
+    def create() -> Any:
+        return shared_client(provider).embeddings.create(input=text, model=EMBEDDING_MODEL, **extra)
+
+    response = hedger.call(create) if hedger else create()
     return response.data[0].embedding
 
 
-def process_book(pdf_path: str, output_path: str) -> None:
-    """🌟 The Grand Orchestration - Process book into RAG foundation"""
+def process_book(
+    pdf_path: str,
+    output_path: str,
+    cache_path: Path | None = DEFAULT_CACHE_PATH,
+    binary: bool = False,
+    ann: bool = False,
+    dimensions: int | None = None,
+    extract_workers: int | None = None,
+    page_cache_path: Path | None = DEFAULT_PAGE_CACHE_PATH,
+    chunker: str = DEFAULT_CHUNKER,
+    dedup: str = "drop",
+    dedup_threshold: float = DEFAULT_THRESHOLD,
+    provider: str = DEFAULT_PROVIDER,
+    hedge: HedgePolicy | None = HedgePolicy(),
+) -> None:
+    """🌟 The Grand Orchestration - Process book into RAG foundation
+
+    Chunks already in the shared content-hash cache at `cache_path` skip the API.
+    With `binary`, a memory-mappable float32 store is written beside the JSON;
+    with `ann`, an IVF approximate-search index and its recall report too.
+    `dimensions` requests shortened embeddings from the model.
+    PDF pages are extracted by `extract_workers` processes (default: one per core);
+    pages already in the page cache at `page_cache_path` are not parsed again.
+    `chunker` is a strategy spec for `rag_ingest.chunking.make_chunker`.
+    Near-duplicate chunks (word-shingle Jaccard >= `dedup_threshold`) are
+    dropped before embedding, flagged, or kept, per `dedup` (drop/flag/off).
+    Run metrics (stage times, request latencies, tokens, cost) land beside the output.
+    Chunk ids are stable (`<pdf name>:p<pages>:<content hash>`), and the ids
+    added/removed/unchanged since the previous output go to `embeddings.diff.json`.
+    `provider` is a spec for `rag_ingest.providers.make_provider` (offline ones use their own cache).
+    A request outlasting the observed `hedge.quantile` latency is sent again, within
+    `hedge.budget` extra requests (`hedge=None` turns that off).
+    """
+    embedder = make_provider(provider)
+    cache_path = cache_path_for(embedder, cache_path)
+    telemetry = RunTelemetry("process_book", model=EMBEDDING_MODEL, config={
+        "chunker": chunker, "dimensions": dimensions, "dedup": dedup, "dedup_threshold": dedup_threshold,
+        "provider": describe_provider(embedder), "hedge": dataclasses.asdict(hedge) if hedge else None,
+    })
+    hedger = Hedger(hedge, stats=telemetry.requests) if hedge else None
     
     # 🌐 Step 1: Extract the sacred text
-    full_text = extract_text_from_pdf(pdf_path)
+    pages = telemetry.timed("extract", extract_pages_from_pdf(pdf_path, extract_workers, page_cache_path))
     
-    # 🎪 Step 2: Fragment into wisdom nuggets
-    chunks = chunk_text(full_text)
+    # 🎪 Step 2: Fragment into wisdom nuggets as the pages stream in
+    with telemetry.stage("chunk"):
+        chunks = chunk_text(pages, chunker)
+    chunked = len(chunks)
+    with telemetry.stage("dedup"):
+        chunks = remove_near_duplicates(chunks, dedup, dedup_threshold)
+    chunk_ids = assign_chunk_ids(slugify(Path(pdf_path).stem), (
+        (chunk["text"], chunk["provenance"]["start_page"], chunk["provenance"]["end_page"]) for chunk in chunks
+    ))
+    previous_ids = load_chunk_ids(output_path)
     
     # 💎 Step 3: Generate embeddings for the cosmic retrieval
     print("\n🌐 ✨ EMBEDDING GENERATION AWAKENS!")
     
     embedded_chunks = []
-    for idx, chunk in enumerate(chunks, 1):
-        print(f"🎪 📦 Batch {idx}/{len(chunks)} entering the cosmic ring!")
-        
-        embedding = get_embedding(chunk["text"])
-        
-        embedded_chunks.append({
-            "id": f"chunk_{idx}",
-            "text": chunk["text"],
-            "embedding": embedding,
-            "block_type": chunk["block_type"],
-            "metadata": {
-                "chunk_index": idx,
-                "token_count": len(chunk["text"].split()),
-                "block": chunk["block_type"]
-            }
-        })
+    width = resolve_dimensions(EMBEDDING_MODEL, dimensions)
+    cache = EmbeddingCache(cache_path, model=EMBEDDING_MODEL, dimensions=width) if cache_path else None
+    try:
+        for idx, chunk in enumerate(chunks, 1):
+            print(f"🎪 📦 Batch {idx}/{len(chunks)} entering the cosmic ring!")
+
+            with telemetry.stage("embed"):
+                embedding = cache.get(chunk["text"]) if cache else None
+            if embedding is None:
+                with telemetry.stage("embed"):
+                    started = time.perf_counter()
+                    embedding = get_embedding(chunk["text"], api_dimensions(EMBEDDING_MODEL, width), provider, hedger)
+                    telemetry.requests.record(time.perf_counter() - started, count_tokens(chunk["text"]), 1)
+                if cache:
+                    cache.put(chunk["text"], embedding)
+
+            embedded_chunks.append({
+                "id": chunk_ids[idx - 1],
+                "text": chunk["text"],
+                "embedding": embedding,
+                "block_type": chunk["block_type"],
+                "metadata": {
+                    "chunk_index": idx,
+                    "token_count": len(chunk["text"].split()),
+                    "block": chunk["block_type"],
+                    **chunk["provenance"],
+                    **({"duplicate_of": chunk_ids[chunk["duplicate_of"]]} if "duplicate_of" in chunk else {}),
+                }
+            })
+    finally:
+        if cache:
+            cache.close()
+            print(cache.summary())
     
     print(f"\n🎉 ✨ EMBEDDING MASTERPIECE COMPLETE!")
+    if hedger:
+        print(hedger.summary())
     
     # 📜 Step 4: Crystallize into JSON
     output_data = {
         "version": "1.0",
-        "model": "text-embedding-3-small",
+        "model": EMBEDDING_MODEL,
+        "dimensions": width,
         "total_chunks": len(embedded_chunks),
         "chunks": embedded_chunks,
         "metadata": {
             "source": "You Only Have Four Problems",
             "author": "Dr. Vincent E. Parr",
             "blocks": BLOCKS,
-            "description": "RAG foundation for Four Blocks Chat"
+            "description": "RAG foundation for Four Blocks Chat",
+            **({"embedding_provider": describe_provider(embedder)} if embedder.offline else {}),
         }
     }
     
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(output_data, f, indent=2)
+    with telemetry.stage("write"):
+        temp_path = temp_path_for(Path(output_path))  # 🔒 readers see the old file or the new one, never half
+        with open(temp_path, "w") as f:
+            json.dump(output_data, f, indent=2)
+        atomic_replace(temp_path, output_path)
+        if binary:
+            vectors_path = write_binary_store(output_data, output_path)[0]
+        else:
+            vectors_path = None
+            remove_binary_store(output_path)  # 🌙 an older store would describe the old JSON
+        write_chunk_diff(output_path, previous_ids, chunk_ids)
     
     print(f"\n💎 Wisdom crystallized at: {output_path}")
+    if vectors_path:
+        print(f"🗄️ Binary store crystallized at: {vectors_path}")
+    if ann:
+        with telemetry.stage("ann"):
+            print(format_ann_report(build_ann_index(output_path)))
+    else:
+        remove_ann_index(output_path)  # 🌙 an older index would describe the old vectors
     print(f"🌟 Total chunks: {len(embedded_chunks)}")
     print(f"🌊 Blocks covered: {set(chunk['block_type'] for chunk in embedded_chunks)}")
+    metrics = telemetry.write(output_path, chunks={
+        "chunked": chunked,
+        "written": len(embedded_chunks),
+        "embedded": telemetry.requests.inputs,
+        "reused": len(embedded_chunks) - telemetry.requests.inputs,
+    })
+    print(f"📈 Run metrics: {metrics}")
 
 
 if __name__ == "__main__":
     pdf_path = os.getenv("PDF_PATH", "../content/you-only-have-four-problems-book-text.pdf")
-    output_path = os.getenv("OUTPUT_PATH", "./data/embeddings.json")
+    provider = os.getenv("EMBEDDING_PROVIDER", DEFAULT_PROVIDER)  # 🔌 openai | local | stub[:...]
+    embedder = make_provider(provider)
+    output_path = os.getenv("OUTPUT_PATH") or str(  # 🌙 fake vectors stay out of ./data unless asked
+        offline_output_path(embedder, "./data/embeddings.json") if embedder.offline else "./data/embeddings.json")
+    cache_path = None if os.getenv("EMBEDDING_CACHE") == "0" else DEFAULT_CACHE_PATH
+    binary = os.getenv("EMBEDDINGS_BINARY") == "1"
+    ann = os.getenv("EMBEDDINGS_ANN") == "1"  # 🧭 IVF approximate-search index beside the JSON
+    dimensions = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None
+    extract_workers = int(os.getenv("PDF_EXTRACT_WORKERS", "0")) or None
+    page_cache_path = None if os.getenv("PAGE_CACHE") == "0" else DEFAULT_PAGE_CACHE_PATH
+    chunker = os.getenv("CHUNKER", DEFAULT_CHUNKER)
+    dedup = os.getenv("DEDUP", "drop")  # 👯 drop | flag | off
+    dedup_threshold = float(os.getenv("DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
+    hedge_budget = float(os.getenv("HEDGE_BUDGET", HedgePolicy.budget))  # 🏇 0 turns hedging off
+    hedge_quantile = float(os.getenv("HEDGE_QUANTILE", HedgePolicy.quantile))
     
     if not os.path.exists(pdf_path):
         print(f"💥 😭 PDF NOT FOUND: {pdf_path}")
         sys.exit(1)
     
-    process_book(pdf_path, output_path)
+    process_book(
+        pdf_path, output_path, cache_path=cache_path, binary=binary, ann=ann, dimensions=dimensions,
+        extract_workers=extract_workers, page_cache_path=page_cache_path, chunker=chunker,
+        dedup=dedup, dedup_threshold=dedup_threshold, provider=provider,
+        hedge=HedgePolicy(quantile=hedge_quantile, budget=hedge_budget) if hedge_budget > 0 else None,
+    )
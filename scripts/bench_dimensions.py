@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+📏 The Dimension Sweep - How Narrow Can the Crystals Get? ✨
+
+"Measure twice, truncate once."
+
+Sweeps shortened embedding widths over an existing full-width embeddings
+file and reports, per width: index size, single-query search latency and
+recall@k against exact full-width search. Shortened vectors are produced
+the same way the API does it - truncate, then renormalize.
+
+    python scripts/bench_dimensions.py
+    python scripts/bench_dimensions.py --input shared/data/embeddings.json --dims 256 512 768 1536 --k 10
+
+- The Cosmic Dimension Surveyor
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from rag_ingest.store import load_embedding_matrix
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_INPUT = PROJECT_ROOT / "shared" / "data" / "embeddings.json"
+DEFAULT_DIMS = [256, 512, 768, 1536]
+
+
+def shorten_matrix(matrix: np.ndarray, dimensions: int) -> np.ndarray:
+    """✂️ Truncate every row to `dimensions` and renormalize to unit length"""
+    head = np.ascontiguousarray(matrix[:, :dimensions], dtype=np.float32)
+    norms = np.linalg.norm(head, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return head / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """🏆 Indices of the k best scores per row (unordered)"""
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def sweep(matrix: np.ndarray, dims: list[int], k: int, probes: int, seed: int) -> list[dict]:
+    """🌊 Run the sweep - probes are sampled rows, each excluded from its own results"""
+    rng = np.random.default_rng(seed)
+    probe_rows = rng.choice(len(matrix), size=min(probes, len(matrix)), replace=False)
+    k = min(k, len(matrix) - 1)
+
+    def scores_for(index: np.ndarray) -> np.ndarray:
+        scores = index[probe_rows] @ index.T
+        scores[np.arange(len(probe_rows)), probe_rows] = -np.inf  # 🌙 a chunk doesn't count as its own neighbor
+        return scores
+
+    full = shorten_matrix(matrix, matrix.shape[1])
+    truth = top_k(scores_for(full), k)
+
+    results = []
+    for d in dims:
+        index = shorten_matrix(matrix, d)
+        approx = top_k(scores_for(index), k)
+        recall = np.mean([len(set(t) & set(a)) / k for t, a in zip(truth, approx)])
+
+        # ⏱️ Latency: one query at a time, the way the chat route searches
+        started = time.perf_counter()
+        for row in probe_rows:
+            top_k((index @ index[row])[None, :], k)
+        latency_ms = (time.perf_counter() - started) / len(probe_rows) * 1000
+
+        results.append({
+            "dimensions": d,
+            "index_bytes": int(index.nbytes),
+            "size_vs_full": round(index.nbytes / full.nbytes, 3),
+            "search_ms": round(latency_ms, 4),
+            f"recall@{k}": round(float(recall), 4),
+        })
+    return results
+
+
+def main() -> None:
+    """🚀 Parse knobs, run the sweep, print a table (and optionally save JSON)"""
+    parser = argparse.ArgumentParser(description="Sweep embedding widths: size, latency, recall@k")
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT, help="full-width embeddings.json")
+    parser.add_argument("--dims", type=int, nargs="+", default=DEFAULT_DIMS)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--probes", type=int, default=200, help="number of sampled probe chunks")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="write the results as JSON here")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"💥 😭 Embeddings not found: {args.input}")
+        sys.exit(1)
+
+    _, _, matrix = load_embedding_matrix(args.input)
+    dims = [d for d in args.dims if d <= matrix.shape[1]]
+    print(f"📏 Sweeping {dims} over {matrix.shape[0]:,} chunks × {matrix.shape[1]} dims")
+
+    results = sweep(np.asarray(matrix, dtype=np.float32), dims, args.k, args.probes, args.seed)
+    recall_key = next(key for key in results[0] if key.startswith("recall@"))
+    print(f"\n{'dims':>6} {'index':>12} {'size':>6} {'search ms':>10} {recall_key:>10}")
+    for r in results:
+        print(f"{r['dimensions']:>6} {r['index_bytes']:>12,} {r['size_vs_full']:>6.3f} "
+              f"{r['search_ms']:>10.4f} {r[recall_key]:>10.4f}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"input": str(args.input), "k": args.k, "results": results}, f, indent=2)
+        print(f"\n💎 Results crystallized at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,41 +11,51 @@ semantic embeddings for RAG retrieval across all My-4-Blocks variants.
 - The Cosmic Embedding Orchestrator
 """
 
+import argparse
+import dataclasses
 import json
 import os
 import sys
 from pathlib import Path
 from typing import Any
 
-from openai import OpenAI
 from dotenv import load_dotenv
 
+from rag_ingest import (
+    DEFAULT_BATCH_ITEMS,
+    DEFAULT_BATCH_TOKENS,
+    DEFAULT_CACHE_PATH,
+    DEFAULT_MAX_INPUT_TOKENS,
+    EmbeddingCache,
+    embed_items,
+)
+from rag_ingest.ann import build_ann_index, format_ann_report, remove_ann_index
+from rag_ingest.batching import API_MAX_INPUT_TOKENS
+from rag_ingest.dimensions import api_dimensions, resolve_dimensions
+from rag_ingest.hedge import HedgePolicy
+from rag_ingest.plan import format_plan, plan_embedding, write_plan
+from rag_ingest.providers import (
+    DEFAULT_PROVIDER,
+    PROVIDERS,
+    cache_path_for,
+    describe_provider,
+    make_provider,
+    offline_output_path,
+)
+from rag_ingest.store import remove_binary_store, write_binary_store
+from rag_ingest.telemetry import RunTelemetry
+from rag_ingest.tokens import get_tokenizer, split_by_tokens
+from rag_ingest.writer import atomic_replace, temp_path_for
+
 # 🌟 Load environment variables from .env file
 load_dotenv()
 
-# 🔮 Initialize the OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 # 🎭 Configuration constants
 EMBEDDING_MODEL = "text-embedding-3-small"
 INPUT_FILE = Path(__file__).parent.parent / "content" / "unified-knowledge-base.json"
 OUTPUT_FILE = Path(__file__).parent.parent / "shared" / "data" / "embeddings.json"
 
 
-def get_embedding(text: str) -> list[float]:
-    """
-    🌊 Transform text into crystallized vector wisdom
-
-    Takes the raw content and alchemizes it into a 1536-dimensional
-    vector that captures semantic meaning. ✨
-    """
-    response = client.embeddings.create(
-        input=text,
-        model=EMBEDDING_MODEL
-    )
-    return response.data[0].embedding
-
-
 def determine_block_type(chunk: dict[str, Any]) -> str:
     """
     🎨 Detect which emotional block this chunk addresses
@@ -67,63 +77,149 @@ def determine_block_type(chunk: dict[str, Any]) -> str:
     return chapter_to_block.get(chunk.get("chapter", ""), "General")
 
 
-def process_knowledge_base(input_path: Path, output_path: Path) -> None:
+def process_knowledge_base(
+    input_path: Path,
+    output_path: Path,
+    batch_items: int = DEFAULT_BATCH_ITEMS,
+    batch_tokens: int = DEFAULT_BATCH_TOKENS,
+    cache_path: Path | None = DEFAULT_CACHE_PATH,
+    binary: bool = False,
+    ann: bool = False,
+    dimensions: int | None = None,
+    max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
+    plan: bool = False,
+    provider: str = DEFAULT_PROVIDER,
+    hedge: HedgePolicy | None = HedgePolicy(),
+) -> dict[str, Any] | None:
     """
     🌟 The Grand Orchestration - Transform knowledge base into embeddings
 
     1. Load unified knowledge base
-    2. Generate embeddings for each chunk
+    2. Generate embeddings in packed batches (item + token limits per request),
+       serving unchanged chunks from the content-hash cache when `cache_path` is set;
+       `dimensions` asks the model for shortened vectors; content over
+       `max_input_tokens` is split into parts `<id>.1`, `<id>.2`, ...
     3. Preserve all metadata for retrieval
-    4. Crystallize into the sacred JSON format
+    4. Crystallize into the sacred JSON format (plus a float32 store when `binary`,
+       and an IVF approximate-search index with its recall report when `ann`)
+    5. Write run metrics (stage times, request latencies, tokens, cost) beside the output
+
+    With `plan`, stop after step 1 and the cache lookups: print (and save as
+    `embeddings.plan.json`, and return) the chunks, tokens, requests, cost
+    and duration step 2 would take, without calling the API.
+
+    `provider` is a spec for `rag_ingest.providers.make_provider`; the offline
+    ones (`local`, `stub`) need no API key and use their own embedding cache.
+    Requests outlasting the observed `hedge.quantile` latency are sent again
+    (within `hedge.budget` extra requests; `hedge=None` turns that off).
     """
     print("🌐 ✨ EMBEDDING GENERATION AWAKENS!")
     print(f"📖 Reading from: {input_path}")
+    embedder = make_provider(provider)
+    cache_path = cache_path_for(embedder, cache_path)
+    telemetry = RunTelemetry("generate_embeddings", model=EMBEDDING_MODEL, config={
+        "dimensions": dimensions, "batch_items": batch_items, "batch_tokens": batch_tokens,
+        "max_input_tokens": max_input_tokens, "provider": describe_provider(embedder),
+        "hedge": dataclasses.asdict(hedge) if hedge else None,
+    })
 
     # 🌊 Step 1: Load the knowledge base
-    with open(input_path, "r") as f:
+    with telemetry.stage("extract"), open(input_path, "r") as f:
         knowledge_base = json.load(f)
 
     chunks = knowledge_base.get("chunks", [])
     print(f"💎 Found {len(chunks)} wisdom chunks to process")
 
-    # 💎 Step 2: Generate embeddings for each chunk
-    embedded_chunks = []
-
-    for idx, chunk in enumerate(chunks, 1):
-        chunk_id = chunk.get("chunk", f"chunk_{idx}")
-        content = chunk.get("content", "")
-
-        if not content.strip():
-            print(f"🌙 ⚠️ Skipping empty chunk: {chunk_id}")
-            continue
-
-        print(f"🎪 📦 Batch {idx}/{len(chunks)} entering the cosmic ring! ({chunk_id})")
-
-        # 🔮 Generate the embedding
+    # 💎 Step 2: Generate embeddings in packed batches (one round-trip per batch)
+    to_embed = []
+    split_parts: dict[str, dict[str, Any]] = {}  # ✂️ part id -> link back to its chunk
+    tokenizer = get_tokenizer()
+    with telemetry.stage("chunk"):  # ✂️ only oversize content is re-cut
+        for idx, chunk in enumerate(chunks, 1):
+            chunk_id = chunk.get("chunk", f"chunk_{idx}")
+            content = chunk.get("content", "")
+
+            if not content.strip():
+                print(f"🌙 ⚠️ Skipping empty chunk: {chunk_id}")
+                continue
+
+            pieces = split_by_tokens(content, max_input_tokens, tokenizer)
+            if len(pieces) == 1:
+                to_embed.append((chunk_id, chunk, content))
+                continue
+            print(f"✂️ Splitting {chunk_id} into {len(pieces)} parts (over {max_input_tokens:,} tokens)")
+            for part, piece in enumerate(pieces, 1):
+                part_id = f"{chunk_id}.{part}"
+                split_parts[part_id] = {"parent_id": chunk_id, "part": part, "parts": len(pieces)}
+                to_embed.append((part_id, chunk, piece))
+
+    def report_failure(batch, error: Exception) -> None:
+        print(f"💥 😭 Failed to embed batch of {len(batch)} ({batch.ids[0]}…{batch.ids[-1]}): {error}")
+
+    width = resolve_dimensions(EMBEDDING_MODEL, dimensions)
+    cache = EmbeddingCache(cache_path, model=EMBEDDING_MODEL, dimensions=width) if cache_path else None
+    if plan:  # 🧭 Dry run: one request at a time, as embed_items sends them
         try:
-            embedding = get_embedding(content)
-        except Exception as e:
-            print(f"💥 😭 Failed to embed {chunk_id}: {e}")
-            continue
-
-        # 🎨 Create the embedded chunk with full metadata
-        embedded_chunk = {
-            "id": chunk_id,
-            "text": content,
-            "embedding": embedding,
-            "block_type": determine_block_type(chunk),
-            "metadata": {
-                "chapter": chunk.get("chapter", ""),
-                "section": chunk.get("section", ""),
-                "title": chunk.get("title", ""),
-                "tags": chunk.get("tags", []),
-                "keywords": chunk.get("keywords", []),
-                "related": chunk.get("related", []),
-                "audience": chunk.get("audience", "general"),
-                "category": chunk.get("category", ""),
+            report = plan_embedding(
+                [content for _, _, content in to_embed],
+                script="generate_embeddings",
+                model=EMBEDDING_MODEL,
+                cache=cache,
+                max_items=batch_items,
+                max_tokens=batch_tokens,
+            )
+        finally:
+            if cache is not None:
+                cache.close()
+        print(format_plan(report))
+        print(f"🧭 Plan saved to {write_plan(output_path, report)}")
+        return report
+
+    try:
+        with telemetry.stage("embed"):
+            vectors = embed_items(
+                embedder.client(),
+                ((chunk_id, content) for chunk_id, _, content in to_embed),
+                model=EMBEDDING_MODEL,
+                dimensions=api_dimensions(EMBEDDING_MODEL, width),
+                max_items=batch_items,
+                max_tokens=batch_tokens,
+                on_error=report_failure,
+                cache=cache,
+                stats=telemetry.requests,
+                hedge=hedge,
+            )
+    finally:
+        if cache is not None:
+            cache.close()
+            print(cache.summary())
+
+    embedded_chunks = []
+    with telemetry.stage("classify"):  # 🎨 labels + metadata for each embedded chunk
+        for chunk_id, chunk, content in to_embed:
+            embedding = vectors.get(chunk_id)
+            if embedding is None:
+                continue
+
+            # 🎨 Create the embedded chunk with full metadata
+            embedded_chunk = {
+                "id": chunk_id,
+                "text": content,
+                "embedding": embedding,
+                "block_type": determine_block_type(chunk),
+                "metadata": {
+                    "chapter": chunk.get("chapter", ""),
+                    "section": chunk.get("section", ""),
+                    "title": chunk.get("title", ""),
+                    "tags": chunk.get("tags", []),
+                    "keywords": chunk.get("keywords", []),
+                    "related": chunk.get("related", []),
+                    "audience": chunk.get("audience", "general"),
+                    "category": chunk.get("category", ""),
+                    **split_parts.get(chunk_id, {}),
+                }
             }
-        }
-        embedded_chunks.append(embedded_chunk)
+            embedded_chunks.append(embedded_chunk)
 
     print(f"\n🎉 ✨ EMBEDDING MASTERPIECE COMPLETE!")
     print(f"🌟 Total chunks embedded: {len(embedded_chunks)}")
@@ -132,7 +228,7 @@ def process_knowledge_base(input_path: Path, output_path: Path) -> None:
     output_data = {
         "version": "2.0",
         "model": EMBEDDING_MODEL,
-        "dimensions": 1536,
+        "dimensions": width,
         "total_chunks": len(embedded_chunks),
         "chapters": knowledge_base.get("chapters", []),
         "chunks": embedded_chunks,
@@ -141,16 +237,32 @@ def process_knowledge_base(input_path: Path, output_path: Path) -> None:
             "description": "Semantic embeddings for RAG retrieval",
             "blocks": ["Anger", "Anxiety", "Depression", "Guilt"],
             "additional_topics": ["Mental Contamination", "ABCs", "Three Insights", "Irrational Beliefs", "Happiness"],
+            **({"embedding_provider": describe_provider(embedder)} if embedder.offline else {}),
         }
     }
 
     # 🌟 Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, "w") as f:
-        json.dump(output_data, f, indent=2)
+    with telemetry.stage("write"):
+        temp_path = temp_path_for(output_path)  # 🔒 readers see the old file or the new one, never half
+        with open(temp_path, "w") as f:
+            json.dump(output_data, f, indent=2)
+        atomic_replace(temp_path, output_path)
+        if binary:
+            vectors_path = write_binary_store(output_data, output_path)[0]
+        else:
+            vectors_path = None
+            remove_binary_store(output_path)  # 🌙 an older store would describe the old JSON
 
     print(f"\n💎 Wisdom crystallized at: {output_path}")
+    if vectors_path:
+        print(f"🗄️ Binary store crystallized at: {vectors_path}")
+    if ann:
+        with telemetry.stage("ann"):
+            print(format_ann_report(build_ann_index(output_path)))
+    else:
+        remove_ann_index(output_path)  # 🌙 an older index would describe the old vectors
 
     # 📊 Print summary statistics
     block_counts = {}
@@ -162,6 +274,52 @@ def process_knowledge_base(input_path: Path, output_path: Path) -> None:
     for block, count in sorted(block_counts.items()):
         print(f"   🎭 {block}: {count} chunks")
 
+    # 📈 Step 4: Where the time and tokens went, beside the output and in the run history
+    metrics = telemetry.write(output_path, chunks={
+        "chunked": len(to_embed),
+        "written": len(embedded_chunks),
+        "embedded": telemetry.requests.inputs,
+        "reused": len(embedded_chunks) - telemetry.requests.inputs,
+        "failed": len(to_embed) - len(embedded_chunks),
+    })
+    print(f"📈 Run metrics: {metrics}")
+    return None
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """🎛️ Read the ritual's tuning knobs from the command line"""
+    parser = argparse.ArgumentParser(description="Embed the unified knowledge base for RAG retrieval")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_ITEMS,
+                        help=f"max chunks per embeddings request (default {DEFAULT_BATCH_ITEMS})")
+    parser.add_argument("--batch-tokens", type=int, default=DEFAULT_BATCH_TOKENS,
+                        help=f"max tokens per embeddings request (default {DEFAULT_BATCH_TOKENS})")
+    parser.add_argument("--max-input-tokens", type=int, default=DEFAULT_MAX_INPUT_TOKENS,
+                        help=f"split content longer than this many tokens into linked parts "
+                             f"(default {DEFAULT_MAX_INPUT_TOKENS}; the model accepts {API_MAX_INPUT_TOKENS})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore the content-hash embedding cache and re-embed everything")
+    parser.add_argument("--cache-path", type=Path, default=DEFAULT_CACHE_PATH,
+                        help=f"embedding cache location (default {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--dimensions", type=int, default=None,
+                        help="request shortened embeddings of this width (default: the model's native 1536)")
+    parser.add_argument("--binary", action="store_true",
+                        help="also write a memory-mappable float32 store beside embeddings.json")
+    parser.add_argument("--ann", action="store_true",
+                        help="also build an IVF approximate-search index and its recall-vs-latency report")
+    parser.add_argument("--plan", action="store_true",
+                        help="dry run: report the chunks, tokens, requests, cost and duration a real run would take "
+                             "(no API calls; only embeddings.plan.json is written)")
+    parser.add_argument("--provider", default=DEFAULT_PROVIDER,
+                        help=f"embedding provider spec, e.g. local or stub:latency=0.2 (providers: {', '.join(PROVIDERS)}; "
+                             f"default {DEFAULT_PROVIDER}, or EMBEDDING_PROVIDER). Offline providers write under .cache/offline/")
+    parser.add_argument("--hedge-budget", type=float, default=HedgePolicy.budget,
+                        help=f"max duplicate requests for stragglers, as a fraction of requests "
+                             f"(default {HedgePolicy.budget}; 0 turns hedging off)")
+    parser.add_argument("--hedge-quantile", type=float, default=HedgePolicy.quantile,
+                        help=f"hedge a request once it outlasts this quantile of observed latencies "
+                             f"(default {HedgePolicy.quantile})")
+    return parser.parse_args(argv)
+
 
 def main():
     """
@@ -169,8 +327,11 @@ def main():
 
     Validates environment and kicks off the embedding ritual.
     """
-    # 🔑 Check for API key
-    if not os.getenv("OPENAI_API_KEY"):
+    args = parse_args()
+
+    # 🔑 Check for API key (a plan never calls the API, nor does an offline provider)
+    embedder = make_provider(args.provider)
+    if not args.plan and not embedder.offline and not os.getenv("OPENAI_API_KEY"):
         print("💥 😭 OPENAI_API_KEY not found!")
         print("🌙 Please set it in your .env file or environment")
         sys.exit(1)
@@ -182,7 +343,22 @@ def main():
         sys.exit(1)
 
     # 🌟 Run the ritual
-    process_knowledge_base(INPUT_FILE, OUTPUT_FILE)
+    process_knowledge_base(
+        INPUT_FILE,
+        offline_output_path(embedder, OUTPUT_FILE) if embedder.offline else OUTPUT_FILE,  # 🌙 fake vectors stay out of shared/data
+        batch_items=args.batch_size,
+        batch_tokens=args.batch_tokens,
+        max_input_tokens=args.max_input_tokens,
+        cache_path=None if args.no_cache else args.cache_path,
+        binary=args.binary,
+        ann=args.ann,
+        dimensions=args.dimensions,
+        plan=args.plan,
+        provider=args.provider,
+        hedge=HedgePolicy(quantile=args.hedge_quantile, budget=args.hedge_budget) if args.hedge_budget > 0 else None,
+    )
+    if args.plan:
+        return
 
     print("\n✨ 🎊 EMBEDDING GENERATION RITUAL COMPLETE!")
     print("🔮 Your wisdom crystals are ready for RAG retrieval")
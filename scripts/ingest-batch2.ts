@@ -14,7 +14,7 @@
  * - The Mystical Batch-2 Ingestion Orchestrator
  */
 
-import { readFileSync, writeFileSync } from "fs";
+import { closeSync, fsyncSync, openSync, readFileSync, renameSync, writeFileSync } from "fs";
 import { join } from "path";
 import OpenAI from "openai";
 import * as dotenv from "dotenv";
@@ -393,8 +393,17 @@ async function main(): Promise<void> {
   database.version = "3.1";
 
   // 💎 Save the crystallized wisdom
+  // 🔒 Temp file, fsync, rename: readers (and published variant copies) never see a half-written file
   console.log(`\n💎 Crystallizing wisdom to: ${EMBEDDINGS_FILE}`);
-  writeFileSync(EMBEDDINGS_FILE, JSON.stringify(database, null, 2));
+  const tempFile = `${EMBEDDINGS_FILE}.${process.pid}.tmp`;
+  const fd = openSync(tempFile, "w");
+  try {
+    writeFileSync(fd, JSON.stringify(database, null, 2));
+    fsyncSync(fd);
+  } finally {
+    closeSync(fd);
+  }
+  renameSync(tempFile, EMBEDDINGS_FILE);
 
   // 📊 Final summary
   console.log("\n" + "━".repeat(60));
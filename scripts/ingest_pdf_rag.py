@@ -5,23 +5,75 @@
 "Where the sacred scroll meets intelligent chunking,
 and every page becomes retrievable gold."
 
-Uses Chonkie for intelligent semantic chunking, then OpenAI embeddings.
+Streams pages into Chonkie-style chunks (each citing its pages), then OpenAI embeddings.
 Outputs to shared/data/embeddings.json for all variants (claude, gemini, v0).
+With --corpus, many documents are ingested in parallel into per-document shards
+and merged into that same index.
 
 - The Cosmic Chonkie Alchemist
 """
 
-import json
+import argparse
+import asyncio
+import dataclasses
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, Sequence
 
-import pdfplumber
-from chonkie.chunker import token
-from openai import OpenAI
 from dotenv import load_dotenv
 
+from rag_ingest import DEFAULT_CACHE_PATH, DEFAULT_MAX_INPUT_TOKENS, EmbeddingCache
+from rag_ingest.ann import ann_paths, build_ann_index, format_ann_report, remove_ann_index
+from rag_ingest.batching import API_MAX_INPUT_TOKENS
+from rag_ingest.checkpoint import DEFAULT_CHECKPOINT_DIR, CheckpointJournal
+from rag_ingest.chunking import STRATEGIES, Chunker, describe, make_chunker
+from rag_ingest.chunk_ids import assign_chunk_ids, load_chunk_ids, write_chunk_diff
+from rag_ingest.classify import KeywordClassifier
+from rag_ingest.corpus import (
+    DEFAULT_SHARD_DIR,
+    discover_documents,
+    iter_document_pages,
+    merge_shards,
+    shard_path,
+    slugify,
+)
+from rag_ingest.dedup import (
+    DEDUP_MODES,
+    DEFAULT_DEDUP_LOG_DIR,
+    DEFAULT_THRESHOLD,
+    find_near_duplicates,
+    write_dedup_log,
+)
+from rag_ingest.dimensions import api_dimensions, resolve_dimensions
+from rag_ingest.hedge import HedgePolicy
+from rag_ingest.page_cache import DEFAULT_PAGE_CACHE_PATH, PageCache
+from rag_ingest.page_chunks import PageChunk
+from rag_ingest.pdf_extract import PageText, default_workers
+from rag_ingest.plan import combine_plans, format_plan, plan_embedding, write_plan
+from rag_ingest.providers import (
+    DEFAULT_PROVIDER,
+    PROVIDERS,
+    cache_path_for,
+    describe_provider,
+    make_provider,
+    offline_output_path,
+)
+from rag_ingest.publish import format_published, publish
+from rag_ingest.quantize import export_paths, write_quantized_exports
+from rag_ingest.store import BinaryStoreWriter, load_binary_store, remove_binary_store, store_paths
+from rag_ingest.telemetry import RunTelemetry
+from rag_ingest.tokens import get_tokenizer, split_by_tokens
+from rag_ingest.work_queue import DEFAULT_LEASE_SECONDS, DEFAULT_QUEUE_PATH, DEFAULT_QUEUE_WORKERS, embed_via_queue
+from rag_ingest.writer import ReorderBuffer, StreamingEmbeddingsWriter
+from rag_ingest.async_embed import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_TOKENS_PER_MINUTE,
+    embed_texts_async,
+)
+
 load_dotenv()
 
 # 🌟 Paths - run from project root
@@ -36,6 +88,13 @@ VARIANT_PATHS = [
     PROJECT_ROOT / "v0" / "shared" / "data" / "embeddings.json",
 ]
 
+# 🧮 Chunking - Chonkie-style 500-char windows sharing 100 chars, trivial ones (<= 80 chars) dropped
+DEFAULT_CHUNKER = "char:size=500,overlap=100,min_chars=80"
+
+# 🎪 Embedding request shape - small batches so several can be in flight at once
+EMBEDDING_MODEL = "text-embedding-3-small"
+DEFAULT_BATCH_SIZE = 32
+
 # 🎭 Block detection + chapter mapping
 BLOCKS = ["Anger", "Anxiety", "Depression", "Guilt"]
 CHAPTER_KEYWORDS = {
@@ -51,174 +110,956 @@ CHAPTER_KEYWORDS = {
     "Zen Meditation": ["zen", "meditation", "mindfulness", "ox-herding"],
     "Healthy Living": ["healthy body", "healthy mind", "body", "mind"],
 }
+# 🎨 Four Blocks first, then chapter themes - compiled once, one scan per chunk
+BLOCK_CLASSIFIER = KeywordClassifier([*((block, [block]) for block in BLOCKS), *CHAPTER_KEYWORDS.items()])
+
+# 🧭 Probe questions for the quantization recall report - real user-style queries
+PROBE_QUERIES = [
+    "Why do I get so angry when people don't do what I expect?",
+    "How can I stop worrying about things that might go wrong?",
+    "I feel worthless and nothing seems to matter anymore",
+    "I can't forgive myself for what I did",
+    "What are the ABCs of how emotions are created?",
+    "What is mental contamination?",
+    "What are the seven irrational beliefs?",
+    "What is the formula for happiness?",
+    "How does Zen meditation help train the mind?",
+    "What are the three insights to a mind of peace?",
+    "Is it wrong to believe people should treat me fairly?",
+    "How do I calm down before a stressful meeting?",
+]
 
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
-    """🌊 Extract the river of text from the sacred PDF scroll"""
+def extract_pages_from_pdf(
+    pdf_path: Path,
+    workers: int | None = None,
+    page_cache_path: Path | None = None,
+) -> Iterator[PageText]:
+    """🌊 Stream the sacred PDF scroll page by page (page-parallel, page-cached; text files are one page)"""
     print("🌐 ✨ PDF EXTRACTION AWAKENS!")
-    print(f"📖 Reading: {pdf_path}")
+    print(f"📖 Reading: {pdf_path} ({workers or default_workers()} workers)")
 
-    with pdfplumber.open(pdf_path) as pdf:
-        full_text = ""
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                full_text += text + "\n"
+    page_cache = PageCache(page_cache_path) if page_cache_path else None
+    pages = characters = 0
+    try:
+        for page in iter_document_pages(pdf_path, workers=workers, cache=page_cache):
+            pages += 1
+            characters += len(page.text)
+            yield page
+    finally:
+        if page_cache:
+            page_cache.close()
+            print(page_cache.summary())
 
-    print(f"💎 Extracted {len(full_text):,} characters of wisdom")
-    return full_text
+    print(f"💎 Extracted {characters:,} characters of wisdom from {pages} pages")
 
 
-def chunk_with_chonkie(text: str) -> list[str]:
-    """✨ Chonkie chunking - intelligent token-based boundaries"""
-    print("🧮 ✨ CHONKIE CHUNKING RITUAL BEGINS! (size=500, overlap=100)")
+def chunk_pages(pages: Iterable[PageText], chunker: Chunker) -> list[PageChunk]:
+    """✨ Chunk the streaming pages with the chosen strategy - every nugget cites its pages"""
+    print(f"🧮 ✨ CHUNKING RITUAL BEGINS! ({describe(chunker)})")
 
-    chunker = token.TokenChunker(
-        chunk_size=500,
-        chunk_overlap=100,
-    )
-    chunks = chunker.chunk(text)
+    chunks = list(chunker.chunk(pages))
 
-    # Filter trivial chunks (Chonkie returns Chunk objects with .text)
-    meaningful = [
-        (c.text if hasattr(c, "text") else str(c)).strip()
-        for c in chunks
-        if len((c.text if hasattr(c, "text") else str(c)).strip()) > 80
-    ]
-    print(f"🎉 ✨ CHONKIE MASTERPIECE COMPLETE! {len(meaningful)} wisdom nuggets created")
-    return meaningful
+    print(f"🎉 ✨ CHUNKING MASTERPIECE COMPLETE! {len(chunks)} wisdom nuggets created")
+    return chunks
 
 
-def detect_block_type(chunk_text: str) -> str:
-    """🎨 Detect which emotional block this chunk addresses"""
-    chunk_lower = chunk_text.lower()
+def remove_near_duplicates(
+    page_chunks: list[PageChunk],
+    mode: str,
+    threshold: float,
+    log_path: Path,
+) -> tuple[list[PageChunk], dict[int, int]]:
+    """👯 Find near-duplicate chunks; drop them (`drop`) or map them to their twin (`flag`)"""
+    if mode == "off":
+        return page_chunks, {}
+    duplicates = find_near_duplicates([chunk.text for chunk in page_chunks], threshold)
+    records = [{"text": chunk.text[:200], **chunk.provenance()} for chunk in page_chunks]
+    write_dedup_log(log_path, duplicates, records)
+    verb = "Dropped" if mode == "drop" else "Flagged"
+    print(f"👯 {verb} {len(duplicates)} near-duplicate chunks (Jaccard >= {threshold}); log: {log_path}")
+    if mode == "flag":
+        return page_chunks, {d.position: d.duplicate_of for d in duplicates}
+    dropped = {d.position for d in duplicates}
+    return [chunk for position, chunk in enumerate(page_chunks) if position not in dropped], {}
 
-    # First check Four Blocks
-    for block in BLOCKS:
-        if block.lower() in chunk_lower:
-            return block
 
-    # Then check chapter themes
-    for chapter, keywords in CHAPTER_KEYWORDS.items():
-        if any(kw in chunk_lower for kw in keywords):
-            return chapter
+def split_oversize_chunks(
+    page_chunks: list[PageChunk],
+    max_tokens: int,
+) -> tuple[list[PageChunk], list[tuple[int, int, int]]]:
+    """
+    ✂️ Split chunks over `max_tokens` into consecutive parts instead of truncating them
 
-    return "General"
+    Returns the parts in order, plus each one's origin: (chunk index, part, parts),
+    with part 0 of 1 for chunks that fit. Parts keep their chunk's page citation.
+    """
+    parts: list[PageChunk] = []
+    origins: list[tuple[int, int, int]] = []
+    tokenizer = get_tokenizer()
+    for index, chunk in enumerate(page_chunks):
+        pieces = split_by_tokens(chunk.text, max_tokens, tokenizer)
+        parts.extend(dataclasses.replace(chunk, text=piece) if len(pieces) > 1 else chunk for piece in pieces)
+        origins.extend((index, part, len(pieces)) for part in range(len(pieces)))
+    split = sum(1 for _, part, parts_count in origins if part == 0 and parts_count > 1)
+    if split:
+        print(f"✂️ Split {split} chunks over {max_tokens:,} tokens into {len(parts) - len(page_chunks) + split} parts")
+    return parts, origins
 
 
-def get_embedding(client: OpenAI, text: str) -> list[float]:
-    """🔮 Transform text into crystallized vector wisdom"""
-    response = client.embeddings.create(
-        input=text[:8000],  # Truncate if too long
-        model="text-embedding-3-small",
-    )
-    return response.data[0].embedding
+def part_ids(parent_ids: list[str], origins: list[tuple[int, int, int]]) -> list[str]:
+    """🏷️ Each part's id: its chunk's stable id, or `<id>.P` for part P of a split chunk"""
+    return [parent_ids[index] if parts == 1 else f"{parent_ids[index]}.{part + 1}" for index, part, parts in origins]
+
+
+def detect_block_type(chunk_text: str) -> str:
+    """🎨 Detect which emotional block this chunk addresses (first Four Blocks, then chapter themes)"""
+    return BLOCK_CLASSIFIER.classify(chunk_text)
 
 
-def create_chunk_metadata(chunk_text: str, block_type: str, idx: int) -> dict[str, Any]:
-    """📄 Create metadata matching shared/lib types.ts"""
+def embed_probe_queries(
+    client: Any,
+    cache_path: Path | None,
+    dimensions: int | None = None,
+) -> list[list[float]]:
+    """🧭 Embed PROBE_QUERIES (through the cache) for the quantization recall report"""
+    width = resolve_dimensions(EMBEDDING_MODEL, dimensions)
+    cache = EmbeddingCache(cache_path, model=EMBEDDING_MODEL, dimensions=width) if cache_path else None
+    try:
+        vectors = [cache.get(q) if cache else None for q in PROBE_QUERIES]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            fresh = asyncio.run(embed_texts_async(
+                client,
+                [PROBE_QUERIES[i] for i in missing],
+                model=EMBEDDING_MODEL,
+                dimensions=api_dimensions(EMBEDDING_MODEL, width),
+            ))
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+                if cache:
+                    cache.put(PROBE_QUERIES[i], vector)
+    finally:
+        if cache:
+            cache.close()
+    return vectors
+
+
+def create_chunk_metadata(chunk: PageChunk, block_type: str, idx: int) -> dict[str, Any]:
+    """📄 Create metadata matching shared/lib types.ts (plus the chunk's page citation)"""
+    chunk_text = chunk.text
     title = chunk_text[:60].rstrip() + "..." if len(chunk_text) > 60 else chunk_text
     return {
         "chapter": block_type,
-        "section": "",
+        "section": chunk.section,
         "title": title,
         "tags": [],
         "keywords": [],
         "related": [],
         "audience": "general",
         "category": block_type.lower().replace(" ", "_"),
+        **chunk.provenance(),  # 📍 page citation for free
     }
 
 
-def process_pdf_to_embeddings() -> None:
-    """🌟 The Grand Orchestration - PDF → Chonkie → Embeddings → shared"""
+@dataclasses.dataclass(frozen=True)
+class EmbedOptions:
+    """🎼 How the chunks that miss the cache get embedded - the async stage's budgets, or the work queue
+
+    Requests that outlast the observed `hedge.quantile` latency are sent again
+    and the first answer wins, within `hedge.budget` extra requests
+    (`hedge=None` turns hedging off).
+
+    With a `queue_path`, the chunks go into the durable work queue there
+    (`rag_ingest.work_queue`) instead of the async stage: `queue_workers`
+    local workers are started, workers on other machines may join, and a job
+    whose worker holds it past `lease_seconds` is re-issued.
+    """
+    concurrency: int = DEFAULT_CONCURRENCY
+    requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE
+    tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE
+    batch_size: int = DEFAULT_BATCH_SIZE
+    hedge: HedgePolicy | None = HedgePolicy()
+    queue_path: Path | None = None
+    queue_workers: int = DEFAULT_QUEUE_WORKERS
+    lease_seconds: float = DEFAULT_LEASE_SECONDS
+
+    def share(self, runs: int) -> "EmbedOptions":
+        """🍰 One of `runs` equal shares, so runs at once stay within the budgets together"""
+        return dataclasses.replace(
+            self,
+            concurrency=max(1, self.concurrency // runs),
+            requests_per_minute=self.requests_per_minute / runs,
+            tokens_per_minute=self.tokens_per_minute / runs,
+            queue_workers=self.queue_workers and max(1, self.queue_workers // runs),
+        )
+
+
+@dataclasses.dataclass
+class PreparedChunks:
+    """✂️ A document's chunks, ready to embed: deduplicated, split to fit, each with its stable id
+
+    `origins[i]` is (chunk index, part, parts) of `page_chunks[i]`, `parent_ids`
+    are the ids of the chunks before splitting, and `duplicate_of` maps a
+    flagged chunk's index to its twin's. `chunked` counts the chunks before dedup.
+    """
+    page_chunks: list[PageChunk]
+    origins: list[tuple[int, int, int]]
+    parent_ids: list[str]
+    ids: list[str]
+    duplicate_of: dict[int, int]
+    chunked: int
+
+    @property
+    def texts(self) -> list[str]:
+        return [chunk.text for chunk in self.page_chunks]
+
+    def record(self, position: int, embedding: list[float], block_type: str) -> dict[str, Any]:
+        """🎨 The embeddings.json chunk for `position`, with its part and duplicate links"""
+        page_chunk = self.page_chunks[position]
+        chunk = {
+            "id": self.ids[position],
+            "text": page_chunk.text,
+            "embedding": embedding,
+            "block_type": block_type,
+            "metadata": create_chunk_metadata(page_chunk, block_type, position + 1),
+        }
+        index, part, parts = self.origins[position]
+        if parts > 1:  # ✂️ one part of a chunk too long to embed whole
+            chunk["metadata"].update(parent_id=self.parent_ids[index], part=part + 1, parts=parts)
+        if index in self.duplicate_of:
+            chunk["metadata"]["duplicate_of"] = self.parent_ids[self.duplicate_of[index]]
+        return chunk
+
+
+def prepare_chunks(
+    pdf_path: Path,
+    doc_id: str | None,
+    telemetry: RunTelemetry,
+    *,
+    extract_workers: int | None,
+    page_cache_path: Path | None,
+    chunker: str,
+    dedup: str,
+    dedup_threshold: float,
+    dedup_log_path: Path,
+    max_input_tokens: int,
+) -> PreparedChunks:
+    """🌐 Extract → chunk → dedup → stable ids → split oversize chunks (exits when no text comes out)"""
+    # 🌐 Pages stream straight into the chunker - no full-text copy
+    pages = telemetry.timed("extract", extract_pages_from_pdf(pdf_path, extract_workers, page_cache_path))
+    with telemetry.stage("chunk"):
+        page_chunks = chunk_pages(pages, make_chunker(chunker))
+    if not page_chunks:
+        print("💥 😭 No text extracted from PDF!")
+        sys.exit(1)
+    chunked = len(page_chunks)
+    with telemetry.stage("dedup"):
+        page_chunks, duplicate_of = remove_near_duplicates(page_chunks, dedup, dedup_threshold, dedup_log_path)
+    parent_ids = assign_chunk_ids(
+        doc_id or slugify(pdf_path.stem),
+        ((chunk.text, chunk.start_page, chunk.end_page) for chunk in page_chunks),
+    )
+    with telemetry.stage("chunk"):
+        page_chunks, origins = split_oversize_chunks(page_chunks, max_input_tokens)
+    return PreparedChunks(page_chunks, origins, parent_ids, part_ids(parent_ids, origins), duplicate_of, chunked)
+
+
+def embed_missing(
+    embedder: Any,
+    texts: Sequence[str],
+    width: int,
+    embedding: EmbedOptions,
+    stats: Any,
+    on_result: Callable[[int, list[float]], None],
+) -> None:
+    """💎 Embed `texts` through the work queue or the async stage; `on_result(position, vector)` as each lands"""
+    if embedding.queue_path:
+        print(f"🗂️ Queueing {len(texts)} chunks at {embedding.queue_path} ({embedding.queue_workers} local workers)")
+        embed_via_queue(
+            texts,
+            config={"model": EMBEDDING_MODEL, "dimensions": api_dimensions(EMBEDDING_MODEL, width),
+                    "provider": describe_provider(embedder)},
+            path=embedding.queue_path,
+            workers=embedding.queue_workers,
+            lease_seconds=embedding.lease_seconds,
+            max_items=embedding.batch_size,
+            stats=stats,
+            on_result=on_result,
+        )
+    else:
+        print(f"⚡ Embedding {len(texts)} chunks ({embedding.concurrency} in flight, "
+              f"{embedding.requests_per_minute:,.0f} req/min, {embedding.tokens_per_minute:,.0f} tok/min)")
+        asyncio.run(embed_texts_async(
+            # 🌙 Retries are handled by the async stage so Retry-After is honored exactly once
+            embedder.async_client(max_retries=0),
+            texts,
+            model=EMBEDDING_MODEL,
+            dimensions=api_dimensions(EMBEDDING_MODEL, width),
+            concurrency=embedding.concurrency,
+            requests_per_minute=embedding.requests_per_minute,
+            tokens_per_minute=embedding.tokens_per_minute,
+            max_items=embedding.batch_size,
+            stats=stats,
+            on_result=on_result,
+            hedge=embedding.hedge,
+        ))
+    print(f"🎼 {stats.requests} requests, {stats.retries} retries ({stats.throttled} throttled), "
+          f"{stats.hedged} hedged ({stats.hedge_wins} answered first)")
+
+
+class DocumentWriter:
+    """
+    📜 Streams a document's chunks, in order, into embeddings.json (and the binary store)
+
+    `write` classifies each chunk and tees it to every destination; `close`
+    seals them (removing a store an earlier run left, when there is none to
+    write now), and `abort` leaves the previous outputs as they were.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        prepared: PreparedChunks,
+        width: int,
+        telemetry: RunTelemetry,
+        *,
+        binary: bool,
+        doc_id: str | None,
+        source: str,
+    ) -> None:
+        self.output_path = output_path
+        self.prepared = prepared
+        self.telemetry = telemetry
+        self.provenance = {"doc_id": doc_id, "source": source} if doc_id else {}
+        self.block_counts: dict[str, int] = {}
+        self.header = {"version": "3.0", "model": EMBEDDING_MODEL, "dimensions": width}
+        self.json_writer = StreamingEmbeddingsWriter([output_path], self.header)
+        self.binary_writer = BinaryStoreWriter(output_path, len(prepared.ids), width) if binary else None
+
+    @property
+    def count(self) -> int:
+        return self.json_writer.count
+
+    def write(self, position: int, embedding: list[float]) -> None:
+        """💎 Classify the chunk at `position` and append it everywhere"""
+        with self.telemetry.stage("classify"):
+            block_type = detect_block_type(self.prepared.page_chunks[position].text)
+        self.block_counts[block_type] = self.block_counts.get(block_type, 0) + 1
+        chunk = self.prepared.record(position, embedding, block_type)
+        chunk["metadata"].update(self.provenance)
+        with self.telemetry.stage("write"):
+            self.json_writer.write_chunk(chunk)
+            if self.binary_writer:
+                self.binary_writer.write_chunk(chunk)
+
+    def close(self, metadata: dict[str, Any]) -> None:
+        """📜 Seal the JSON (summary keys follow the streamed chunks), then the store tied to it"""
+        footer = {
+            "total_chunks": self.count,
+            "chapters": [  # 📊 chapter summary from the block distribution
+                {"code": k[:3].upper() if len(k) >= 3 else k, "name": k, "count": v}
+                for k, v in sorted(self.block_counts.items())
+            ],
+            "metadata": metadata,
+        }
+        with self.telemetry.stage("write"):
+            self.json_writer.close(footer)
+            if self.binary_writer:
+                self.binary_writer.close({**self.header, **footer}, json_sha256=self.json_writer.sha256)
+            else:
+                remove_binary_store(self.output_path)  # 🌙 an older store would describe the old JSON
+
+    def abort(self) -> None:
+        """🌙 Nothing half-written ever replaces a good file"""
+        self.json_writer.abort()
+        if self.binary_writer:
+            self.binary_writer.abort()
+
+
+def finish_outputs(
+    output_path: Path,
+    variant_paths: Sequence[Path],
+    telemetry: RunTelemetry,
+    *,
+    embedder: Any,
+    cache_path: Path | None,
+    width: int,
+    binary: bool,
+    quantize: bool,
+    ann: bool,
+    previous_ids: Sequence[str] | None,
+    chunk_ids: Sequence[str],
+) -> None:
+    """🏁 Post-process a finished output (quantized exports, IVF index), publish it, and save the chunk-id diff"""
+    if quantize:
+        with telemetry.stage("quantize"):
+            write_quantization_report(embedder.async_client(max_retries=0), output_path, cache_path, width)
+    if ann:
+        with telemetry.stage("ann"):
+            print(format_ann_report(build_ann_index(output_path)))
+    else:
+        remove_ann_index(output_path)  # 🌙 an older index would describe the old vectors
+
+    # 📋 Publish the finished files to the variant folders (unchanged ones are skipped)
+    with telemetry.stage("write"):
+        publish_to_variants(output_path, variant_paths, binary=binary, quantize=quantize, ann=ann)
+        write_chunk_diff(output_path, previous_ids, chunk_ids)
+
+
+def process_pdf_to_embeddings(
+    pdf_path: Path = PDF_PATH,
+    output_path: Path = OUTPUT_PATH,
+    variant_paths: Sequence[Path] = VARIANT_PATHS,
+    *,
+    doc_id: str | None = None,
+    cache_path: Path | None = DEFAULT_CACHE_PATH,
+    embedding: EmbedOptions = EmbedOptions(),
+    binary: bool = False,
+    quantize: bool = False,
+    ann: bool = False,
+    dimensions: int | None = None,
+    resume: bool = False,
+    checkpoint_path: Path = DEFAULT_CHECKPOINT_DIR / "ingest_pdf_rag.journal.jsonl",
+    extract_workers: int | None = None,
+    page_cache_path: Path | None = DEFAULT_PAGE_CACHE_PATH,
+    chunker: str = DEFAULT_CHUNKER,
+    dedup: str = "drop",
+    dedup_threshold: float = DEFAULT_THRESHOLD,
+    dedup_log_path: Path = DEFAULT_DEDUP_LOG_DIR / "ingest_pdf_rag.duplicates.jsonl",
+    max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
+    plan: bool = False,
+    provider: str = DEFAULT_PROVIDER,
+) -> dict[str, Any] | None:
+    """🌟 The Grand Orchestration - PDF → Chonkie → Embeddings → shared
+
+    Chunks already in the content-hash cache at `cache_path` skip the API; the
+    rest are embedded per `embedding` (the async stage's budgets and hedging,
+    or the work queue). With `binary`, a memory-mappable float32 store is
+    written (and synced) beside each JSON; `quantize` adds float16/int8
+    exports plus a top-k recall report, and `ann` an IVF approximate-search
+    index with its recall-vs-latency report.
+    `dimensions` requests shortened embeddings (cached full vectors are
+    truncated and renormalized locally instead of re-embedded).
+
+    Every embedded chunk is first written to the checkpoint journal at
+    `checkpoint_path`; with `resume`, chunks journaled by an interrupted run
+    are assembled from the journal instead of being embedded again.
+
+    PDF pages are extracted by `extract_workers` processes (default: one per core);
+    pages already in the page cache at `page_cache_path` are not parsed again.
+    `chunker` is a strategy spec for `rag_ingest.chunking.make_chunker`.
+
+    Chunks whose word-shingle Jaccard with an earlier chunk is at least
+    `dedup_threshold` are dropped before embedding (`dedup="drop"`), kept with
+    a `duplicate_of` id (`"flag"`), or left alone (`"off"`); each one found is
+    logged to `dedup_log_path`.
+
+    Chunk ids are stable, `<doc id>:p<pages>:<content hash>` (see
+    `rag_ingest.chunk_ids`; the doc id defaults to the slugified file name),
+    and the added/removed/unchanged ids since the previous output are saved
+    as `embeddings.diff.json`. Chunks over `max_input_tokens` (counted
+    locally) are split into parts `<id>.1`, `<id>.2`, ... that point back to
+    `<id>`; batches are packed by the same token counts.
+
+    With a `doc_id` (corpus mode), `pdf_path` is one corpus document and
+    `output_path` its shard, and every chunk records the doc id and source file.
+
+    With `plan`, nothing is embedded or written: after extraction, chunking
+    and the cache (and, with `resume`, journal) lookups, the chunks, tokens,
+    requests, cost and duration the run would take are printed, saved as
+    `embeddings.plan.json` beside `output_path`, and returned.
+
+    `provider` is a spec for `rag_ingest.providers.make_provider`; the offline
+    ones (`local`, `stub`) need no API key and use their own embedding cache.
+    """
     print("🌐 ✨ THE CHONKIE RAG RITUAL AWAKENS!")
     print("=" * 50)
 
-    if not os.getenv("OPENAI_API_KEY"):
+    embedder = make_provider(provider)
+    cache_path = cache_path_for(embedder, cache_path)
+    # 🌙 offline jobs get their own board too
+    embedding = dataclasses.replace(embedding, queue_path=cache_path_for(embedder, embedding.queue_path))
+    if not plan and not embedder.offline and not os.getenv("OPENAI_API_KEY"):
         print("💥 😭 OPENAI_API_KEY not found! Set it in .env")
         sys.exit(1)
 
-    if not PDF_PATH.exists():
-        print(f"💥 😭 PDF NOT FOUND: {PDF_PATH}")
+    if not pdf_path.exists():
+        print(f"💥 😭 PDF NOT FOUND: {pdf_path}")
         sys.exit(1)
 
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    telemetry = RunTelemetry("ingest_pdf_rag", model=EMBEDDING_MODEL, config={
+        "chunker": chunker, "dimensions": dimensions, "concurrency": embedding.concurrency,
+        "batch_size": embedding.batch_size, "requests_per_minute": embedding.requests_per_minute,
+        "tokens_per_minute": embedding.tokens_per_minute,
+        "dedup": dedup, "dedup_threshold": dedup_threshold, "max_input_tokens": max_input_tokens,
+        "provider": describe_provider(embedder), **({"doc_id": doc_id} if doc_id else {}),
+        "hedge": dataclasses.asdict(embedding.hedge) if embedding.hedge else None,
+        **({"queue_workers": embedding.queue_workers, "lease_seconds": embedding.lease_seconds}
+           if embedding.queue_path else {}),
+    })
 
-    # 🌐 Step 1: Extract full PDF
-    full_text = extract_text_from_pdf(PDF_PATH)
-    if not full_text.strip():
-        print("💥 😭 No text extracted from PDF!")
-        sys.exit(1)
+    # 🌐 Step 1 + 🧮 Step 2: Extract, chunk, dedup and split, each chunk with its stable id
+    prepared = prepare_chunks(
+        pdf_path, doc_id, telemetry,
+        extract_workers=extract_workers, page_cache_path=page_cache_path, chunker=chunker,
+        dedup=dedup, dedup_threshold=dedup_threshold, dedup_log_path=dedup_log_path,
+        max_input_tokens=max_input_tokens,
+    )
+    chunk_texts = prepared.texts
+    width = resolve_dimensions(EMBEDDING_MODEL, dimensions)
+    run_info = {"model": EMBEDDING_MODEL, "dimensions": width, "source": str(pdf_path)}
+    if embedder.offline:  # 🌙 never resume real vectors from a journal of fake ones, or vice versa
+        run_info["provider"] = embedder.cache_key
+    journal = CheckpointJournal(checkpoint_path, run_info)
+    cache = EmbeddingCache(cache_path, model=EMBEDDING_MODEL, dimensions=width) if cache_path else None
 
-    # 🧮 Step 2: Chonkie chunking (smart boundaries!)
-    chunk_texts = chunk_with_chonkie(full_text)
+    if plan:  # 🧭 Dry run: lookups only, then report what the embedding stage would cost
+        try:
+            report = plan_embedding(
+                chunk_texts,
+                script="ingest_pdf_rag",
+                model=EMBEDDING_MODEL,
+                cache=cache,
+                done=journal.peek(chunk_texts) if resume else (),
+                max_items=embedding.batch_size,
+                concurrency=embedding.concurrency,
+                requests_per_minute=embedding.requests_per_minute,
+                tokens_per_minute=embedding.tokens_per_minute,
+            )
+        finally:
+            if cache:
+                cache.close()
+        print(format_plan(report))
+        print(f"🧭 Plan saved to {write_plan(output_path, report)}")
+        return report
 
-    # 💎 Step 3: Generate embeddings
+    # 💎 Step 3: Embeddings come from the journal, the cache, then the embedding backend for
+    #    the misses, and each chunk streams to every destination the moment its turn comes
     print("\n🌐 ✨ EMBEDDING GENERATION AWAKENS!")
-    embedded_chunks = []
+    previous_ids = load_chunk_ids(output_path)  # 🔁 read before this run replaces the file
+    writer = DocumentWriter(output_path, prepared, width, telemetry,
+                            binary=binary or quantize, doc_id=doc_id, source=pdf_path.name)
 
-    for idx, chunk_text in enumerate(chunk_texts, 1):
-        if idx % 20 == 0:
-            print(f"🎪 📦 Batch {idx}/{len(chunk_texts)} entering the cosmic ring!")
+    def emit(position: int, vector: list[float] | None) -> None:
+        if vector is None:  # 🌙 journaled or cached chunk - read back only when its turn comes
+            vector = journal.get(position) if position in journal else cache.get(chunk_texts[position])
+        writer.write(position, vector)
 
-        block_type = detect_block_type(chunk_text)
-        embedding = get_embedding(client, chunk_text)
+    in_order = ReorderBuffer(emit)
+    missing: list[int] = []
 
-        embedded_chunks.append({
-            "id": f"chunk_{idx}",
-            "text": chunk_text,
-            "embedding": embedding,
-            "block_type": block_type,
-            "metadata": create_chunk_metadata(chunk_text, block_type, idx),
+    try:
+        with telemetry.stage("embed"):
+            # 📔 Write-ahead journal first: resumed chunks come straight back out of it
+            restored = journal.open(chunk_texts, resume=resume)
+            if resume:
+                print(f"📔 Resuming: {len(restored)} of {len(chunk_texts)} chunks already journaled")
+            for position in restored:
+                in_order.put(position, None)
+            pending = [i for i in range(len(chunk_texts)) if i not in journal]
+
+            if cache:
+                cached, uncached = cache.partition([chunk_texts[i] for i in pending])
+                for i in cached:
+                    in_order.put(pending[i], None)
+                missing = [pending[i] for i in uncached]
+            else:
+                missing = pending
+
+            if missing:
+                def remember(position: int, vector: list[float]) -> None:
+                    chunk_text = chunk_texts[missing[position]]
+                    journal.append(missing[position], prepared.ids[missing[position]], chunk_text, vector)
+                    if cache:
+                        cache.put(chunk_text, vector)
+                    in_order.put(missing[position], vector)
+
+                embed_missing(embedder, [chunk_texts[i] for i in missing], width, embedding, telemetry.requests,
+                              remember)
+
+        print(f"\n🎉 ✨ EMBEDDING MASTERPIECE COMPLETE!")
+
+        # 📜 Step 4: Seal the JSON (and binary store) in every destination
+        writer.close({
+            **index_metadata(embedder),
+            **({"doc_id": doc_id, "source": pdf_path.name} if doc_id else {}),
         })
+    except BaseException:
+        # 🌙 Nothing half-written ever replaces a good file; the journal keeps our progress
+        writer.abort()
+        journal.close()
+        print(f"📔 Progress saved to {journal.path} ({len(journal)} chunks) - rerun with --resume")
+        raise
+    else:
+        journal.close()  # 🌙 kept until the variants are published, in case a later step fails
+    finally:
+        if cache:
+            cache.close()
+            print(cache.summary())
 
-    print(f"\n🎉 ✨ EMBEDDING MASTERPIECE COMPLETE!")
+    print(f"\n💎 Wisdom crystallized at: {output_path}")
+    if writer.binary_writer:
+        print(f"🗄️ Binary store crystallized at: {writer.binary_writer.paths[0]}")
+    print(f"🌟 Total chunks: {writer.count}")
+    print(f"🌊 Blocks: {writer.block_counts}")
 
-    # 📊 Build chapter summary from block distribution
-    block_counts: dict[str, int] = {}
-    for c in embedded_chunks:
-        bt = c["block_type"]
-        block_counts[bt] = block_counts.get(bt, 0) + 1
+    # 📋 Step 5: Quantize, index and publish the finished files to the variant folders
+    try:
+        finish_outputs(
+            output_path, variant_paths, telemetry,
+            embedder=embedder, cache_path=cache_path, width=width,
+            binary=binary or quantize, quantize=quantize, ann=ann,
+            previous_ids=previous_ids, chunk_ids=prepared.ids,
+        )
+    except BaseException:
+        print(f"📔 Progress saved to {journal.path} ({len(journal)} chunks) - rerun with --resume")
+        raise
+    journal.discard()
 
-    chapters = [
-        {"code": k[:3].upper() if len(k) >= 3 else k, "name": k, "count": v}
-        for k, v in sorted(block_counts.items())
-    ]
+    # 📈 Step 6: Where the time and tokens went, beside the output and in the run history
+    metrics = telemetry.write(output_path, chunks={
+        "chunked": prepared.chunked,
+        "written": writer.count,
+        "embedded": len(missing),
+        "reused": writer.count - len(missing),
+        "near_duplicates_dropped": prepared.chunked - len({index for index, _, _ in prepared.origins}),
+    })
+    print(f"📈 Run metrics: {metrics}")
+
+    print(f"\n🎊 Shard {doc_id} complete." if doc_id else
+          "\n🎊 CHONKIE RAG RITUAL COMPLETE!" + (" All variants updated." if variant_paths else ""))
+    return None
 
-    # 📜 Step 4: Crystallize into JSON
-    output_data = {
-        "version": "3.0",
-        "model": "text-embedding-3-small",
-        "dimensions": 1536,
-        "total_chunks": len(embedded_chunks),
-        "chapters": chapters,
-        "chunks": embedded_chunks,
-        "metadata": {
-            "source": "You Only Have Four Problems (full PDF)",
-            "description": "Full PDF extraction via Chonkie chunking + OpenAI embeddings",
-            "blocks": BLOCKS,
-            "additional_topics": ["Mental Contamination", "ABCs", "Three Insights", "Irrational Beliefs", "Happiness", "Zen Meditation"],
-        },
+
+def index_metadata(embedder: Any) -> dict[str, Any]:
+    """📋 The `metadata` footer of the combined index (offline runs say which provider made the vectors)"""
+    return {
+        "source": "You Only Have Four Problems (full PDF)",
+        "description": "Full PDF extraction via Chonkie chunking + OpenAI embeddings",
+        "blocks": BLOCKS,
+        "additional_topics": ["Mental Contamination", "ABCs", "Three Insights", "Irrational Beliefs", "Happiness", "Zen Meditation"],
+        **({"embedding_provider": describe_provider(embedder)} if embedder.offline else {}),
     }
 
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(output_data, f, indent=2)
 
-    print(f"\n💎 Wisdom crystallized at: {OUTPUT_PATH}")
-    print(f"🌟 Total chunks: {len(embedded_chunks)}")
-    print(f"🌊 Blocks: {dict(block_counts)}")
+def write_quantization_report(client: Any, output_path: Path, cache_path: Path | None, width: int) -> None:
+    """🪶 float16/int8 exports beside `output_path`, with the probe-query top-k recall report"""
+    probes = embed_probe_queries(client, cache_path, width)
+    report = write_quantized_exports(output_path, load_binary_store(output_path).vectors, probes)
+    for name, stats in report["formats"].items():
+        print(f"🪶 {name}: {stats['bytes']:,} bytes ({stats['compression']}x), "
+              f"top-{report['top_k']} overlap mean {stats['mean_overlap']:.3f} / min {stats['min_overlap']:.3f}")
+
+
+def publish_to_variants(
+    output_path: Path, variant_paths: Sequence[Path], *, binary: bool, quantize: bool, ann: bool = False
+) -> None:
+    """📋 Publish the JSON (plus binary store, quantized exports and IVF index) beside each variant, atomically,
+    skipping files whose content is already there; each variant folder gets a publish manifest.
+    Without `binary` (or `ann`), a store (or IVF index) published to a variant by an earlier run is removed."""
+    for variant_path in variant_paths:
+        if not binary:
+            remove_binary_store(variant_path)
+        if not ann:
+            remove_ann_index(variant_path)
+    files = [
+        output_path,
+        *(store_paths(output_path) if binary else ()),
+        *(path for path in export_paths(output_path).values() if quantize and path.exists()),
+        *(ann_paths(output_path).values() if ann else ()),
+    ]
+    for variant_path, published in publish(files, output_path, variant_paths).items():
+        print(f"✨ Synced to {variant_path.relative_to(PROJECT_ROOT)}: {format_published(published)}")
 
-    # 📋 Step 5: Copy to variant shared folders
-    for variant_path in VARIANT_PATHS:
-        variant_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(variant_path, "w") as f:
-            json.dump(output_data, f, indent=2)
-        print(f"✨ Synced to {variant_path.relative_to(PROJECT_ROOT)}")
 
-    print("\n🎊 CHONKIE RAG RITUAL COMPLETE! All variants updated.")
+def ingest_corpus(
+    sources: Sequence[str | Path],
+    *,
+    output_path: Path = OUTPUT_PATH,
+    variant_paths: Sequence[Path] = VARIANT_PATHS,
+    workers: int | None = None,
+    shard_dir: Path = DEFAULT_SHARD_DIR,
+    cache_path: Path | None = DEFAULT_CACHE_PATH,
+    embedding: EmbedOptions = EmbedOptions(),
+    extract_workers: int | None = None,
+    binary: bool = False,
+    quantize: bool = False,
+    ann: bool = False,
+    dimensions: int | None = None,
+    dedup: str = "drop",
+    dedup_threshold: float = DEFAULT_THRESHOLD,
+    plan: bool = False,
+    provider: str = DEFAULT_PROVIDER,
+    **options: Any,
+) -> dict[str, Any] | None:
+    """📚 One worker per document, one shard per document, then one merged index
+
+    Every document in `sources` (files, directories or globs) runs
+    `process_pdf_to_embeddings` in its own process (`workers` at a time,
+    default one per core), writing `<shard_dir>/<doc_id>.json`. The request
+    and token budgets, in-flight limit and local queue workers in `embedding`,
+    and the extraction processes, are divided between the workers, so the
+    run as a whole stays within them. The shards are then merged, in document
+    order, into `output_path`, post-processed and published to every variant
+    the same way a single document is (`finish_outputs`); near-duplicates
+    across documents are dropped or flagged per `dedup`.
+    With `ann`, only the merged index gets an IVF index, not each shard.
+    Remaining keyword `options` (chunker, resume, ...) go to every
+    document's run.
+
+    With `plan`, every document is planned instead of embedded (see
+    `process_pdf_to_embeddings`) and the combined plan, under the full
+    budgets, is printed, saved beside `output_path` and returned. Cross-document
+    duplicates, found only at the merge, are still counted as work.
+    """
+    print("📚 ✨ CORPUS INGEST AWAKENS!")
+    embedder = make_provider(provider)
+    if not plan and not embedder.offline and not os.getenv("OPENAI_API_KEY"):
+        print("💥 😭 OPENAI_API_KEY not found! Set it in .env")
+        sys.exit(1)
+    try:
+        documents = discover_documents(sources)
+    except ValueError as error:
+        print(f"💥 😭 {error}")
+        sys.exit(1)
+    workers = max(1, min(workers or default_workers(), len(documents)))
+    print(f"📖 {len(documents)} documents, {workers} at a time")
+
+    telemetry = RunTelemetry("ingest_corpus", model=EMBEDDING_MODEL, config={
+        "documents": len(documents), "workers": workers, "dimensions": dimensions,
+        "dedup": dedup, "dedup_threshold": dedup_threshold, "provider": describe_provider(embedder),
+    })
+    failed = []
+    with telemetry.stage("ingest"), ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            document: pool.submit(
+                process_pdf_to_embeddings,
+                pdf_path=document.path,
+                output_path=shard_path(shard_dir, document.doc_id),
+                variant_paths=[],
+                doc_id=document.doc_id,
+                cache_path=cache_path,
+                embedding=embedding.share(workers),
+                extract_workers=max(1, (extract_workers or default_workers()) // workers),
+                dimensions=dimensions,
+                dedup=dedup,
+                dedup_threshold=dedup_threshold,
+                checkpoint_path=DEFAULT_CHECKPOINT_DIR / "corpus" / f"{document.doc_id}.journal.jsonl",
+                dedup_log_path=DEFAULT_DEDUP_LOG_DIR / "corpus" / f"{document.doc_id}.duplicates.jsonl",
+                plan=plan,
+                provider=provider,
+                **options,
+            )
+            for document in documents
+        }
+        plans = []
+        for document, future in futures.items():
+            try:
+                plans.append(future.result())
+            except (Exception, SystemExit) as error:  # 🌙 a worker's sys.exit must not end the corpus run
+                failed.append(document)
+                print(f"💥 😭 {document.path} failed: {error!r}")
+    if failed:
+        print(f"💥 😭 {len(failed)} of {len(documents)} documents failed; nothing merged. "
+              f"Finished shards stay in {shard_dir} - rerun (with --resume) to retry.")
+        sys.exit(1)
+
+    if plan:
+        report = combine_plans(
+            plans,
+            concurrency=embedding.concurrency,
+            requests_per_minute=embedding.requests_per_minute,
+            tokens_per_minute=embedding.tokens_per_minute,
+        )
+        print(f"\n📚 {len(documents)} documents together:")
+        print(format_plan(report))
+        print(f"🧭 Plan saved to {write_plan(output_path, report)}")
+        return report
+
+    print(f"\n🧵 Merging {len(documents)} shards")
+    previous_ids = load_chunk_ids(output_path)
+    with telemetry.stage("merge"):
+        footer = merge_shards(
+            [shard_path(shard_dir, document.doc_id) for document in documents],
+            [output_path],
+            metadata=index_metadata(embedder),
+            binary=binary or quantize,
+            dedup=dedup,
+            dedup_threshold=dedup_threshold,
+            dedup_log_path=DEFAULT_DEDUP_LOG_DIR / "corpus" / "merge.duplicates.jsonl",
+        )
+    written = footer["total_chunks"]
+    print(f"💎 {written} chunks from {len(documents)} documents crystallized at: {output_path}")
+
+    finish_outputs(
+        output_path, variant_paths, telemetry,
+        embedder=embedder, cache_path=cache_path_for(embedder, cache_path),
+        width=resolve_dimensions(EMBEDDING_MODEL, dimensions),
+        binary=binary or quantize, quantize=quantize, ann=ann,
+        previous_ids=previous_ids, chunk_ids=load_chunk_ids(output_path),
+    )
+
+    metrics = telemetry.write(output_path, chunks={
+        "documents": len(documents),
+        "shard_chunks": sum(document["chunks"] for document in footer["metadata"]["documents"]),
+        "written": written,
+    })
+    print(f"📈 Run metrics: {metrics}")
+    print("\n🎊 CORPUS INGEST COMPLETE!" + (" All variants updated." if variant_paths else ""))
+    return None
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """🎛️ Read the ritual's tuning knobs from the command line"""
+    parser = argparse.ArgumentParser(description="Ingest the full book PDF into shared embeddings")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore the content-hash embedding cache and re-embed everything")
+    parser.add_argument("--cache-path", type=Path, default=DEFAULT_CACHE_PATH,
+                        help=f"embedding cache location (default {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"max embedding requests in flight (default {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help=f"requests/min budget (default {DEFAULT_REQUESTS_PER_MINUTE})")
+    parser.add_argument("--tpm", type=float, default=DEFAULT_TOKENS_PER_MINUTE,
+                        help=f"tokens/min budget (default {DEFAULT_TOKENS_PER_MINUTE})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"max chunks per embeddings request (default {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--max-input-tokens", type=int, default=DEFAULT_MAX_INPUT_TOKENS,
+                        help=f"split chunks longer than this many tokens into linked parts "
+                             f"(default {DEFAULT_MAX_INPUT_TOKENS}; the model accepts {API_MAX_INPUT_TOKENS})")
+    parser.add_argument("--dimensions", type=int, default=None,
+                        help="request shortened embeddings of this width (default: the model's native 1536)")
+    parser.add_argument("--binary", action="store_true",
+                        help="also write a memory-mappable float32 store beside embeddings.json")
+    parser.add_argument("--quantize", action="store_true",
+                        help="also export float16 + int8 embeddings and a top-k recall report (implies --binary)")
+    parser.add_argument("--ann", action="store_true",
+                        help="also build an IVF approximate-search index and its recall-vs-latency report "
+                             "(see rag_ingest/ann.py)")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip chunks already recorded in the checkpoint journal by an interrupted run")
+    parser.add_argument("--extract-workers", type=int, default=None,
+                        help="processes for page-parallel PDF extraction (default: one per core)")
+    parser.add_argument("--chunker", default=DEFAULT_CHUNKER,
+                        help=f"chunking strategy spec, e.g. sentence or heading:max_chars=800 "
+                             f"(strategies: {', '.join(STRATEGIES)}; default {DEFAULT_CHUNKER})")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="drop",
+                        help="near-duplicate chunks: drop before embedding, flag with duplicate_of, or off "
+                             "(default drop)")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"word-shingle Jaccard at which chunks count as near-duplicates "
+                             f"(default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--no-page-cache", action="store_true",
+                        help="re-parse every PDF page instead of reusing cached page text")
+    parser.add_argument("--page-cache-path", type=Path, default=DEFAULT_PAGE_CACHE_PATH,
+                        help=f"extracted page-text cache location (default {DEFAULT_PAGE_CACHE_PATH})")
+    parser.add_argument("--plan", action="store_true",
+                        help="dry run: extract, chunk and check the cache, then report the chunks, tokens, "
+                             "requests, cost and duration a real run would take (no API calls; only embeddings.plan.json is written)")
+    parser.add_argument("--hedge-budget", type=float, default=HedgePolicy.budget,
+                        help=f"max duplicate requests for stragglers, as a fraction of requests "
+                             f"(default {HedgePolicy.budget}; 0 turns hedging off)")
+    parser.add_argument("--hedge-quantile", type=float, default=HedgePolicy.quantile,
+                        help=f"hedge a request once it outlasts this quantile of observed latencies "
+                             f"(default {HedgePolicy.quantile})")
+    parser.add_argument("--provider", default=DEFAULT_PROVIDER,
+                        help=f"embedding provider spec, e.g. local or stub:latency=0.2,error_rate=0.02 "
+                             f"(providers: {', '.join(PROVIDERS)}; default {DEFAULT_PROVIDER}, or EMBEDDING_PROVIDER)")
+    parser.add_argument("--queue", type=Path, nargs="?", const=DEFAULT_QUEUE_PATH, default=None,
+                        help=f"embed through a durable work queue that workers on any machine can join "
+                             f"(default file {DEFAULT_QUEUE_PATH}); see rag_ingest/work_queue.py")
+    parser.add_argument("--queue-workers", type=int, default=DEFAULT_QUEUE_WORKERS,
+                        help=f"worker processes to start here with --queue (default {DEFAULT_QUEUE_WORKERS}; "
+                             f"0 = only workers started elsewhere)")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help=f"with --queue, re-issue a job whose worker has not committed after this long "
+                             f"(default {DEFAULT_LEASE_SECONDS:g})")
+    parser.add_argument("--output", type=Path, default=None,
+                        help=f"write the index here instead, without publishing to the variants "
+                             f"(default {OUTPUT_PATH.relative_to(PROJECT_ROOT)}, or .cache/offline/ for offline providers)")
+    parser.add_argument("--corpus", nargs="+", metavar="SOURCE",
+                        help="ingest every document (.pdf/.txt/.md/.json) in these files, directories or globs, "
+                             "one worker per document, and merge the shards into one index")
+    parser.add_argument("--corpus-workers", type=int, default=None,
+                        help="documents ingested at once in corpus mode (default: one per core)")
+    parser.add_argument("--shard-dir", type=Path, default=DEFAULT_SHARD_DIR,
+                        help=f"where corpus mode writes one shard per document (default {DEFAULT_SHARD_DIR})")
+    return parser.parse_args(argv)
+
+
+def hedge_policy(args: argparse.Namespace) -> HedgePolicy | None:
+    """🏇 The hedging policy the flags ask for (None when the budget is 0)"""
+    return HedgePolicy(quantile=args.hedge_quantile, budget=args.hedge_budget) if args.hedge_budget > 0 else None
+
+
+def embed_options(args: argparse.Namespace) -> EmbedOptions:
+    """🎼 The budgets, hedging and work queue the flags ask for"""
+    return EmbedOptions(
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        batch_size=args.batch_size,
+        hedge=hedge_policy(args),
+        queue_path=args.queue,
+        queue_workers=args.queue_workers,
+        lease_seconds=args.lease_seconds,
+    )
+
+
+def resolve_outputs(args: argparse.Namespace) -> tuple[Path, list[Path]]:
+    """📍 Output path and variants: only a real run to the default output reaches the variant folders"""
+    embedder = make_provider(args.provider)
+    if args.output:
+        return args.output, []
+    if embedder.offline:  # 🌙 fake vectors never reach shared/data
+        return offline_output_path(embedder, OUTPUT_PATH), []
+    return OUTPUT_PATH, list(VARIANT_PATHS)
 
 
 if __name__ == "__main__":
-    process_pdf_to_embeddings()
+    args = parse_args()
+    output_path, variant_paths = resolve_outputs(args)
+    if args.corpus:
+        ingest_corpus(
+            args.corpus,
+            output_path=output_path,
+            variant_paths=variant_paths,
+            workers=args.corpus_workers,
+            shard_dir=args.shard_dir,
+            cache_path=None if args.no_cache else args.cache_path,
+            embedding=embed_options(args),
+            extract_workers=args.extract_workers,
+            binary=args.binary,
+            quantize=args.quantize,
+            ann=args.ann,
+            dimensions=args.dimensions,
+            dedup=args.dedup,
+            dedup_threshold=args.dedup_threshold,
+            resume=args.resume,
+            page_cache_path=None if args.no_page_cache else args.page_cache_path,
+            chunker=args.chunker,
+            max_input_tokens=args.max_input_tokens,
+            plan=args.plan,
+            provider=args.provider,
+        )
+        sys.exit(0)
+    process_pdf_to_embeddings(
+        output_path=output_path,
+        variant_paths=variant_paths,
+        cache_path=None if args.no_cache else args.cache_path,
+        embedding=embed_options(args),
+        binary=args.binary,
+        quantize=args.quantize,
+        ann=args.ann,
+        dimensions=args.dimensions,
+        resume=args.resume,
+        extract_workers=args.extract_workers,
+        page_cache_path=None if args.no_page_cache else args.page_cache_path,
+        chunker=args.chunker,
+        dedup=args.dedup,
+        dedup_threshold=args.dedup_threshold,
+        max_input_tokens=args.max_input_tokens,
+        plan=args.plan,
+        provider=args.provider,
+    )
@@ -0,0 +1,41 @@
+"""
+🎭 rag_ingest — The Shared Embedding Forge for the Ingest Scripts ✨
+
+"One forge, many rituals — the PDF alchemist, the knowledge-base
+ orchestrator and the book processor all hammer their vectors here."
+
+Import these helpers from `scripts/generate_embeddings.py`,
+`scripts/ingest_pdf_rag.py` and `claude/scripts/process_book.py`
+instead of hand-rolling one HTTP round-trip per chunk.
+
+ - The Spellbinding Museum Director of Vector Logistics
+"""
+
+from .batching import (
+    DEFAULT_BATCH_ITEMS,
+    DEFAULT_BATCH_TOKENS,
+    DEFAULT_MAX_INPUT_TOKENS,
+    EMBEDDING_MODEL,
+    EmbeddingBatch,
+    embed_batch,
+    embed_items,
+    estimate_tokens,
+    pack_batches,
+)
+from .cache import DEFAULT_CACHE_PATH, EmbeddingCache, normalize_text, text_hash
+
+__all__ = [
+    "DEFAULT_BATCH_ITEMS",
+    "DEFAULT_BATCH_TOKENS",
+    "DEFAULT_CACHE_PATH",
+    "DEFAULT_MAX_INPUT_TOKENS",
+    "EMBEDDING_MODEL",
+    "EmbeddingBatch",
+    "EmbeddingCache",
+    "embed_batch",
+    "embed_items",
+    "estimate_tokens",
+    "normalize_text",
+    "pack_batches",
+    "text_hash",
+]
@@ -0,0 +1,342 @@
+"""
+🧭 The Signposts — Ask Which Towns Are Nearest, Then Search Only Those ✨
+
+"To find one house in a strange country, do not knock on every door;
+ ask which towns lie nearest, and walk only their streets."
+
+An inverted-file (IVF) approximate nearest-neighbor index, built at ingest
+time and saved beside `embeddings.json`:
+
+    embeddings.ivf.vectors.npy    the unit-length float32 rows, grouped list by list
+    embeddings.ivf.npz            centroids, list offsets, and each position's row in embeddings.json
+    embeddings.ann-report.json    recall@k and query latency per nprobe, against exact search
+
+The index records the model, width, ids and a digest of the vectors it was
+built from, and `VectorIndex.load(..., ann=True)` refuses one that no longer
+matches: content-derived ids alone survive a change of --dimensions or model.
+
+Spherical k-means splits the chunks into `nlist` lists around centroids
+(about 4·√rows by default). A query scores the centroids, then only the rows
+of the `nprobe` nearest lists. Each list is stored contiguously, so every
+probe is one matrix-vector product over a slice. No copy, no gather.
+Raising `nprobe` trades speed for recall; the report says by how much.
+
+IVF rather than an HNSW graph: every step here is a NumPy matrix product,
+so it needs no compiled dependency, and the build is the k-means training.
+
+    index = VectorIndex.load("shared/data/embeddings.json", ann=True)
+    index.search(query_vector, k=5, nprobe=8)
+    cd scripts && python -m rag_ingest.ann build shared/data/embeddings.json
+
+ - The Cosmic Cartographer
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+
+from .search import DEFAULT_EMBEDDINGS_PATH, VectorIndex, normalize_rows, sample_queries, top_k
+from .writer import atomic_replace, temp_path_for
+
+IVF_FORMAT = "rag-ingest-ivf/1"
+DEFAULT_NPROBE = 8
+DEFAULT_ITERATIONS = 10
+REPORT_NPROBES = (1, 2, 4, 8, 16, 32, 64)
+REPORT_QUERIES = 200
+REPORT_K = 10
+
+# 🌙 Rows scored against the centroids at a time while assigning, to bound memory
+_ASSIGN_BLOCK = 8192
+
+
+def ann_paths(json_path: Path | str) -> dict[str, Path]:
+    """🧭 Where the IVF index and its report live beside `embeddings.json`."""
+    json_path = Path(json_path)
+    stem = json_path.with_suffix("").name
+    return {
+        "vectors": json_path.with_name(f"{stem}.ivf.vectors.npy"),
+        "lists": json_path.with_name(f"{stem}.ivf.npz"),
+        "report": json_path.with_name(f"{stem}.ann-report.json"),
+    }
+
+
+def remove_ann_index(json_path: Path | str) -> list[Path]:
+    """🧹 Delete the IVF index and report beside `json_path` so a run without --ann leaves no stale one."""
+    removed = []
+    for path in ann_paths(json_path).values():
+        if path.exists():
+            path.unlink()
+            removed.append(path)
+    return removed
+
+
+def default_nlist(rows: int) -> int:
+    """📐 About 4·√rows lists: a few dozen rows per list at the book's size, ~4,000 lists at a million."""
+    return max(1, min(rows, round(4 * math.sqrt(rows))))
+
+
+def ids_digest(ids: Sequence[str]) -> str:
+    """🔑 Fingerprint of the chunk ids in order, so an index never serves a different embeddings.json."""
+    return hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """🗺️ The nearest centroid (highest cosine) of every row."""
+    lists = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_BLOCK):
+        lists[start:start + _ASSIGN_BLOCK] = np.argmax(vectors[start:start + _ASSIGN_BLOCK] @ centroids.T, axis=1)
+    return lists
+
+
+def train_centroids(
+    vectors: np.ndarray,
+    nlist: int,
+    *,
+    iterations: int = DEFAULT_ITERATIONS,
+    sample: Optional[int] = None,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    🎯 Spherical k-means: `nlist` unit-length centroids of unit-length `vectors`
+
+    Trains on `sample` random rows (default 64 per list); a list left empty
+    is re-seeded with a random row.
+    """
+    rng = np.random.default_rng(seed)
+    sample = min(len(vectors), sample or 64 * nlist)
+    training = vectors[np.sort(rng.choice(len(vectors), size=sample, replace=False))]
+    centroids = training[rng.choice(sample, size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        lists = assign_lists(training, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, lists, training)
+        empty = np.bincount(lists, minlength=nlist) == 0
+        sums[empty] = training[rng.choice(sample, size=int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+@dataclass
+class IVFIndex:
+    """
+    🧭 Centroids plus the rows grouped into their lists
+
+    Positions `offsets[i]:offsets[i + 1]` of `vectors` are list i; `rows[p]`
+    is the row in embeddings.json of position p.
+    """
+    centroids: np.ndarray
+    offsets: np.ndarray
+    rows: np.ndarray
+    vectors: np.ndarray
+    header: dict[str, Any]
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        *,
+        nlist: Optional[int] = None,
+        iterations: int = DEFAULT_ITERATIONS,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """🏗️ Train centroids on unit-length `vectors` and group the rows into lists."""
+        nlist = min(nlist or default_nlist(len(vectors)), len(vectors))
+        centroids = train_centroids(vectors, nlist, iterations=iterations, seed=seed)
+        lists = assign_lists(vectors, centroids)
+        rows = np.argsort(lists, kind="stable").astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=nlist))]).astype(np.int64)
+        header = {"format": IVF_FORMAT, "rows": len(vectors), "dimensions": vectors.shape[1], "nlist": nlist,
+                  "iterations": iterations, "seed": seed}
+        return cls(centroids, offsets, rows, np.ascontiguousarray(vectors[rows]), header)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        k: int,
+        *,
+        nprobe: int = DEFAULT_NPROBE,
+        allowed: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        🎯 (rows, scores), each (queries, k), best first, from the `nprobe` lists nearest each query
+
+        `queries` must already be unit length. `allowed` (a boolean per row)
+        drops rows a filter excludes. When the probed lists hold fewer than k
+        candidates, the rest is padded with row -1 and score -inf.
+        """
+        nprobe = max(1, min(nprobe, self.nlist))
+        rows = np.full((len(queries), k), -1, dtype=np.intp)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        centroid_scores = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe] if nprobe < self.nlist \
+            else np.broadcast_to(np.arange(self.nlist), centroid_scores.shape)
+        for number, (query, probe) in enumerate(zip(queries, probes)):
+            starts, ends = self.offsets[probe], self.offsets[probe + 1]
+            candidate = np.concatenate([self.vectors[start:end] @ query for start, end in zip(starts, ends)])
+            if allowed is not None:
+                rows_probed = np.concatenate([self.rows[start:end] for start, end in zip(starts, ends)])
+                candidate[~allowed[rows_probed]] = -np.inf
+            best, best_scores = top_k(candidate[None, :], k)
+            found = int(np.isfinite(best_scores[0]).sum())
+            # 🌙 a candidate's number -> its probe -> its position in the list-ordered vectors
+            ends_seen = np.cumsum(ends - starts)
+            which = np.searchsorted(ends_seen, best[0, :found], side="right")
+            positions = starts[which] + best[0, :found] - (ends_seen[which] - (ends - starts)[which])
+            rows[number, :found] = self.rows[positions]
+            scores[number, :found] = best_scores[0, :found]
+        return rows, scores
+
+    def save(self, json_path: Path | str, index: VectorIndex) -> list[Path]:
+        """💾 Write both files beside `json_path`, atomically, tied to the model, ids and vectors of `index`."""
+        paths = ann_paths(json_path)
+        header = {**self.header, **{key: value() for key, value in _fingerprint(index).items()}}
+        with open(temp_path_for(paths["vectors"]), "wb") as f:
+            np.save(f, self.vectors)
+        with open(temp_path_for(paths["lists"]), "wb") as f:
+            np.savez(f, centroids=self.centroids, offsets=self.offsets, rows=self.rows,
+                     header=np.array(json.dumps(header)))
+        for name in ("vectors", "lists"):  # 🌙 lists last: they vouch for the vectors
+            atomic_replace(temp_path_for(paths[name]), paths[name])
+        self.header = header
+        return [paths["vectors"], paths["lists"]]
+
+
+def _fingerprint(index: VectorIndex) -> dict[str, Callable[[], Any]]:
+    """🔑 What ties an IVF index to the embeddings it was built from, cheapest check first."""
+    return {
+        "model": lambda: index.header.get("model"),
+        "dimensions": lambda: index.dimensions,
+        "rows": lambda: len(index),
+        "ids_sha256": lambda: ids_digest(index.ids),
+        "vectors_sha256": index.vectors_sha256,  # 🌙 last: it reads every row
+    }
+
+
+def load_ivf(json_path: Path | str, index: Optional[VectorIndex] = None) -> IVFIndex:
+    """
+    🔮 Open the IVF index beside `json_path` (vectors memory-mapped)
+
+    With `index` (the embeddings it will serve), an IVF index built for
+    another model, width, set of ids or set of vectors is refused.
+    """
+    paths = ann_paths(json_path)
+    with np.load(paths["lists"]) as lists:
+        header = json.loads(str(lists["header"]))
+        centroids, offsets, rows = lists["centroids"], lists["offsets"], lists["rows"]
+    if header.get("format") != IVF_FORMAT:
+        raise ValueError(f"{paths['lists']} is not a {IVF_FORMAT} index")
+    for key, current in (_fingerprint(index) if index is not None else {}).items():
+        if header.get(key) != current():
+            raise ValueError(f"{paths['lists']} was built for another version of {Path(json_path).name} "
+                             f"({key} differs); rebuild it")
+    return IVFIndex(centroids, offsets, rows, np.load(paths["vectors"], mmap_mode="r"), header)
+
+
+def _latency_ms(search, queries: np.ndarray) -> tuple[float, float]:
+    """⏱️ (mean, p95) milliseconds of one-query-at-a-time searches."""
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(float(np.mean(timings)), 4), round(float(np.percentile(timings, 95)), 4)
+
+
+def recall_report(
+    index: VectorIndex,
+    queries: np.ndarray,
+    *,
+    k: int = REPORT_K,
+    nprobes: Sequence[int] = REPORT_NPROBES,
+) -> dict[str, Any]:
+    """
+    📈 Recall@k and single-query latency for each nprobe, against exact search on the same index
+
+    Recall is the fraction of the exact top-k that the IVF search also returns.
+    """
+    k = min(k, len(index))
+    exact = np.concatenate([index.search_batch(queries[start:start + 16], k)[0]  # 🌙 16 score rows at a time
+                            for start in range(0, len(queries), 16)])
+    mean_ms, p95_ms = _latency_ms(lambda q: index.search_batch(q, k), queries)
+    report: dict[str, Any] = {
+        "rows": len(index), "dimensions": index.dimensions, "nlist": index.ann.nlist, "k": k,
+        "queries": len(queries), "exact": {"mean_ms": mean_ms, "p95_ms": p95_ms}, "nprobe": [],
+    }
+    for nprobe in sorted({min(n, index.ann.nlist) for n in nprobes}):
+        found, _ = index.search_batch(queries, k, nprobe=nprobe)
+        recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(exact, found)])
+        mean_ms, p95_ms = _latency_ms(lambda q: index.search_batch(q, k, nprobe=nprobe), queries)
+        report["nprobe"].append({"nprobe": nprobe, "recall": round(float(recall), 4),
+                                 "mean_ms": mean_ms, "p95_ms": p95_ms})
+    return report
+
+
+def build_ann_index(
+    json_path: Path | str,
+    *,
+    nlist: Optional[int] = None,
+    iterations: int = DEFAULT_ITERATIONS,
+    queries: int = REPORT_QUERIES,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    🏗️ Build the IVF index for an embeddings.json, save it beside it, and write the recall report
+
+    The report's queries are sampled chunks blurred with noise (no API
+    calls). Returns the report, which also records the build time.
+    """
+    index = VectorIndex.load(json_path)
+    started = time.perf_counter()
+    index.ann = IVFIndex.build(index.vectors, nlist=nlist, iterations=iterations, seed=seed)
+    build_seconds = time.perf_counter() - started
+    paths = index.ann.save(json_path, index)
+
+    report = {"build_seconds": round(build_seconds, 3),
+              **recall_report(index, sample_queries(index, min(queries, len(index)), seed=seed))}
+    with open(temp_path_for(ann_paths(json_path)["report"]), "w") as f:
+        json.dump(report, f, indent=2)
+    atomic_replace(temp_path_for(ann_paths(json_path)["report"]), ann_paths(json_path)["report"])
+    report["paths"] = [str(path) for path in paths]
+    return report
+
+
+def format_ann_report(report: dict[str, Any]) -> str:
+    """📋 The report as a few log lines: one per nprobe, after exact search."""
+    lines = [f"🧭 IVF index: {report['rows']:,} rows in {report['nlist']} lists, built in {report['build_seconds']}s; "
+             f"exact search {report['exact']['mean_ms']} ms/query"]
+    lines += [f"   nprobe {row['nprobe']:>3}: recall@{report['k']} {row['recall']:.3f}, "
+              f"{row['mean_ms']} ms/query (p95 {row['p95_ms']})" for row in report["nprobe"]]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """🚀 Build (or rebuild) the IVF index for an existing embeddings file."""
+    parser = argparse.ArgumentParser(description="Approximate nearest-neighbor (IVF) index for embeddings.json")
+    parser.add_argument("command", choices=("build",))
+    parser.add_argument("input", type=Path, nargs="?", default=DEFAULT_EMBEDDINGS_PATH,
+                        help=f"embeddings file (default {DEFAULT_EMBEDDINGS_PATH})")
+    parser.add_argument("--nlist", type=int, default=None, help="number of lists (default about 4 x sqrt(rows))")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                        help=f"k-means iterations (default {DEFAULT_ITERATIONS})")
+    parser.add_argument("--queries", type=int, default=REPORT_QUERIES,
+                        help=f"sampled queries for the recall report (default {REPORT_QUERIES})")
+    args = parser.parse_args(argv)
+    report = build_ann_index(args.input, nlist=args.nlist, iterations=args.iterations, queries=args.queries)
+    print(format_ann_report(report))
+
+
+if __name__ == "__main__":
+    main()
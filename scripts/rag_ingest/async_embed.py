@@ -0,0 +1,293 @@
+"""
+⚡ The Concurrent Conductor — Many Requests in Flight, None Out of Tune ✨
+
+"A single violin cannot fill the hall; a hundred without a conductor
+ make only noise. Keep the orchestra bounded, the tempo metered,
+ and when the hall says 'wait', wait exactly as long as it asks."
+
+An asyncio embedding stage that keeps a bounded number of requests in flight,
+meters them through token buckets for both requests/min and tokens/min, and
+retries 429/5xx responses with exponential backoff that honors Retry-After.
+With a `HedgePolicy`, a request that outlasts the observed p95 latency is
+duplicated and the first answer wins (see `rag_ingest.hedge`).
+Results come back in input order no matter which request finishes first.
+
+ - The Cosmic Orchestra Conductor
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Sequence
+
+import openai
+
+from .batching import (
+    DEFAULT_BATCH_ITEMS,
+    DEFAULT_BATCH_TOKENS,
+    EMBEDDING_MODEL,
+    EmbeddingBatch,
+    pack_batches,
+)
+from .hedge import Hedger, HedgePolicy
+
+# 🎭 Defaults match a tier-1 quota for text-embedding-3-small
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS_PER_MINUTE = 3_000
+DEFAULT_TOKENS_PER_MINUTE = 1_000_000
+
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 🪣 Token buckets — the metronome of the orchestra
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """
+    🪣 Continuously refilling bucket: `rate_per_minute` units, bursting up to `capacity`
+
+    `acquire(n)` waits until n units are available. Requests larger than the
+    capacity are clamped so one oversize job can't wait forever.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """⏳ Wait until `amount` units can be taken, then take them."""
+        amount = min(amount, self.capacity)
+        async with self._lock:  # 🌙 first come, first served
+            while True:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return
+                await asyncio.sleep((amount - self._level) / self.rate)
+
+
+class RateLimiter:
+    """🎼 Pairs a requests/min bucket with a tokens/min bucket."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    async def acquire(self, tokens: int) -> None:
+        """⏳ Reserve one request slot and `tokens` tokens."""
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 🔁 Retry policy — when the hall says 'wait'
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class RetryPolicy:
+    """🔁 Exponential backoff with full jitter, overridden by a server's Retry-After."""
+    max_attempts: int = 6
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """⏱️ Seconds to sleep before retry number `attempt` (1-based)."""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """🕰️ Read `retry-after-ms` or `Retry-After` (seconds or HTTP-date) into seconds."""
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error: Exception) -> tuple[bool, Optional[float]]:
+    """🔎 Decide whether `error` is worth retrying and how long the server asked us to wait."""
+    if isinstance(error, openai.APIStatusError):
+        retryable = error.status_code in RETRY_STATUSES
+        return retryable, parse_retry_after(error.response.headers) if retryable else None
+    if isinstance(error, (openai.APIConnectionError, asyncio.TimeoutError, ConnectionError)):
+        return True, None
+    return False, None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 🎻 The concurrent embedding stage
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class AsyncEmbedStats:
+    """📊 What the conductor saw during one performance (latencies in seconds, one per attempt)."""
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    latencies: list[float] = field(default_factory=list)
+    tokens: int = 0   # 🌙 tokens in successful requests - what gets billed
+    inputs: int = 0
+    hedged: int = 0      # 🌙 duplicate requests sent for stragglers (also counted in `requests`)
+    hedge_wins: int = 0  # 🌙 ... and how many of them answered first
+
+    def record(self, latency: float, tokens: int = 0, inputs: int = 0) -> None:
+        """⏱️ Count one finished attempt (one request) and its latency; failed attempts carry no tokens.
+
+        The one place requests are counted, apart from the duplicates a `Hedger` sends.
+        """
+        self.requests += 1
+        self.latencies.append(latency)
+        self.tokens += tokens
+        self.inputs += inputs
+
+
+async def _embed_with_retry(
+    client: Any,
+    batch: EmbeddingBatch,
+    *,
+    model: str,
+    dimensions: Optional[int],
+    limiter: RateLimiter,
+    retry: RetryPolicy,
+    stats: AsyncEmbedStats,
+    hedger: Optional[Hedger] = None,
+) -> list[list[float]]:
+    """🎻 Send one batch, retrying throttles and server errors per the policy (and hedging stragglers)."""
+    extra = {"dimensions": dimensions} if dimensions else {}
+
+    def create() -> Any:
+        return client.embeddings.create(input=batch.texts, model=model, **extra)
+
+    async def before_hedge() -> None:  # 🌙 a duplicate spends quota like any request
+        await limiter.acquire(batch.tokens)
+
+    for attempt in range(1, retry.max_attempts + 1):
+        await limiter.acquire(batch.tokens)
+        started = time.perf_counter()
+        try:
+            response = await (hedger.run(create, before_hedge=before_hedge) if hedger else create())
+        except Exception as e:
+            stats.record(time.perf_counter() - started)
+            retryable, retry_after = classify_error(e)
+            if not retryable or attempt == retry.max_attempts:
+                raise
+            if getattr(e, "status_code", None) == 429:
+                stats.throttled += 1
+            stats.retries += 1
+            await asyncio.sleep(retry.delay(attempt, retry_after))
+            continue
+        stats.record(time.perf_counter() - started, batch.tokens, len(batch))
+
+        data = sorted(response.data, key=lambda d: d.index)
+        if len(data) != len(batch.texts):
+            raise RuntimeError(f"Expected {len(batch.texts)} embeddings, got {len(data)}")
+        return [d.embedding for d in data]
+
+    raise AssertionError("unreachable")  # 🌙 the loop always returns or raises
+
+
+async def embed_texts_async(
+    client: Any,
+    texts: Sequence[str],
+    *,
+    model: str = EMBEDDING_MODEL,
+    dimensions: Optional[int] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+    tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+    max_items: int = DEFAULT_BATCH_ITEMS,
+    max_tokens: int = DEFAULT_BATCH_TOKENS,
+    retry: Optional[RetryPolicy] = None,
+    stats: Optional[AsyncEmbedStats] = None,
+    on_result: Optional[Callable[[int, list[float]], None]] = None,
+    hedge: Optional[HedgePolicy] = None,
+) -> Optional[list[list[float]]]:
+    """
+    🌟 Embed `texts` with at most `concurrency` requests in flight
+
+    `client` is an `openai.AsyncOpenAI` (or anything with an awaitable
+    `embeddings.create`); build it with `max_retries=0` so retries happen here.
+    The returned list lines up with `texts` by position. With `on_result`,
+    `on_result(position, vector)` fires as each batch lands instead, no
+    vector is kept, and None is returned: memory stays flat however many
+    texts stream through.
+    `dimensions` requests shortened embeddings (None → the model's native width).
+    With `hedge`, stragglers are duplicated per that policy (counted in `stats.hedged`).
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    retry = retry or RetryPolicy()
+    stats = stats if stats is not None else AsyncEmbedStats()
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    hedger = Hedger(hedge, stats=stats) if hedge else None
+    semaphore = asyncio.Semaphore(concurrency)
+    results: Optional[list[Optional[list[float]]]] = [None] * len(texts) if on_result is None else None
+    batches = list(pack_batches(enumerate(texts), max_items=max_items, max_tokens=max_tokens))
+    done = 0
+
+    async def run(batch: EmbeddingBatch) -> None:
+        nonlocal done
+        async with semaphore:
+            vectors = await _embed_with_retry(
+                client, batch, model=model, dimensions=dimensions, limiter=limiter, retry=retry, stats=stats,
+                hedger=hedger,
+            )
+        for position, vector in zip(batch.ids, vectors):
+            if results is not None:
+                results[position] = vector
+            else:
+                on_result(position, vector)
+        done += 1
+        print(f"🎪 📦 Batch {done}/{len(batches)} landed! ({len(batch)} chunks)")
+
+    tasks = [asyncio.create_task(run(batch)) for batch in batches]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    return results  # type: ignore[return-value]
@@ -0,0 +1,168 @@
+"""
+📦 The Batch Caravan — Many Chunks, One Round-Trip ✨
+
+"Why send a hundred messengers when one caravan
+ can carry every scroll across the desert at once?"
+
+`embeddings.create` accepts a list of inputs, so instead of paying one
+network round-trip per chunk we pack chunk texts into batches that stay
+under the per-request item and token limits, then map each returned
+vector back to the id it came from.
+
+ - The Cosmic Caravan Master
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterable, Iterator, Optional
+
+from .hedge import Hedger, HedgePolicy
+from .tokens import count_tokens
+
+if TYPE_CHECKING:
+    from .async_embed import AsyncEmbedStats
+    from .cache import EmbeddingCache
+
+# 🎭 Model + API ceilings (OpenAI embeddings endpoint)
+EMBEDDING_MODEL = "text-embedding-3-small"
+API_MAX_BATCH_ITEMS = 2048       # 🌙 hard cap on inputs per request
+API_MAX_BATCH_TOKENS = 300_000   # 🌙 hard cap on summed input tokens per request
+API_MAX_INPUT_TOKENS = 8191      # 🌙 hard cap on tokens in any one input
+
+# 🌟 Defaults sit comfortably below the ceilings so estimates can be a little off
+DEFAULT_BATCH_ITEMS = 256
+DEFAULT_BATCH_TOKENS = 100_000
+DEFAULT_MAX_INPUT_TOKENS = 8000  # 🌙 split longer inputs; headroom for the offline token approximation
+
+
+def estimate_tokens(text: str) -> int:
+    """🧮 Cheapest token estimate — roughly four characters per token for English prose."""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class EmbeddingBatch:
+    """💎 One caravan: the ids and texts travelling together, plus their token weight."""
+    ids: list[Hashable] = field(default_factory=list)
+    texts: list[str] = field(default_factory=list)
+    tokens: int = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def pack_batches(
+    items: Iterable[tuple[Hashable, str]],
+    *,
+    max_items: int = DEFAULT_BATCH_ITEMS,
+    max_tokens: int = DEFAULT_BATCH_TOKENS,
+    count_tokens: Callable[[str], int] = count_tokens,
+) -> Iterator[EmbeddingBatch]:
+    """
+    🎪 Greedily pack (id, text) pairs into batches under both limits
+
+    Order is preserved. A single text heavier than `max_tokens` still gets
+    its own batch — splitting oversize inputs (`tokens.split_by_tokens`) is
+    the caller's job.
+    """
+    if max_items < 1 or max_tokens < 1:
+        raise ValueError("max_items and max_tokens must be positive")
+    max_items = min(max_items, API_MAX_BATCH_ITEMS)
+    max_tokens = min(max_tokens, API_MAX_BATCH_TOKENS)
+
+    batch = EmbeddingBatch()
+    for item_id, text in items:
+        tokens = count_tokens(text)
+        if batch.ids and (len(batch) >= max_items or batch.tokens + tokens > max_tokens):
+            yield batch
+            batch = EmbeddingBatch()
+        batch.ids.append(item_id)
+        batch.texts.append(text)
+        batch.tokens += tokens
+
+    if batch.ids:
+        yield batch
+
+
+def embed_batch(
+    client: Any,
+    texts: list[str],
+    model: str = EMBEDDING_MODEL,
+    dimensions: Optional[int] = None,
+    hedger: Optional[Hedger] = None,
+) -> list[list[float]]:
+    """🔮 One request, many vectors — returned in the same order as `texts` (hedged when a `hedger` is given)."""
+    extra = {"dimensions": dimensions} if dimensions else {}
+
+    def create() -> Any:
+        return client.embeddings.create(input=texts, model=model, **extra)
+
+    response = hedger.call(create) if hedger else create()
+    data = sorted(response.data, key=lambda d: d.index)
+    if len(data) != len(texts):
+        raise RuntimeError(f"Expected {len(texts)} embeddings, got {len(data)}")
+    return [d.embedding for d in data]
+
+
+def embed_items(
+    client: Any,
+    items: Iterable[tuple[Hashable, str]],
+    *,
+    model: str = EMBEDDING_MODEL,
+    dimensions: Optional[int] = None,
+    max_items: int = DEFAULT_BATCH_ITEMS,
+    max_tokens: int = DEFAULT_BATCH_TOKENS,
+    on_error: Optional[Callable[[EmbeddingBatch, Exception], None]] = None,
+    cache: Optional["EmbeddingCache"] = None,
+    stats: Optional["AsyncEmbedStats"] = None,
+    hedge: Optional[HedgePolicy] = None,
+) -> dict[Hashable, list[float]]:
+    """
+    🌟 Embed every (id, text) pair in packed batches and map vectors back to ids
+
+    If `on_error` is given, a failed batch is reported there and skipped so the
+    rest of the run can continue; otherwise the exception propagates. With a
+    `cache`, already-embedded texts are served from it and only misses are sent.
+    `dimensions` requests shortened embeddings (None → the model's native width).
+    Each request's latency and tokens are recorded in `stats` when given.
+    With `hedge`, a request that outlasts the observed latency quantile is
+    duplicated per that policy and the first answer is used.
+    """
+    vectors: dict[Hashable, list[float]] = {}
+    if cache is not None:
+        misses = []
+        for item_id, text in items:
+            cached = cache.get(text)
+            if cached is None:
+                misses.append((item_id, text))
+            else:
+                vectors[item_id] = cached
+        items = misses
+
+    batches = list(pack_batches(items, max_items=max_items, max_tokens=max_tokens))
+    hedger = Hedger(hedge, stats=stats) if hedge else None
+
+    for number, batch in enumerate(batches, 1):
+        print(f"🎪 📦 Batch {number}/{len(batches)} entering the cosmic ring! "
+              f"({len(batch)} chunks, ~{batch.tokens:,} tokens)")
+        started = time.perf_counter()
+        try:
+            embeddings = embed_batch(client, batch.texts, model=model, dimensions=dimensions, hedger=hedger)
+        except Exception as e:
+            if stats is not None:
+                stats.record(time.perf_counter() - started)
+            if on_error is None:
+                raise
+            on_error(batch, e)
+            continue
+        if stats is not None:
+            stats.record(time.perf_counter() - started, batch.tokens, len(batch))
+        vectors.update(zip(batch.ids, embeddings))
+        if cache is not None:
+            for text, embedding in zip(batch.texts, embeddings):
+                cache.put(text, embedding)
+            cache.flush()
+
+    return vectors
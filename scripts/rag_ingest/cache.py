@@ -0,0 +1,172 @@
+"""
+💾 The Vector Vault — Never Pay Twice for the Same Wisdom ✨
+
+"What was crystallized once need not be crystallized again;
+ the vault remembers every scroll by the fingerprint of its words."
+
+A persistent SQLite cache of embeddings keyed by
+(model, dimensions, sha256 of the normalized text). All ingest scripts share
+one vault, so re-running after a small edit to the knowledge base only sends
+the new or changed chunks to the API. A shortened-width lookup that misses
+falls back to the full-width vector, truncated and renormalized locally.
+
+ - The Cosmic Vault Keeper
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .batching import EMBEDDING_MODEL
+from .dimensions import full_dimensions, resolve_dimensions, shorten_embedding
+
+# 🌟 One vault for every ingest ritual, at the project root (gitignored)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", PROJECT_ROOT / ".cache" / "embedding_cache.sqlite"))
+
+# 🌙 Commit after this many uncommitted writes so a crash loses little
+_COMMIT_EVERY = 64
+
+
+def normalize_text(text: str) -> str:
+    """🧹 Canonical form for hashing — NFC unicode, collapsed whitespace, trimmed ends."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text: str) -> str:
+    """🔑 sha256 fingerprint of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    🏛️ SQLite-backed embedding vault
+
+    Usage:
+        with EmbeddingCache(model="text-embedding-3-small", dimensions=1536) as cache:
+            vector = cache.get(text)
+            if vector is None:
+                vector = embed(text)
+                cache.put(text, vector)
+        print(cache.summary())
+    """
+
+    def __init__(
+        self,
+        path: Path | str = DEFAULT_CACHE_PATH,
+        *,
+        model: str = EMBEDDING_MODEL,
+        dimensions: Optional[int] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.model = model
+        self.dimensions = resolve_dimensions(model, dimensions)
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)  # 🌙 corpus workers share the file; wait out their commits
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                text_sha256 TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, dimensions, text_sha256)
+            )
+            """
+        )
+        self._conn.commit()
+
+    # ──────────────────────────────────────────────────────────────────────
+    # 🔮 Lookups and writes
+    # ──────────────────────────────────────────────────────────────────────
+
+    def _lookup(self, dimensions: int, digest: str) -> Optional[list[float]]:
+        row = self._conn.execute(
+            "SELECT vector FROM embeddings WHERE model = ? AND dimensions = ? AND text_sha256 = ?",
+            (self.model, dimensions, digest),
+        ).fetchone()
+        return array("d", row[0]).tolist() if row else None
+
+    def get(self, text: str) -> Optional[list[float]]:
+        """🔍 Return the cached vector for `text`, counting the hit or miss."""
+        digest = text_hash(text)
+        vector = self._lookup(self.dimensions, digest)
+        native = full_dimensions(self.model)
+        if vector is None and self.dimensions < native:
+            full = self._lookup(native, digest)
+            if full is not None:
+                vector = shorten_embedding(full, self.dimensions)
+                self.put(text, vector)
+        if vector is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return vector
+
+    def contains(self, text: str) -> bool:
+        """👀 Whether `get(text)` would hit — without reading the vector or counting."""
+        digest = text_hash(text)
+        widths = {self.dimensions, full_dimensions(self.model)}
+        return any(
+            self._conn.execute(
+                "SELECT 1 FROM embeddings WHERE model = ? AND dimensions = ? AND text_sha256 = ?",
+                (self.model, width, digest),
+            ).fetchone()
+            for width in widths
+        )
+
+    def partition(self, texts: Sequence[str]) -> tuple[list[int], list[int]]:
+        """
+        🔀 Split positions into (cached, missing) without loading any vectors
+
+        Misses are counted now; hits are counted when `get` later reads them,
+        so streaming callers can fetch cached vectors only when needed.
+        """
+        cached, missing = [], []
+        for position, text in enumerate(texts):
+            (cached if self.contains(text) else missing).append(position)
+        self.misses += len(missing)
+        return cached, missing
+
+    def put(self, text: str, vector: Sequence[float]) -> None:
+        """💎 Store a freshly minted vector."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO embeddings (model, dimensions, text_sha256, vector) VALUES (?, ?, ?, ?)",
+            (self.model, self.dimensions, text_hash(text), array("d", vector).tobytes()),
+        )
+        self._pending += 1
+        if self._pending >= _COMMIT_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """📜 Commit pending writes to disk."""
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        """🌙 Flush and close the vault."""
+        self.flush()
+        self._conn.close()
+
+    def summary(self) -> str:
+        """📊 One-line hit/miss report for the run log."""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"💾 Embedding cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+    def __enter__(self) -> "EmbeddingCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
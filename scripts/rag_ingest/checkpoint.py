@@ -0,0 +1,141 @@
+"""
+📔 The Expedition Logbook — Every Step Written Before the Next One Is Taken ✨
+
+"When the storm hits at mile four hundred,
+ the logbook remembers the first three hundred ninety-nine."
+
+A write-ahead checkpoint journal for long embedding runs: an append-only
+JSONL file holding one line per completed chunk (position, id, text hash,
+vector). `--resume` reopens it, keeps every entry whose text still matches
+the chunk at that position, and only the remainder is embedded again.
+Vectors are read back by byte offset when the final artifact is assembled,
+so resuming never loads the whole journal into memory.
+
+ - The Cosmic Expedition Chronicler
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from .cache import PROJECT_ROOT, text_hash
+
+JOURNAL_FORMAT = "rag-ingest-checkpoint/1"
+DEFAULT_CHECKPOINT_DIR = PROJECT_ROOT / ".cache" / "checkpoints"
+
+
+class CheckpointJournal:
+    """
+    📔 Append-only JSONL journal of completed chunks
+
+    Usage:
+        journal = CheckpointJournal(path, {"model": ..., "dimensions": ..., "source": ...})
+        restored = journal.open(texts, resume=True)   # positions already done
+        journal.append(position, chunk_id, text, vector)  # as each result lands
+        vector = journal.get(position)                  # when assembling output
+        journal.discard()                               # after a successful publish
+
+    The first line records `run_info`; a journal written for a different
+    model, width or source is never resumed.
+    """
+
+    def __init__(self, path: Path | str, run_info: dict[str, Any]) -> None:
+        self.path = Path(path)
+        self.run_info = {"journal": JOURNAL_FORMAT, **run_info}
+        self._offsets: dict[int, int] = {}
+        self._file = None
+
+    def _scan(self, texts: Sequence[str]) -> int:
+        """🔍 Index valid entries; return the byte length of the intact prefix."""
+        good_end = 0
+        with open(self.path, "rb") as f:
+            first = f.readline()
+            try:
+                if json.loads(first) != self.run_info:
+                    return 0
+            except json.JSONDecodeError:
+                return 0
+            good_end = f.tell()
+
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # 🌙 EOF, or a torn final line from a crash mid-write
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                good_end = f.tell()
+                position = entry["position"]
+                if position < len(texts) and entry["sha256"] == text_hash(texts[position]):
+                    self._offsets[position] = offset
+        return good_end
+
+    def open(self, texts: Sequence[str], *, resume: bool = False) -> list[int]:
+        """
+        📖 Start (or resume) the journal for this run's chunk `texts`
+
+        Returns the positions restored from a previous run — empty unless
+        `resume` is set and the journal belongs to the same run configuration.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._offsets.clear()
+        good_end = self._scan(texts) if resume and self.path.exists() else 0
+
+        if good_end:
+            self._file = open(self.path, "r+b")
+            self._file.truncate(good_end)
+            self._file.seek(good_end)
+        else:
+            self._offsets.clear()
+            self._file = open(self.path, "wb")
+            self._file.write(json.dumps(self.run_info).encode("utf-8") + b"\n")
+            self._file.flush()
+        return sorted(self._offsets)
+
+    def peek(self, texts: Sequence[str]) -> list[int]:
+        """👀 The positions `open(texts, resume=True)` would restore, without touching the file."""
+        self._offsets.clear()
+        if self.path.exists():
+            self._scan(texts)
+        return sorted(self._offsets)
+
+    def append(self, position: int, chunk_id: str, text: str, vector: Sequence[float]) -> None:
+        """✍️ Record one completed chunk (flushed immediately, so a crash keeps it)."""
+        offset = self._file.tell()
+        line = json.dumps({"position": position, "id": chunk_id, "sha256": text_hash(text), "embedding": list(vector)})
+        self._file.write(line.encode("utf-8") + b"\n")
+        self._file.flush()
+        self._offsets[position] = offset
+
+    def get(self, position: int) -> Optional[list[float]]:
+        """🔮 Read one journaled vector back by offset (None if not journaled)."""
+        offset = self._offsets.get(position)
+        if offset is None:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())["embedding"]
+
+    def __contains__(self, position: int) -> bool:
+        return position in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def close(self) -> None:
+        """🌙 Flush to disk and close; the journal stays for a later `--resume`."""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """🧹 Close and delete — the run is published, nothing left to resume."""
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,113 @@
+"""
+🪪 The Chunk Registrar — Names That Survive a New Paragraph ✨
+
+"Number the scrolls by shelf position and one new scroll renames the library;
+ name them by what they say, and only the new one needs a name."
+
+Chunk ids used to be positions (`chunk_17`), so one paragraph inserted near
+the front renumbered every later chunk. That invalidated anything keyed by
+id: caches, indexes, `duplicate_of` and `parent_id` links. Ids are now
+derived from the chunk itself:
+
+    <doc id>:p<start page>-<end page>:<first 12 hex of the normalized-text sha256>
+
+    four-blocks-paperback-book-full:p12-13:9f2c4e1ab07d
+
+An unchanged chunk keeps its id however the chunks around it change. The
+hash is the embedding cache's `text_hash`, so whitespace-only edits keep
+ids too. If the same text appears twice on the same pages, the repeats get
+`~2`, `~3`, ... in order. Parts of a split chunk are `<chunk id>.1`, `.2`, ...
+
+`diff_chunk_ids` compares one run's ids with the last run's and reports
+which chunks were added, removed or unchanged. `write_chunk_diff` saves that
+beside the output (`embeddings.diff.json`).
+
+ - The Cosmic Registrar
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+
+from .cache import text_hash
+from .store import store_paths
+
+ID_HASH_CHARS = 12  # 🌙 48 bits: collisions need ~16M chunks in one document's page span
+
+
+def stable_chunk_id(doc_id: str, text: str, start_page: int, end_page: int) -> str:
+    """🪪 `<doc_id>:p<start>-<end>:<hash>` for one chunk."""
+    return f"{doc_id}:p{start_page}-{end_page}:{text_hash(text)[:ID_HASH_CHARS]}"
+
+
+def assign_chunk_ids(doc_id: str, chunks: Iterable[tuple[str, int, int]]) -> list[str]:
+    """🏷️ Stable ids for (text, start_page, end_page) chunks, in order; repeats get `~2`, `~3`, ..."""
+    seen: Counter[str] = Counter()
+    ids = []
+    for text, start_page, end_page in chunks:
+        chunk_id = stable_chunk_id(doc_id, text, start_page, end_page)
+        seen[chunk_id] += 1
+        ids.append(chunk_id if seen[chunk_id] == 1 else f"{chunk_id}~{seen[chunk_id]}")
+    return ids
+
+
+def load_chunk_ids(json_path: Path | str) -> Optional[list[str]]:
+    """
+    📖 The chunk ids of an existing embeddings.json (None if there is none)
+
+    Reads the binary store's sidecar when it is newer than the JSON,
+    so the vectors never have to be parsed.
+    """
+    json_path = Path(json_path)
+    if not json_path.exists():
+        return None
+    meta_path = store_paths(json_path)[1]
+    if meta_path.exists() and meta_path.stat().st_mtime_ns > json_path.stat().st_mtime_ns:
+        with open(meta_path, encoding="utf-8") as f:
+            return list(json.load(f)["ids"])
+    with open(json_path, encoding="utf-8") as f:
+        return [chunk["id"] for chunk in json.load(f).get("chunks", [])]
+
+
+def diff_chunk_ids(previous: Optional[Sequence[str]], current: Sequence[str]) -> dict[str, Any]:
+    """🔁 Added, removed and unchanged ids between two runs (every id is `added` on a first run)."""
+    before, after = set(previous or ()), set(current)
+    added = [chunk_id for chunk_id in current if chunk_id not in before]
+    removed = [chunk_id for chunk_id in previous or () if chunk_id not in after]
+    unchanged = [chunk_id for chunk_id in current if chunk_id in before]
+    return {
+        "previous_run": previous is not None,
+        "counts": {"added": len(added), "removed": len(removed), "unchanged": len(unchanged)},
+        "added": added,
+        "removed": removed,
+        "unchanged": unchanged,
+    }
+
+
+def diff_path(output_path: Path | str) -> Path:
+    """📍 `embeddings.json` → `embeddings.diff.json`"""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}.diff.json")
+
+
+def format_diff(diff: dict[str, Any]) -> str:
+    """📋 One line for the run log."""
+    counts = diff["counts"]
+    if not diff["previous_run"]:
+        return f"🔁 No previous run to compare with: {counts['added']} chunks, all new"
+    return (f"🔁 Since the previous run: +{counts['added']} added, -{counts['removed']} removed, "
+            f"{counts['unchanged']} unchanged")
+
+
+def write_chunk_diff(output_path: Path | str, previous: Optional[Sequence[str]], current: Sequence[str]) -> Path:
+    """💾 Diff this run's ids against `previous` and save the report beside `output_path`."""
+    diff = diff_chunk_ids(previous, current)
+    path = diff_path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(diff, f, indent=2)
+    print(format_diff(diff))
+    return path
@@ -0,0 +1,144 @@
+"""
+🧩 The Chunking Engine — One Interface, Many Ways to Slice a Book ✨
+
+"The knife matters less than knowing why you cut there."
+
+Every chunking strategy the ingest scripts use (or might) behind one
+interface: `chunker.chunk(pages)` consumes `PageText`s lazily and yields
+`PageChunk`s with page provenance.
+
+    char      fixed character windows   (ingest_pdf_rag.py: 500 / 100)
+    word      whitespace-word windows   (process_book.py: 1000 / 100)
+    token     tokenizer-token windows
+    sentence  whole sentences packed to a budget, closing at paragraph ends
+    heading   sentence packing that also starts a chunk at each heading and
+              records the section title
+
+Strategies are named by spec strings — `"sentence"`, `"token:size=256,overlap=32"` —
+so scripts and the benchmark (`scripts/bench_chunking.py`) take them from the
+command line.
+
+ - The Cosmic Slicing Engineer
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import ClassVar, Iterable, Iterator, Protocol
+
+from .page_chunks import (
+    PageChunk,
+    iter_char_windows,
+    iter_sentence_chunks,
+    iter_token_windows,
+    iter_word_windows,
+)
+from .pdf_extract import PageText
+from .tokens import DEFAULT_ENCODING, get_tokenizer
+
+
+class Chunker(Protocol):
+    """🧩 Anything that turns a page stream into chunks."""
+    name: ClassVar[str]
+
+    def chunk(self, pages: Iterable[PageText]) -> Iterator[PageChunk]: ...
+
+
+@dataclass
+class CharWindowChunker:
+    """🌊 `size`-character windows sharing `overlap` characters."""
+    name: ClassVar[str] = "char"
+    size: int = 500
+    overlap: int = 100
+    min_chars: int = 80
+
+    def chunk(self, pages: Iterable[PageText]) -> Iterator[PageChunk]:
+        return iter_char_windows(pages, size=self.size, overlap=self.overlap, min_chars=self.min_chars)
+
+
+@dataclass
+class WordWindowChunker:
+    """🌊 `size`-word windows sharing `overlap` words."""
+    name: ClassVar[str] = "word"
+    size: int = 1000
+    overlap: int = 100
+    min_chars: int = 50
+
+    def chunk(self, pages: Iterable[PageText]) -> Iterator[PageChunk]:
+        return iter_word_windows(pages, size=self.size, overlap=self.overlap, min_chars=self.min_chars)
+
+
+@dataclass
+class TokenWindowChunker:
+    """🌊 `size`-token windows sharing `overlap` tokens (tiktoken, or its offline approximation)."""
+    name: ClassVar[str] = "token"
+    size: int = 128
+    overlap: int = 0
+    min_chars: int = 80
+    encoding: str = DEFAULT_ENCODING
+
+    def chunk(self, pages: Iterable[PageText]) -> Iterator[PageChunk]:
+        return iter_token_windows(
+            pages, get_tokenizer(self.encoding), size=self.size, overlap=self.overlap, min_chars=self.min_chars
+        )
+
+
+@dataclass
+class SentenceChunker:
+    """📜 Whole sentences up to `max_chars`, closing early at paragraph ends."""
+    name: ClassVar[str] = "sentence"
+    max_chars: int = 500
+    overlap: int = 0
+    min_chars: int = 80
+
+    def chunk(self, pages: Iterable[PageText]) -> Iterator[PageChunk]:
+        return iter_sentence_chunks(
+            pages, max_chars=self.max_chars, overlap=self.overlap, min_chars=self.min_chars
+        )
+
+
+@dataclass
+class HeadingChunker:
+    """🏷️ Sentence packing that never crosses a heading and labels each chunk's section."""
+    name: ClassVar[str] = "heading"
+    max_chars: int = 500
+    overlap: int = 0
+    min_chars: int = 80
+
+    def chunk(self, pages: Iterable[PageText]) -> Iterator[PageChunk]:
+        return iter_sentence_chunks(
+            pages, max_chars=self.max_chars, overlap=self.overlap, min_chars=self.min_chars, headings=True
+        )
+
+
+STRATEGIES: dict[str, type] = {
+    cls.name: cls
+    for cls in (CharWindowChunker, WordWindowChunker, TokenWindowChunker, SentenceChunker, HeadingChunker)
+}
+
+
+def make_chunker(spec: str) -> Chunker:
+    """
+    🔮 Build a chunker from a spec string: `name` or `name:key=value,...`
+
+        make_chunker("char:size=500,overlap=100")
+        make_chunker("heading:max_chars=800")
+    """
+    name, _, params = spec.partition(":")
+    if name not in STRATEGIES:
+        raise ValueError(f"unknown chunking strategy {name!r} (choose from {', '.join(STRATEGIES)})")
+    cls = STRATEGIES[name]
+    types = {f.name: f.type for f in fields(cls)}
+    kwargs = {}
+    for pair in filter(None, params.split(",")):
+        key, sep, value = pair.partition("=")
+        if not sep or key not in types:
+            raise ValueError(f"bad parameter {pair!r} for {name} (known: {', '.join(types)})")
+        kwargs[key] = value if types[key] == "str" else int(value)
+    return cls(**kwargs)
+
+
+def describe(chunker: Chunker) -> str:
+    """🏷️ The spec string that rebuilds `chunker`."""
+    params = ",".join(f"{f.name}={getattr(chunker, f.name)}" for f in fields(chunker))
+    return f"{chunker.name}:{params}"
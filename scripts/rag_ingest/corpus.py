@@ -0,0 +1,205 @@
+"""
+📚 The Corpus Librarian — Many Scrolls, One Index ✨
+
+"A library is not one long book;
+ shelve each volume on its own, then write one catalogue."
+
+Corpus mode ingests many source documents at once. Each document runs the
+full pipeline in its own worker and writes its own shard: an ordinary
+`embeddings.json` whose stable chunk ids start with the document's id
+(`batch-1-json-anger:p1-1:9f2c4e1ab07d`). `merge_shards` then streams the
+shards, in document order, into the combined index. Ingest time follows the
+largest document and the core count, not the total corpus size.
+
+Documents are PDFs (extracted page by page) or plain text files (`.txt`,
+`.md`, `.json`), which are read as a single page. A doc id is the
+document's path relative to the common root of all sources, slugified:
+`content/training/batch-1/json_anger.txt` → `batch-1-json-anger`.
+
+Near-duplicates are removed per document inside the workers; the merge can
+also catch duplicates *across* documents (the same file checked into two
+batches, say). Those chunks were already embedded, but they stay out of the
+index.
+
+ - The Cosmic Librarian
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence
+
+from .cache import PROJECT_ROOT
+from .dedup import DEFAULT_THRESHOLD, find_near_duplicates, write_dedup_log
+from .pdf_extract import PageText, iter_pages
+from .store import BinaryStoreWriter, remove_binary_store
+from .writer import StreamingEmbeddingsWriter
+
+if TYPE_CHECKING:
+    from .page_cache import PageCache
+
+DOCUMENT_SUFFIXES = (".pdf", ".txt", ".md", ".json")
+DEFAULT_SHARD_DIR = PROJECT_ROOT / ".cache" / "corpus"
+
+
+@dataclass(frozen=True)
+class Document:
+    """📄 One source document and its corpus-unique id."""
+    doc_id: str
+    path: Path
+
+
+def _expand(source: str | Path) -> list[Path]:
+    """🔎 A file, every supported file under a directory, or the matches of a glob."""
+    path = Path(source)
+    if path.is_dir():
+        return [p for p in sorted(path.rglob("*")) if p.is_file() and p.suffix.lower() in DOCUMENT_SUFFIXES]
+    if path.is_file():
+        return [path]
+    return [Path(p) for p in sorted(glob.glob(str(source), recursive=True)) if Path(p).is_file()]
+
+
+def slugify(text: str) -> str:
+    """🏷️ Lowercase, with every run of other characters collapsed to one `-`."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def discover_documents(sources: Sequence[str | Path]) -> list[Document]:
+    """
+    📚 Every document named by `sources` (files, directories, globs), each once, with its doc id
+
+    Raises ValueError when nothing matches, or when two paths slugify to the same id.
+    """
+    paths = list(dict.fromkeys(p.resolve() for source in sources for p in _expand(source)))
+    if not paths:
+        raise ValueError(f"no documents ({', '.join(DOCUMENT_SUFFIXES)}) found in {list(map(str, sources))}")
+    root = Path(os.path.commonpath([p.parent for p in paths]))
+    documents, seen = [], {}
+    for path in paths:
+        doc_id = slugify(str(path.relative_to(root).with_suffix(""))) or "document"
+        if doc_id in seen:
+            raise ValueError(f"{path} and {seen[doc_id]} would share the doc id {doc_id!r}")
+        seen[doc_id] = path
+        documents.append(Document(doc_id, path))
+    return documents
+
+
+def iter_document_pages(
+    path: Path | str,
+    *,
+    workers: Optional[int] = None,
+    cache: Optional["PageCache"] = None,
+) -> Iterator[PageText]:
+    """🌊 A PDF's pages via `iter_pages`; any other document as one page of text."""
+    path = Path(path)
+    if path.suffix.lower() == ".pdf":
+        yield from iter_pages(path, workers=workers, cache=cache)
+    else:
+        yield PageText(1, path.read_text(encoding="utf-8", errors="replace"))
+
+
+def shard_path(shard_dir: Path | str, doc_id: str) -> Path:
+    """📍 Where the shard of `doc_id` is written."""
+    return Path(shard_dir) / f"{doc_id}.json"
+
+
+def merge_shards(
+    shards: Sequence[Path | str],
+    output_paths: Sequence[Path | str],
+    *,
+    metadata: Optional[dict[str, Any]] = None,
+    binary: bool = False,
+    dedup: str = "off",
+    dedup_threshold: float = DEFAULT_THRESHOLD,
+    dedup_log_path: Optional[Path] = None,
+) -> dict[str, Any]:
+    """
+    🧵 Stream `shards` (in order) into one embeddings.json, teed to every `output_paths` entry
+
+    All shards must share the model and dimensions. `chapters` and
+    `total_chunks` are recounted; `metadata.documents` lists each shard's doc
+    id, source and chunk count. With `dedup` (`drop`/`flag`), chunks that
+    nearly repeat a chunk of an *earlier document* are dropped or flagged.
+    With `binary`, the float32 store is written beside the first output path;
+    without it, any store left there by an earlier run is removed.
+    Returns the footer that was written.
+    """
+    headers, texts, owners = [], [], []
+    for number, shard in enumerate(shards):
+        with open(shard, encoding="utf-8") as f:
+            data = json.load(f)
+        headers.append({key: value for key, value in data.items() if key != "chunks"})
+        texts.extend(chunk["text"] for chunk in data["chunks"])
+        owners.extend([number] * len(data["chunks"]))
+    if not headers:
+        raise ValueError("no shards to merge")
+    for shard, header in zip(shards, headers):
+        if (header["model"], header["dimensions"]) != (headers[0]["model"], headers[0]["dimensions"]):
+            raise ValueError(f"{shard} was embedded with {header['model']}/{header['dimensions']}, "
+                             f"not {headers[0]['model']}/{headers[0]['dimensions']}")
+
+    duplicate_of: dict[int, int] = {}
+    if dedup != "off":
+        duplicates = [d for d in find_near_duplicates(texts, dedup_threshold) if owners[d.duplicate_of] != owners[d.position]]
+        duplicate_of = {d.position: d.duplicate_of for d in duplicates}
+        if dedup_log_path:
+            write_dedup_log(dedup_log_path, duplicates, [{"text": text[:200], "shard": str(shards[owner])}
+                                                         for text, owner in zip(texts, owners)])
+    dropped = set(duplicate_of) if dedup == "drop" else set()
+
+    header = {"version": headers[0].get("version", "3.0"), "model": headers[0]["model"],
+              "dimensions": headers[0]["dimensions"]}
+    json_writer = StreamingEmbeddingsWriter(output_paths, header)
+    binary_writer = BinaryStoreWriter(output_paths[0], len(texts) - len(dropped), header["dimensions"]) if binary else None
+    block_counts: Counter[str] = Counter()
+    documents = []
+    position = 0
+    ids: list[str] = []
+    try:
+        for shard, shard_header in zip(shards, headers):
+            with open(shard, encoding="utf-8") as f:
+                chunks = json.load(f)["chunks"]
+            written = 0
+            for chunk in chunks:
+                ids.append(chunk["id"])
+                if position in duplicate_of and position not in dropped:
+                    chunk["metadata"]["duplicate_of"] = ids[duplicate_of[position]]
+                if position not in dropped:
+                    json_writer.write_chunk(chunk)
+                    if binary_writer:
+                        binary_writer.write_chunk(chunk)
+                    block_counts[chunk.get("block_type", "General")] += 1
+                    written += 1
+                position += 1
+            shard_metadata = shard_header.get("metadata", {})
+            documents.append({
+                "doc_id": shard_metadata.get("doc_id", Path(shard).stem),
+                "source": shard_metadata.get("source", str(shard)),
+                "chunks": written,
+            })
+
+        footer = {
+            "total_chunks": json_writer.count,
+            "chapters": [
+                {"code": k[:3].upper() if len(k) >= 3 else k, "name": k, "count": v}
+                for k, v in sorted(block_counts.items())
+            ],
+            "metadata": {**(metadata or {}), "documents": documents},
+        }
+        json_writer.close(footer)
+        if binary_writer:
+            binary_writer.close({**header, **footer}, json_sha256=json_writer.sha256)
+        else:
+            remove_binary_store(output_paths[0])  # 🌙 an older store would describe the old JSON
+    except BaseException:
+        json_writer.abort()
+        if binary_writer:
+            binary_writer.abort()
+        raise
+    return footer
@@ -0,0 +1,147 @@
+"""
+👯 The Twin Finder — Never Embed the Same Passage Twice ✨
+
+"Two scrolls that say the same thing
+ deserve one place on the shelf, not two."
+
+Near-duplicate detection between chunking and embedding. Each chunk becomes
+a set of word shingles: runs of 3 consecutive lowercased words, with edge
+punctuation trimmed, each hashed to 64 bits. Character shingles were tried
+first. The paperback's glyph-coded passages ("(cid:72)(cid:85)...") share
+most of their 5-character windows, so they scored as near-duplicates of one
+another; as words they are distinct. A MinHash signature summarizes the set.
+LSH banding puts chunks that agree on any band of signature rows into one
+bucket, so only bucket-mates are compared. Every candidate pair is then
+checked against its exact shingle Jaccard, which means nothing is called a
+duplicate unless it really reaches `threshold`. Time is linear in the
+corpus, plus the (few) candidate pairs.
+
+Chunks are visited in order. A chunk is a duplicate of its most similar
+kept chunk (the earliest on ties), so the first copy always survives. Duplicates are
+never compared against each other, which stops A~B~C chains.
+
+ - The Cosmic Twin Spotter
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import string
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from .cache import PROJECT_ROOT
+
+DEFAULT_THRESHOLD = 0.9  # 🎯 Jaccard at or above this is a near-duplicate
+DEFAULT_NUM_PERM = 128
+SHINGLE_WORDS = 3
+DEDUP_MODES = ("off", "flag", "drop")
+DEFAULT_DEDUP_LOG_DIR = PROJECT_ROOT / ".cache" / "dedup"
+
+_MIX_SEED = 0x5EED_F00D  # 🌙 fixed, so the same corpus always hashes the same way
+
+
+@dataclass(frozen=True)
+class Duplicate:
+    """👯 Chunk `position` matches the kept chunk `duplicate_of` with exact `jaccard`."""
+    position: int
+    duplicate_of: int
+    jaccard: float
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> np.ndarray:
+    """🧩 Sorted unique 64-bit hashes of every `size`-word run in `text` (the whole text if shorter)."""
+    words = [word.strip(string.punctuation) for word in text.lower().split()]
+    words = [word for word in words if word]
+    runs = {" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))} if words else set()
+    hashes = [int.from_bytes(hashlib.blake2b(run.encode("utf-8"), digest_size=8).digest(), "big") for run in runs]
+    return np.unique(np.array(hashes, dtype=np.uint64))
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """📏 Exact Jaccard similarity of two sorted unique shingle arrays."""
+    if not len(a) and not len(b):
+        return 1.0
+    common = len(np.intersect1d(a, b, assume_unique=True))
+    return common / (len(a) + len(b) - common)
+
+
+def lsh_bands(threshold: float, num_perm: int = DEFAULT_NUM_PERM) -> tuple[int, int]:
+    """
+    🎚️ (bands, rows) whose banding S-curve, (1/bands)^(1/rows), sits just below `threshold`
+
+    Leaning low favors recall; the exact Jaccard check removes the extra candidates.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class MinHasher:
+    """🎲 `num_perm` multiply-shift hash functions over packed shingles."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = _MIX_SEED) -> None:
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: np.ndarray) -> np.ndarray:
+        """✍️ Minimum of each hash over the set (uint64 wraparound is the point)."""
+        if not len(shingle_set):
+            return np.full(len(self._a), np.iinfo(np.uint64).max, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            hashed = (self._a[:, None] * shingle_set[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1)
+
+
+def find_near_duplicates(
+    texts: Sequence[str],
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+) -> list[Duplicate]:
+    """🔍 Every chunk whose exact shingle Jaccard with an earlier kept chunk is >= `threshold`."""
+    if not 0 < threshold <= 1:
+        raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+    hasher = MinHasher(num_perm)
+    bands, rows = lsh_bands(threshold, num_perm)
+    buckets: list[dict[bytes, list[int]]] = [defaultdict(list) for _ in range(bands)]
+    sets: list[np.ndarray] = []
+    duplicates: list[Duplicate] = []
+
+    for position, text in enumerate(texts):
+        shingle_set = shingles(text)
+        sets.append(shingle_set)
+        keys = [band.tobytes() for band in hasher.signature(shingle_set).reshape(bands, rows)]
+
+        candidates = {kept for band, key in zip(buckets, keys) for kept in band.get(key, ())}
+        match = max(((jaccard(shingle_set, sets[kept]), -kept) for kept in candidates), default=None)
+        if match and match[0] >= threshold:
+            duplicates.append(Duplicate(position, -match[1], round(match[0], 4)))
+            continue
+        for band, key in zip(buckets, keys):  # 🌙 only kept chunks are indexed
+            band[key].append(position)
+    return duplicates
+
+
+def write_dedup_log(path: Path | str, duplicates: Sequence[Duplicate], records: Sequence[dict]) -> None:
+    """📝 One JSONL line per duplicate: the match, plus `records[...]` (pages, text) for both chunks."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for duplicate in duplicates:
+            entry = {
+                **asdict(duplicate),
+                "chunk": records[duplicate.position],
+                "kept": records[duplicate.duplicate_of],
+            }
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
@@ -0,0 +1,60 @@
+"""
+📏 The Dimension Tailor — Trim the Cloak, Keep the Shape ✨
+
+"The text-embedding-3 family nests its meaning front to back:
+ cut the tail, restore the unit length, and the constellation holds."
+
+Helpers for shortened embeddings. The API can return them directly via its
+`dimensions` parameter; for vectors we already hold at full width (e.g. in
+the cache) the equivalent is to truncate and renormalize locally.
+
+ - The Cosmic Dimension Tailor
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence
+
+# 🎭 Native widths of the embedding models we use
+MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+# 🌙 ada-002 predates shortened embeddings and rejects the `dimensions` parameter
+SHORTENABLE_MODELS = frozenset({"text-embedding-3-small", "text-embedding-3-large"})
+
+
+def full_dimensions(model: str) -> int:
+    """📐 The model's native embedding width."""
+    try:
+        return MODEL_DIMENSIONS[model]
+    except KeyError:
+        raise ValueError(f"Unknown embedding model {model!r}; add it to MODEL_DIMENSIONS") from None
+
+
+def resolve_dimensions(model: str, dimensions: Optional[int]) -> int:
+    """🎛️ Validate a requested width (None → native width)."""
+    native = full_dimensions(model)
+    if dimensions is None or dimensions == native:
+        return native
+    if model not in SHORTENABLE_MODELS:
+        raise ValueError(f"{model} does not support shortened embeddings")
+    if not 1 <= dimensions <= native:
+        raise ValueError(f"dimensions must be between 1 and {native} for {model}, got {dimensions}")
+    return dimensions
+
+
+def api_dimensions(model: str, dimensions: Optional[int]) -> Optional[int]:
+    """🔮 The value to send as `dimensions=` — None when the native width is wanted."""
+    resolved = resolve_dimensions(model, dimensions)
+    return None if resolved == full_dimensions(model) else resolved
+
+
+def shorten_embedding(vector: Sequence[float], dimensions: int) -> list[float]:
+    """✂️ Truncate to `dimensions` and renormalize to unit length."""
+    head = list(vector[:dimensions])
+    norm = math.sqrt(sum(v * v for v in head))
+    return [v / norm for v in head] if norm else head
@@ -0,0 +1,213 @@
+"""
+🏇 The Second Rider — Send Another Messenger When the First Is Late ✨
+
+"If the messenger is not back by the time nineteen in twenty return,
+ send a second on a fresh horse; whoever arrives first is believed."
+
+Most embedding requests return in a few hundred milliseconds, but a few
+hang for tens of seconds before succeeding, and those stragglers set a
+run's end-to-end time. A hedged request waits for the primary only up to
+the observed p95 latency (`quantile`). If it has not answered by then, an
+identical duplicate is sent, the first *successful* response wins, and the
+loser is cancelled (async) or abandoned (threads).
+
+Hedges cost requests and tokens, so they are budgeted: at most `budget`
+extra requests per request sent (0.05 → never more than 5% extra). There
+is no hedging until `min_samples` latencies are known, and never sooner
+than `min_delay`. A request that *fails* before the deadline is not
+hedged; failures are the retry policy's business.
+
+    hedger = Hedger(HedgePolicy(quantile=0.95, budget=0.05), stats=stats)
+    response = await hedger.run(lambda: client.embeddings.create(...))   # async clients
+    response = hedger.call(lambda: client.embeddings.create(...))        # sync clients
+
+ - The Cosmic Stablemaster
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, TypeVar
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .async_embed import AsyncEmbedStats
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """🏇 When to send a duplicate request, and how many duplicates a run may afford."""
+    quantile: float = 0.95   # 🌙 hedge once a request outlasts this quantile of observed latencies
+    budget: float = 0.05     # 🌙 max extra requests, as a fraction of requests sent
+    min_samples: int = 20    # 🌙 latencies needed before the quantile is trusted
+    window: int = 1000       # 🌙 most recent latencies the quantile is taken over
+    min_delay: float = 0.05  # 🌙 never hedge sooner than this many seconds
+
+    def __post_init__(self) -> None:
+        if not 0 < self.quantile < 1:
+            raise ValueError(f"hedge quantile must be between 0 and 1, got {self.quantile}")
+        if self.budget < 0:
+            raise ValueError(f"hedge budget must not be negative, got {self.budget}")
+
+
+def _spawn(fn: Callable[[], T]) -> "Future[T]":
+    """🧵 Run `fn` on a daemon thread, so an abandoned straggler never holds up interpreter exit."""
+    future: Future[T] = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+class Hedger:
+    """
+    🏇 Shared by every request of one run: it learns the latency quantile and spends the hedge budget
+
+    Counts `requests`, `hedged` (duplicates sent) and `wins` (duplicates that
+    answered first). With `stats`, each duplicate is also recorded there as an
+    attempt, and `stats.hedged` / `stats.hedge_wins` are kept in step.
+    """
+
+    def __init__(self, policy: Optional[HedgePolicy] = None, *, stats: Optional["AsyncEmbedStats"] = None) -> None:
+        self.policy = policy or HedgePolicy()
+        self.stats = stats
+        self.requests = 0
+        self.hedged = 0
+        self.wins = 0
+        self._latencies: collections.deque[float] = collections.deque(maxlen=self.policy.window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """⏱️ Remember one request's latency."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def delay(self) -> Optional[float]:
+        """⏳ Seconds to wait before hedging (None while too few latencies are known)."""
+        with self._lock:
+            if len(self._latencies) < self.policy.min_samples:
+                return None
+            latencies = list(self._latencies)
+        return max(self.policy.min_delay, float(np.quantile(latencies, self.policy.quantile)))
+
+    def _affordable(self) -> bool:
+        return self.hedged + 1 <= self.policy.budget * self.requests
+
+    def _take_budget(self) -> bool:
+        """💸 Claim one hedge, if the budget allows it."""
+        with self._lock:
+            if not self._affordable():
+                return False
+            self.hedged += 1
+        if self.stats is not None:
+            self.stats.requests += 1
+            self.stats.hedged += 1
+        return True
+
+    def _start(self) -> Optional[float]:
+        """🚦 Count a request; the hedge deadline, or None when no hedge could be sent anyway."""
+        with self._lock:
+            self.requests += 1
+            affordable = self._affordable()
+        return self.delay() if affordable else None
+
+    def _won(self) -> None:
+        with self._lock:
+            self.wins += 1
+        if self.stats is not None:
+            self.stats.hedge_wins += 1
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        *,
+        before_hedge: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> T:
+        """
+        🏇 Await `call()`, hedging with a second `call()` once it outlasts the deadline
+
+        `before_hedge` is awaited before the duplicate goes out (e.g. to take
+        a rate-limiter slot). The loser is cancelled.
+        """
+        deadline = self._start()
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(call())
+        tasks = {primary}
+        hedge = None
+        try:
+            if deadline is not None:
+                done, _ = await asyncio.wait(tasks, timeout=deadline)
+                if not done and self._take_budget():
+                    if before_hedge is not None:
+                        await before_hedge()
+                    hedge = asyncio.ensure_future(call())
+                    tasks.add(hedge)
+            pending, failures = set(tasks), []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: t is not primary):  # 🌙 on a tie, the primary wins
+                    if task.exception() is None:
+                        self.observe(time.perf_counter() - started)
+                        if task is hedge:
+                            self._won()
+                        return task.result()
+                    failures.append(task.exception())
+            raise failures[0]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """
+        🏇 `fn()`, hedged with a second `fn()` on another thread once it outlasts the deadline
+
+        Threads cannot be cancelled: a losing request finishes (or times
+        out) on its daemon thread and its result is dropped. While no hedge
+        could be sent, `fn` simply runs on the calling thread.
+        """
+        deadline = self._start()
+        started = time.perf_counter()
+        if deadline is None:
+            result = fn()
+            self.observe(time.perf_counter() - started)
+            return result
+        primary = _spawn(fn)
+        futures = {primary}
+        hedge = None
+        done, _ = wait(futures, timeout=deadline)
+        if not done and self._take_budget():
+            hedge = _spawn(fn)
+            futures.add(hedge)
+        pending, failures = set(futures), []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: f is not primary):
+                if future.exception() is None:
+                    self.observe(time.perf_counter() - started)
+                    if future is hedge:
+                        self._won()
+                    return future.result()
+                failures.append(future.exception())
+        raise failures[0]
+
+    def summary(self) -> str:
+        """📋 One line for the run log."""
+        delay = self.delay()
+        deadline = f"p{self.policy.quantile * 100:g} deadline {delay * 1000:.0f} ms" if delay else "no deadline yet"
+        return f"🏇 {self.hedged} hedged of {self.requests} requests ({self.wins} won; {deadline})"
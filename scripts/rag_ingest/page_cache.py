@@ -0,0 +1,129 @@
+"""
+🗂️ The Page Archive — Every Page Read Once, Remembered by Fingerprint ✨
+
+"The scribe who copies the same book twice
+ has forgotten where he shelved the first copy."
+
+A persistent SQLite cache of extracted PDF page text keyed by
+(sha256 of the PDF bytes, extractor version, page number). `iter_pages`
+consults it before parsing, so re-running an ingest script on an unchanged
+book skips pdfplumber entirely and chunking experiments start in seconds.
+Editing the PDF changes its hash; upgrading pdfplumber or bumping
+`EXTRACTOR_VERSION` changes the extractor key — either way stale text is
+never served.
+
+ - The Cosmic Page Archivist
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+from .cache import PROJECT_ROOT
+from .pdf_extract import EXTRACTOR_VERSION, PageText
+
+DEFAULT_PAGE_CACHE_PATH = Path(os.getenv("PAGE_CACHE_PATH", PROJECT_ROOT / ".cache" / "page_cache.sqlite"))
+
+# 🌙 Commit after this many pages so an interrupted extraction keeps most of its work
+_COMMIT_EVERY = 16
+
+
+class PageCache:
+    """
+    🏛️ SQLite-backed page-text archive
+
+    Usage:
+        with PageCache() as cache:
+            text = extract_text(pdf_path, cache=cache)
+        print(cache.summary())
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_PAGE_CACHE_PATH, *, extractor: str = EXTRACTOR_VERSION) -> None:
+        self.path = Path(path)
+        self.extractor = extractor
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)  # 🌙 corpus workers share the file; wait out their commits
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                pdf_sha256 TEXT NOT NULL,
+                extractor TEXT NOT NULL,
+                page_count INTEGER NOT NULL,
+                PRIMARY KEY (pdf_sha256, extractor)
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                pdf_sha256 TEXT NOT NULL,
+                extractor TEXT NOT NULL,
+                page_number INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (pdf_sha256, extractor, page_number)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def page_count(self, pdf_sha256: str) -> Optional[int]:
+        """🔢 Page count recorded for this PDF, or None if it was never opened."""
+        row = self._conn.execute(
+            "SELECT page_count FROM documents WHERE pdf_sha256 = ? AND extractor = ?",
+            (pdf_sha256, self.extractor),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_page_count(self, pdf_sha256: str, page_count: int) -> None:
+        """📝 Remember the page count so later runs need not open the PDF to learn it."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO documents (pdf_sha256, extractor, page_count) VALUES (?, ?, ?)",
+            (pdf_sha256, self.extractor, page_count),
+        )
+        self._conn.commit()
+
+    def lookup(self, pdf_sha256: str, page_count: int) -> dict[int, str]:
+        """🔍 {page_number: text} for every cached page, counting hits and misses."""
+        pages = dict(self._conn.execute(
+            "SELECT page_number, text FROM pages WHERE pdf_sha256 = ? AND extractor = ?",
+            (pdf_sha256, self.extractor),
+        ))
+        self.hits += len(pages)
+        self.misses += page_count - len(pages)
+        return pages
+
+    def put(self, pdf_sha256: str, page: PageText) -> None:
+        """💎 Store one freshly extracted page."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO pages (pdf_sha256, extractor, page_number, text) VALUES (?, ?, ?, ?)",
+            (pdf_sha256, self.extractor, page.page_number, page.text),
+        )
+        self._pending += 1
+        if self._pending >= _COMMIT_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """📜 Commit pending writes to disk."""
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        """🌙 Flush and close the archive."""
+        self.flush()
+        self._conn.close()
+
+    def summary(self) -> str:
+        """📊 One-line hit/miss report for the run log."""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"🗂️ Page cache: {self.hits} pages reused, {self.misses} extracted ({rate:.0f}% hit rate)"
+
+    def __enter__(self) -> "PageCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
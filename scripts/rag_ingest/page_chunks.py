@@ -0,0 +1,483 @@
+"""
+🧭 The Page-Aware Chunker — Every Nugget Knows Where It Was Found ✨
+
+"A quote without a page number is a rumor;
+ a quote with one is a citation."
+
+Streaming chunkers that consume pages lazily (from `iter_pages`) and yield
+each chunk the moment its window closes, carrying its provenance: the first
+and last page it spans and its [start_char, end_char) offsets in the
+document text. The document text is the `join_pages` layout — every
+non-empty page followed by a newline — so offsets line up with
+`extract_text()` while the full string is never built. Only the open window
+(plus the page being read) is held in memory.
+
+Chunk shapes (wrapped as strategies in `chunking.py`):
+
+    iter_char_windows     fixed character windows (ingest_pdf_rag.py; identical
+                          to Chonkie's TokenChunker with its default character
+                          tokenizer)
+    iter_word_windows     whitespace-word windows (process_book.py)
+    iter_token_windows    tokenizer-token windows
+    iter_sentence_chunks  whole sentences packed up to a size budget, closing
+                          at paragraph ends; optionally heading-aware
+
+The window shapes share one tail rule: after the last full window, a final
+partial window is emitted only if it reaches text no earlier window covered.
+
+ - The Cosmic Citation Keeper
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+from .pdf_extract import PageText
+from .tokens import Tokenizer
+
+_WORD = re.compile(r"\S+")
+
+
+@dataclass(frozen=True)
+class PageChunk:
+    """💎 One chunk of text and where in the book it came from."""
+    text: str
+    start_page: int
+    end_page: int
+    start_char: int
+    end_char: int
+    section: str = ""
+
+    def provenance(self) -> dict[str, Any]:
+        """📍 The citation fields, ready to merge into chunk metadata."""
+        return {
+            "start_page": self.start_page,
+            "end_page": self.end_page,
+            "start_char": self.start_char,
+            "end_char": self.end_char,
+        }
+
+
+def _pieces(pages: Iterable[PageText]) -> Iterator[tuple[int, int, str]]:
+    """🧵 (document offset, page number, text) for each non-empty page, newline-terminated."""
+    offset = 0
+    for page in pages:
+        if page.text:
+            piece = page.text + "\n"
+            yield offset, page.page_number, piece
+            offset += len(piece)
+
+
+class _PageLocator:
+    """🗺️ Maps document offsets back to page numbers, forgetting pages behind the window."""
+
+    def __init__(self) -> None:
+        self._starts: list[int] = []
+        self._pages: list[int] = []
+
+    def add(self, offset: int, page_number: int) -> None:
+        self._starts.append(offset)
+        self._pages.append(page_number)
+
+    def page_at(self, offset: int) -> int:
+        return self._pages[bisect_right(self._starts, offset) - 1]
+
+    def forget_before(self, offset: int) -> None:
+        drop = max(0, bisect_right(self._starts, offset) - 1)
+        del self._starts[:drop], self._pages[:drop]
+
+
+def _check_window(size: int, overlap: int) -> int:
+    if size <= 0 or not 0 <= overlap < size:
+        raise ValueError(f"need size > overlap >= 0, got size={size}, overlap={overlap}")
+    return size - overlap
+
+
+def _char_chunk(raw: str, start: int, locator: _PageLocator, min_chars: int) -> Optional[PageChunk]:
+    """✂️ Strip a raw window and attach its page span (None if too short to keep)."""
+    text = raw.strip()
+    if len(text) <= min_chars:
+        return None
+    start += len(raw) - len(raw.lstrip())
+    end = start + len(text)
+    return PageChunk(text, locator.page_at(start), locator.page_at(end - 1), start, end)
+
+
+def iter_char_windows(
+    pages: Iterable[PageText],
+    *,
+    size: int = 500,
+    overlap: int = 100,
+    min_chars: int = 80,
+) -> Iterator[PageChunk]:
+    """
+    🌊 Fixed-size character windows, `overlap` characters shared between neighbours
+
+    Windows are stripped of surrounding whitespace; those no longer than
+    `min_chars` are dropped.
+    """
+    step = _check_window(size, overlap)
+    locator = _PageLocator()
+    buffer, buffer_start, emitted = "", 0, False
+
+    for offset, page_number, piece in _pieces(pages):
+        locator.add(offset, page_number)
+        buffer += piece
+        while len(buffer) >= size:
+            chunk = _char_chunk(buffer[:size], buffer_start, locator, min_chars)
+            if chunk:
+                yield chunk
+            emitted = True
+            buffer, buffer_start = buffer[step:], buffer_start + step
+            locator.forget_before(buffer_start)
+
+    if len(buffer) > overlap or (buffer and not emitted):
+        chunk = _char_chunk(buffer, buffer_start, locator, min_chars)
+        if chunk:
+            yield chunk
+
+
+def _unit_windows(
+    units: Iterable[tuple[int, int, int, str]],
+    size: int,
+    overlap: int,
+    min_chars: int,
+    joiner: str,
+) -> Iterator[PageChunk]:
+    """🪟 Sliding windows over (start, end, page, text) units, with the shared tail rule."""
+    step = _check_window(size, overlap)
+    window: deque[tuple[int, int, int, str]] = deque()
+    emitted = False
+
+    def chunk() -> Optional[PageChunk]:
+        kept = [unit for unit in window if unit[3].strip()]
+        if not kept:
+            return None
+        text = joiner.join(unit[3] for unit in window).strip()
+        if len(text) <= min_chars:
+            return None
+        first, last = kept[0], kept[-1]
+        start = first[0] + len(first[3]) - len(first[3].lstrip())
+        end = last[1] - (len(last[3]) - len(last[3].rstrip()))
+        return PageChunk(text, first[2], last[2], start, end)
+
+    for unit in units:
+        window.append(unit)
+        if len(window) == size:
+            done = chunk()
+            if done:
+                yield done
+            emitted = True
+            for _ in range(step):
+                window.popleft()
+
+    if len(window) > overlap or (window and not emitted):
+        done = chunk()
+        if done:
+            yield done
+
+
+def iter_word_windows(
+    pages: Iterable[PageText],
+    *,
+    size: int = 1000,
+    overlap: int = 100,
+    min_chars: int = 50,
+) -> Iterator[PageChunk]:
+    """
+    🌊 Windows of `size` whitespace-separated words, joined by single spaces
+
+    Words never straddle pages (each page ends with a newline), so every
+    word carries its own page number. Chunks of `min_chars` characters or
+    fewer are dropped.
+    """
+    words = (
+        (offset + match.start(), offset + match.end(), page_number, match.group())
+        for offset, page_number, piece in _pieces(pages)
+        for match in _WORD.finditer(piece)
+    )
+    return _unit_windows(words, size, overlap, min_chars, " ")
+
+
+def iter_token_windows(
+    pages: Iterable[PageText],
+    tokenizer: Tokenizer,
+    *,
+    size: int = 128,
+    overlap: int = 0,
+    min_chars: int = 80,
+) -> Iterator[PageChunk]:
+    """
+    🌊 Windows of `size` tokenizer tokens, sliced verbatim from the text
+
+    Each page is tokenized on its own (a page ends with a newline, which no
+    token crosses in practice). Chunks of `min_chars` characters or fewer
+    are dropped.
+    """
+    tokens = (
+        (offset + start, offset + end, page_number, piece[start:end])
+        for offset, page_number, piece in _pieces(pages)
+        for start, end in tokenizer.spans(piece)
+    )
+    return _unit_windows(tokens, size, overlap, min_chars, "")
+
+
+# ──────────────────────────────────────────────────────────────────────
+# 📜 Sentence- and heading-aware packing
+# ──────────────────────────────────────────────────────────────────────
+
+# 🌙 A sentence ends at . ! or ? (plus closing quotes/brackets) followed by
+#    whitespace and something that can start a sentence
+_SENTENCE_END = re.compile(r"[.!?][\"”’)\]]*\s+(?=[\"“‘(\[]?[A-Z0-9])")
+_ABBREVIATIONS = {"dr", "mr", "mrs", "ms", "st", "vs", "etc", "e.g", "i.e", "ph.d", "no"}
+_CHAPTER = re.compile(r"^(chapter|part)\s+[\divxlc]+$", re.IGNORECASE)
+_TERMINAL = tuple(".!?:;,")
+_FOLIO = re.compile(r"^(\d{1,4}|[ivxlc]{1,8})$", re.IGNORECASE)
+
+# 🎚️ A line this much shorter than the widest line seen ends its paragraph
+_SHORT_LINE = 0.7
+_MAX_HEADING_CHARS = 60
+
+
+@dataclass(frozen=True)
+class _Sentence:
+    text: str
+    start: int
+    end: int
+    pages: tuple[tuple[int, int], ...]  # (document offset, page) where each page begins
+    paragraph_end: bool = False
+
+    def page_at(self, offset: int) -> int:
+        return self.pages[max(0, bisect_right([o for o, _ in self.pages], offset) - 1)][1]
+
+
+@dataclass(frozen=True)
+class _Heading:
+    title: Optional[str]  # 🌙 None: break the chunk but stay in the same section
+
+
+class _SentenceBuffer:
+    """
+    🧵 Accumulates lines and releases complete sentences
+
+    Lines may be dropped (running heads), so the buffer keeps one segment
+    per line to map buffer positions back to document offsets and pages.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._segments: list[tuple[int, int, int, int]] = []  # (buffer pos, doc offset, page, line length)
+        self._width = 0
+
+    def add(self, line: str, offset: int, page_number: int) -> None:
+        self._segments.append((len(self.text), offset, page_number, len(line.rstrip())))
+        self._width = max(self._width, len(line.rstrip()))
+        self.text += line
+
+    def _segment(self, pos: int) -> tuple[int, int, int, int]:
+        return self._segments[bisect_right([seg[0] for seg in self._segments], pos) - 1]
+
+    def _doc(self, pos: int) -> int:
+        seg = self._segment(pos)
+        return seg[1] + pos - seg[0]
+
+    def _sentence(self, start: int, stop: int, paragraph_end: bool) -> Optional[_Sentence]:
+        raw = self.text[start:stop]
+        text = raw.strip()
+        if not text:
+            return None
+        first = start + len(raw) - len(raw.lstrip())
+        last = start + len(raw.rstrip()) - 1
+        pages: list[tuple[int, int]] = []
+        begin = bisect_right([seg[0] for seg in self._segments], first) - 1
+        for pos, offset, page, _ in self._segments[begin:]:
+            if pos > last:
+                break
+            if not pages or page != pages[-1][1]:
+                pages.append((self._doc(max(pos, first)), page))
+        return _Sentence(text, self._doc(first), self._doc(last) + 1, tuple(pages), paragraph_end)
+
+    def _is_paragraph_end(self, match: re.Match) -> bool:
+        if "\n" not in match.group():
+            return False
+        line_length = self._segment(match.start())[3]
+        return line_length < self._width * _SHORT_LINE
+
+    def pop(self, final: bool = False) -> list[_Sentence]:
+        """✂️ Release every complete sentence (and, if `final`, whatever is left)."""
+        sentences, cut = [], 0
+        for match in _SENTENCE_END.finditer(self.text):
+            before = self.text[max(0, match.start() - 12):match.start()].split()
+            if before and before[-1].lstrip("(\"“").lower() in _ABBREVIATIONS:
+                continue
+            sentence = self._sentence(cut, match.end(), self._is_paragraph_end(match))
+            if sentence:
+                sentences.append(sentence)
+            cut = match.end()
+        if final:
+            sentence = self._sentence(cut, len(self.text), True)
+            if sentence:
+                sentences.append(sentence)
+            cut = len(self.text)
+        if cut:
+            self.text = self.text[cut:]
+            keep = max(0, bisect_right([seg[0] for seg in self._segments], cut) - 1)
+            self._segments = [
+                (max(0, pos - cut), offset + max(0, cut - pos), page, length)
+                for pos, offset, page, length in self._segments[keep:]
+            ]
+        return sentences
+
+
+def _is_heading(line: str) -> bool:
+    """🏷️ CHAPTER 3 / ALL-CAPS title lines."""
+    line = line.strip()
+    if not line or len(line) > _MAX_HEADING_CHARS or line.endswith(_TERMINAL):
+        return False
+    letters = [c for c in line if c.isalpha()]
+    return bool(_CHAPTER.match(line)) or (len(letters) >= 3 and sum(c.isupper() for c in letters) >= 0.8 * len(letters))
+
+
+def _iter_sentences(pages: Iterable[PageText], headings: bool) -> Iterator[_Sentence | _Heading]:
+    """
+    📜 Sentences in document order; with `headings`, also section markers
+
+    Heading-aware mode reads the book's layout. A page's first line is its
+    running head when it is short and unpunctuated, repeats the previous
+    page's, or sits above a CHAPTER line; a bare number closing a page is
+    its folio. Both are dropped from the text. A new running head opens a
+    section named after it (unless it is unreadable glyph codes), the title
+    under a CHAPTER line renames the section, and other ALL-CAPS lines just
+    break the chunk.
+    """
+    buffer = _SentenceBuffer()
+    running_head = previous_first = None
+    chapter_title: Optional[list[str]] = None  # 🏷️ collecting the title lines under a CHAPTER line
+    for offset, page_number, piece in _pieces(pages):
+        lines = piece.splitlines(keepends=True)
+        first = lines[0].strip()
+        position = 0
+        for index, line in enumerate(lines):
+            line_offset, position = offset + position, position + len(line)
+            stripped = line.strip()
+            if not headings:
+                buffer.add(line, line_offset, page_number)
+                continue
+            if index == 0 and stripped and (
+                stripped == previous_first
+                or (len(stripped) <= _MAX_HEADING_CHARS and not stripped.endswith(_TERMINAL))
+                or (len(lines) > 1 and _CHAPTER.match(lines[1].strip()))
+            ):
+                if stripped != running_head:
+                    yield from buffer.pop(final=True)
+                    running_head = stripped
+                    yield _Heading(None if "(cid:" in stripped else stripped)
+                continue
+            if index == len(lines) - 1 and _FOLIO.match(stripped):
+                continue
+            if _is_heading(line):
+                yield from buffer.pop(final=True)
+                if _CHAPTER.match(stripped):
+                    chapter_title = []
+                    yield _Heading(None)
+                elif chapter_title is not None:
+                    chapter_title.append(stripped)  # 🌙 a title may wrap onto several lines
+                else:
+                    yield _Heading(None)
+                continue
+            if chapter_title:
+                yield _Heading(" ".join(chapter_title).title())
+            chapter_title = None
+            buffer.add(line, line_offset, page_number)
+        previous_first = first
+        yield from buffer.pop()
+    yield from buffer.pop(final=True)
+
+
+def _split_long(sentence: _Sentence, max_chars: int) -> list[_Sentence]:
+    """🔪 Cut a sentence longer than `max_chars` at word boundaries."""
+    pieces, start = [], 0
+    text = sentence.text
+    while start < len(text):
+        stop = len(text) if len(text) - start <= max_chars else text.rfind(" ", start, start + max_chars + 1)
+        if stop <= start:
+            stop = start + max_chars
+        piece = text[start:stop].strip()
+        if piece:
+            lead = len(text[start:stop]) - len(text[start:stop].lstrip())
+            begin = sentence.start + start + lead
+            pieces.append(_Sentence(piece, begin, begin + len(piece), sentence.pages))
+        start = stop
+    return pieces
+
+
+def _pack(
+    items: Iterable[_Sentence | _Heading],
+    max_chars: int,
+    overlap: int,
+    min_chars: int,
+) -> Iterator[PageChunk]:
+    """📦 Greedily pack whole sentences up to `max_chars`, closing early at paragraph ends."""
+    current: list[_Sentence] = []
+    section = ""
+
+    def size(sentences: list[_Sentence]) -> int:
+        return sum(len(s.text) for s in sentences) + max(0, len(sentences) - 1)
+
+    def flush() -> Optional[PageChunk]:
+        text = " ".join(s.text for s in current)
+        if len(text) <= min_chars:
+            return None
+        first, last = current[0], current[-1]
+        return PageChunk(text, first.page_at(first.start), last.page_at(last.end - 1), first.start, last.end, section)
+
+    def carry(incoming: int) -> list[_Sentence]:
+        kept = current[-overlap:] if overlap else []
+        while kept and size(kept) + 1 + incoming > max_chars:
+            kept = kept[1:]
+        return kept
+
+    for item in items:
+        if isinstance(item, _Heading):
+            if current and (done := flush()):
+                yield done
+            current, section = [], item.title or section
+            continue
+        for sentence in [item] if len(item.text) <= max_chars else _split_long(item, max_chars):
+            if current and size(current) + 1 + len(sentence.text) > max_chars:
+                if done := flush():
+                    yield done
+                current = carry(len(sentence.text))
+            current.append(sentence)
+            if sentence.paragraph_end and size(current) >= max_chars // 2:
+                if done := flush():
+                    yield done
+                current = carry(0)
+    if current and (done := flush()):
+        yield done
+
+
+def iter_sentence_chunks(
+    pages: Iterable[PageText],
+    *,
+    max_chars: int = 500,
+    overlap: int = 0,
+    min_chars: int = 80,
+    headings: bool = False,
+) -> Iterator[PageChunk]:
+    """
+    🌊 Chunks of whole sentences, up to `max_chars` characters each
+
+    A chunk closes early at a paragraph end once it is half full; a single
+    sentence longer than `max_chars` is cut at word boundaries. `overlap`
+    repeats that many trailing sentences at the start of the next chunk.
+    With `headings`, running heads are dropped, headings start a new chunk,
+    and each chunk records its section title.
+    """
+    if max_chars <= 0 or overlap < 0:
+        raise ValueError(f"need max_chars > 0 and overlap >= 0, got {max_chars}, {overlap}")
+    return _pack(_iter_sentences(pages, headings), max_chars, overlap, min_chars)
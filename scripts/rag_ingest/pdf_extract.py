@@ -0,0 +1,163 @@
+"""
+📖 The Page Scriptorium — Many Scribes, One Book, Every Page in Its Place ✨
+
+"One monk copying two hundred pages is a season;
+ eight monks with twenty-five pages each is a fortnight."
+
+Page-parallel text extraction for the book PDFs. Page ranges are handed to
+a process pool (pdfplumber's layout analysis is pure-Python and CPU-bound,
+so threads would just queue on the GIL); each worker opens the PDF itself
+and returns its pages' text. Results come back strictly in page order with
+1-based page numbers attached, either as a generator (`iter_pages`) for
+streaming consumers or joined into one string (`extract_text`). Pass a
+`PageCache` (see `page_cache.py`) and pages already extracted from the same
+file are never parsed again.
+
+ - The Cosmic Scriptorium Abbot
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Sequence
+
+import pdfplumber
+
+if TYPE_CHECKING:
+    from .page_cache import PageCache
+
+# 🌙 Every task re-opens (and re-parses) the PDF, so hand each worker only a
+#    couple of contiguous ranges — enough to even out slow pages, few enough
+#    that opening the file stays a small share of the work
+TASKS_PER_WORKER = 2
+
+# 🔖 Bump the suffix whenever the extraction logic changes; cached pages from
+#    another extractor (or another pdfplumber release) are never reused
+EXTRACTOR_VERSION = f"pdfplumber-{pdfplumber.__version__}/extract_text-1"
+
+
+@dataclass(frozen=True)
+class PageText:
+    """📄 One page's extracted text (empty when the page has none)."""
+    page_number: int
+    text: str
+
+
+def page_count(pdf_path: Path | str) -> int:
+    """🔢 Number of pages in the PDF."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def file_sha256(path: Path | str) -> str:
+    """🔑 sha256 of the file's bytes, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def default_workers() -> int:
+    """🧮 One worker per available core."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # 🌙 not on every platform
+        return os.cpu_count() or 1
+
+
+def _iter_indices(pdf, indices: Iterable[int]) -> Iterator[PageText]:
+    """📄 The given pages (0-based indices) of an open pdfplumber document."""
+    for index in indices:
+        page = pdf.pages[index]
+        yield PageText(index + 1, page.extract_text() or "")
+        page.close()  # 🧹 drop the cached layout objects as we go
+
+
+def _extract_indices(pdf_path: str, indices: Sequence[int]) -> list[PageText]:
+    """🪶 Worker task: extract the given pages from a fresh handle."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return list(_iter_indices(pdf, indices))
+
+
+def page_ranges(total: int, tasks: int) -> list[tuple[int, int]]:
+    """✂️ Split `total` pages into at most `tasks` contiguous, near-equal [start, stop) ranges."""
+    tasks = max(1, min(tasks, total))
+    bounds = [total * i // tasks for i in range(tasks + 1)]
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def _extract(pdf_path: str, indices: Optional[Sequence[int]], workers: int) -> Iterator[PageText]:
+    """🌊 Extract `indices` (default: every page) in order, serially or across a pool."""
+    if workers <= 1:
+        with pdfplumber.open(pdf_path) as pdf:
+            yield from _iter_indices(pdf, range(len(pdf.pages)) if indices is None else indices)
+        return
+
+    if indices is None:
+        indices = range(page_count(pdf_path))
+    tasks = [indices[start:stop] for start, stop in page_ranges(len(indices), workers * TASKS_PER_WORKER)]
+    if not tasks:
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = [pool.submit(_extract_indices, pdf_path, list(task)) for task in tasks]
+        for future in futures:
+            yield from future.result()
+
+
+def iter_pages(
+    pdf_path: Path | str,
+    *,
+    workers: Optional[int] = None,
+    cache: Optional["PageCache"] = None,
+) -> Iterator[PageText]:
+    """
+    🌊 Yield every page's text in page order
+
+    With `workers=1` pages stream straight from one in-process handle;
+    otherwise contiguous page ranges are spread over a process pool and
+    yielded in order as each range completes. With a `cache`, pages already
+    extracted from this exact file (by sha256) are served from it and only
+    the missing ones are parsed — then stored for next time.
+    """
+    pdf_path = str(pdf_path)
+    workers = workers or default_workers()
+    if cache is None:
+        yield from _extract(pdf_path, None, workers)
+        return
+
+    digest = file_sha256(pdf_path)
+    total = cache.page_count(digest)
+    if total is None:
+        total = page_count(pdf_path)
+        cache.set_page_count(digest, total)
+    cached = cache.lookup(digest, total)
+    extracted = _extract(pdf_path, [i for i in range(total) if i + 1 not in cached], workers)
+
+    for number in range(1, total + 1):
+        if number in cached:
+            yield PageText(number, cached[number])
+        else:
+            page = next(extracted)
+            cache.put(digest, page)
+            yield page
+    cache.flush()
+
+
+def join_pages(pages: Iterable[PageText]) -> str:
+    """🧵 The classic full-text string: each non-empty page followed by a newline."""
+    return "".join(page.text + "\n" for page in pages if page.text)
+
+
+def extract_text(
+    pdf_path: Path | str,
+    *,
+    workers: Optional[int] = None,
+    cache: Optional["PageCache"] = None,
+) -> str:
+    """📜 Extract the whole PDF as one string (page-parallel, joined once)."""
+    return join_pages(iter_pages(pdf_path, workers=workers, cache=cache))
@@ -0,0 +1,239 @@
+"""
+🧭 The Expedition Planner — Count the Miles Before You Walk Them ✨
+
+"The caravan master who counts camels before dawn
+ is not the one stranded at noon."
+
+A dry run of the embedding stage. After extraction, chunking and cache
+lookups, `plan_embedding` answers, without a single API call: how many
+chunks would be embedded, how many tokens they weigh, how many requests the
+batch limits pack them into, what that costs, and roughly how long it takes.
+
+The duration estimate takes the slower of two limits:
+
+    rate        tokens/min and requests/min budgets. The token buckets start
+                full, so the first minute's worth goes out at once.
+    latency     ceil(requests / concurrency) round-trips, each taking the
+                mean request latency of the script's last recorded run
+                (`.cache/metrics/<script>.jsonl`), or DEFAULT_REQUEST_SECONDS
+                when there is no history.
+
+ - The Cosmic Expedition Planner
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Sequence
+
+from .batching import DEFAULT_BATCH_ITEMS, DEFAULT_BATCH_TOKENS, EMBEDDING_MODEL, pack_batches
+from .telemetry import DEFAULT_HISTORY_DIR, estimate_cost
+from .tokens import count_tokens
+from .writer import atomic_replace, temp_path_for
+
+if TYPE_CHECKING:
+    from .cache import EmbeddingCache
+
+PLAN_FORMAT = "rag-ingest-plan/1"
+DEFAULT_REQUEST_SECONDS = 1.0  # 🌙 assumed round-trip when no run has been recorded yet
+
+
+def plan_path(output_path: Path | str) -> Path:
+    """📍 `embeddings.json` → `embeddings.plan.json`"""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}.plan.json")
+
+
+def recorded_request_seconds(script: str, history_dir: Optional[Path] = DEFAULT_HISTORY_DIR) -> Optional[float]:
+    """⏱️ Mean request latency of `script`'s most recent real run that made requests, from its metrics history
+
+    Runs against an offline provider (`local`, `stub`) say nothing about the API's latency and are skipped.
+    """
+    path = None if history_dir is None else Path(history_dir) / f"{script}.jsonl"
+    if path is None or not path.exists():
+        return None
+    seconds = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                latency = record["requests"]["latency"]
+            except (json.JSONDecodeError, KeyError):
+                continue
+            if record.get("config", {}).get("provider", "openai").partition(":")[0] != "openai":
+                continue
+            if latency.get("count"):
+                seconds = latency["mean_ms"] / 1000
+    return seconds
+
+
+def estimate_duration(
+    requests: int,
+    tokens: int,
+    *,
+    request_seconds: float,
+    concurrency: int = 1,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+) -> tuple[float, str]:
+    """⏳ (seconds, bound): the slower of the rate budgets and the latency-bound round-trips."""
+    rate_minutes = 0.0
+    if requests_per_minute:
+        rate_minutes = max(rate_minutes, max(0, requests - requests_per_minute) / requests_per_minute)
+    if tokens_per_minute:
+        rate_minutes = max(rate_minutes, max(0, tokens - tokens_per_minute) / tokens_per_minute)
+    latency_seconds = math.ceil(requests / max(1, concurrency)) * request_seconds
+    if rate_minutes * 60 > latency_seconds:
+        return rate_minutes * 60, "rate"
+    return latency_seconds, "latency"
+
+
+def plan_embedding(
+    texts: Sequence[str],
+    *,
+    script: str,
+    model: str = EMBEDDING_MODEL,
+    cache: Optional["EmbeddingCache"] = None,
+    done: Iterable[int] = (),
+    max_items: int = DEFAULT_BATCH_ITEMS,
+    max_tokens: int = DEFAULT_BATCH_TOKENS,
+    concurrency: int = 1,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    request_seconds: Optional[float] = None,
+    history_dir: Optional[Path] = DEFAULT_HISTORY_DIR,
+) -> dict[str, Any]:
+    """
+    🧭 What embedding `texts` would take, without calling the API
+
+    Positions in `done` (e.g. journaled by an interrupted run) and texts
+    found in `cache` are not counted as work. Requests are packed exactly as
+    the real run packs them (`max_items`, `max_tokens`).
+    """
+    done = set(done)
+    pending = [i for i in range(len(texts)) if i not in done]
+    missing = [i for i in pending if cache is None or not cache.contains(texts[i])]
+    batches = list(pack_batches(((i, texts[i]) for i in missing), max_items=max_items, max_tokens=max_tokens))
+    tokens = sum(batch.tokens for batch in batches)
+    all_tokens = sum(count_tokens(text) for text in texts)
+
+    source = "given"
+    if request_seconds is None:
+        request_seconds, source = recorded_request_seconds(script, history_dir), "history"
+        if request_seconds is None:
+            request_seconds, source = DEFAULT_REQUEST_SECONDS, "assumed"
+    seconds, bound = estimate_duration(
+        len(batches), tokens,
+        request_seconds=request_seconds,
+        concurrency=concurrency,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+    )
+    return {
+        "format": PLAN_FORMAT,
+        "script": script,
+        "model": model,
+        "chunks": {
+            "total": len(texts),
+            "journaled": len(texts) - len(pending),
+            "cached": len(pending) - len(missing),
+            "to_embed": len(missing),
+        },
+        "tokens": {"to_embed": tokens, "total": all_tokens},
+        "requests": len(batches),
+        "limits": {
+            "max_items": max_items,
+            "max_tokens": max_tokens,
+            "concurrency": concurrency,
+            "requests_per_minute": requests_per_minute,
+            "tokens_per_minute": tokens_per_minute,
+        },
+        "cost": {
+            "estimated_usd": estimate_cost(model, tokens),
+            "full_reembed_usd": estimate_cost(model, all_tokens),
+        },
+        "duration": {
+            "seconds": round(seconds, 1),
+            "bound": bound,
+            "request_seconds": round(request_seconds, 3),
+            "request_seconds_source": source,
+        },
+    }
+
+
+def _duration(seconds: float) -> str:
+    """🕰️ Seconds, minutes or hours - whichever reads best."""
+    if seconds < 120:
+        return f"{seconds:.0f} s"
+    return f"{seconds / 60:.1f} min" if seconds < 7200 else f"{seconds / 3600:.1f} h"
+
+
+def format_plan(plan: dict[str, Any]) -> str:
+    """📋 The plan as a few human-readable lines."""
+    chunks, limits, cost, duration = plan["chunks"], plan["limits"], plan["cost"], plan["duration"]
+    usd = "unknown" if cost["estimated_usd"] is None else f"${cost['estimated_usd']:.4f}"
+    full = "unknown" if cost["full_reembed_usd"] is None else f"${cost['full_reembed_usd']:.4f}"
+    return "\n".join([
+        f"🧭 PLAN ({plan['model']}, no API calls): {chunks['total']:,} chunks - "
+        f"{chunks['to_embed']:,} to embed, {chunks['cached']:,} cached, {chunks['journaled']:,} journaled",
+        f"   🪙 {plan['tokens']['to_embed']:,} tokens in {plan['requests']:,} requests "
+        f"(<= {limits['max_items']:,} chunks / {limits['max_tokens']:,} tokens each)",
+        f"   💸 ~{usd} (re-embedding everything: {full})",
+        f"   ⏱️ ~{_duration(duration['seconds'])}, {duration['bound']}-bound "
+        f"({duration['request_seconds']:.2f} s/request, {duration['request_seconds_source']})",
+    ])
+
+
+def write_plan(output_path: Path | str, plan: dict[str, Any]) -> Path:
+    """💾 Save the plan beside the output it is for (`embeddings.plan.json`), atomically."""
+    path = plan_path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = temp_path_for(path)
+    with open(temp, "w") as f:
+        json.dump(plan, f, indent=2)
+    atomic_replace(temp, path)
+    return path
+
+
+def combine_plans(
+    plans: Sequence[dict[str, Any]],
+    *,
+    concurrency: int = 1,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+) -> dict[str, Any]:
+    """🧮 One plan for several runs sharing the given budgets (e.g. corpus documents ingested together)."""
+    if not plans:
+        raise ValueError("no plans to combine")
+    first = plans[0]
+    chunks = {key: sum(plan["chunks"][key] for plan in plans) for key in first["chunks"]}
+    tokens = {key: sum(plan["tokens"][key] for plan in plans) for key in first["tokens"]}
+    requests = sum(plan["requests"] for plan in plans)
+    request_seconds = first["duration"]["request_seconds"]
+    seconds, bound = estimate_duration(
+        requests, tokens["to_embed"],
+        request_seconds=request_seconds,
+        concurrency=concurrency,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+    )
+    return {
+        **first,
+        "chunks": chunks,
+        "tokens": tokens,
+        "requests": requests,
+        "limits": {
+            **first["limits"],
+            "concurrency": concurrency,
+            "requests_per_minute": requests_per_minute,
+            "tokens_per_minute": tokens_per_minute,
+        },
+        "cost": {
+            "estimated_usd": estimate_cost(first["model"], tokens["to_embed"]),
+            "full_reembed_usd": estimate_cost(first["model"], tokens["total"]),
+        },
+        "duration": {**first["duration"], "seconds": round(seconds, 1), "bound": bound},
+        "runs": len(plans),
+    }
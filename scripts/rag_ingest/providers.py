@@ -0,0 +1,301 @@
+"""
+🔌 The Embedding Switchboard — One Socket, Any Oracle ✨
+
+"The lamp does not care which river turns the mill;
+ it only asks that the current flows."
+
+Every ingest script gets its embeddings client from here instead of
+building an `OpenAI(...)` at import time. Importing a script therefore
+needs no API key, and the whole pipeline can run with no network at all:
+
+    openai  the real API (OPENAI_API_KEY; OPENAI_BASE_URL is honored)
+    local   deterministic, in-process: hashed word, word-bigram and
+            character n-gram features, projected (signed feature hashing)
+            to the model's width and unit-normalized. Texts that share
+            words land near each other, so dedup, search and quantization
+            reports behave plausibly. No HTTP; about a millisecond per chunk.
+    stub    a real HTTP round-trip to an in-process `stub_server` with
+            simulated latency, stragglers, 429s and 5xx
+            (`stub:latency=0.2,rpm=600,error_rate=0.02,straggler_rate=0.01`)
+
+Providers are named by spec strings (like the chunkers): `local`,
+`local:ngram=4`, `stub:latency=0.5`. Scripts take `--provider` (or the
+EMBEDDING_PROVIDER environment variable). Clients are OpenAI-shaped:
+`client.embeddings.create(input=..., model=..., dimensions=...)` returns
+`.data[i].embedding` and `.usage`, so batching, the async stage and
+retries work unchanged.
+
+The offline providers never share the embedding cache with real vectors:
+`cache_path_for` gives each its own file.
+
+ - The Cosmic Switchboard Operator
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import os
+import re
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, ClassVar, Optional, Protocol, Sequence
+
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
+
+from .cache import PROJECT_ROOT, normalize_text
+from .dimensions import full_dimensions, shorten_embedding
+from .stub_server import StubConfig, StubEmbeddingServer
+from .tokens import count_tokens
+
+DEFAULT_PROVIDER = os.getenv("EMBEDDING_PROVIDER") or "openai"
+OFFLINE_OUTPUT_DIR = PROJECT_ROOT / ".cache" / "offline"
+
+
+class EmbeddingProvider(Protocol):
+    """🔌 Anything that hands out OpenAI-shaped embeddings clients."""
+    name: ClassVar[str]
+    offline: ClassVar[bool]  # 🌙 no API key, no network, vectors that mean nothing to a real model
+
+    @property
+    def cache_key(self) -> str: ...
+
+    def client(self, max_retries: Optional[int] = None) -> Any: ...
+
+    def async_client(self, max_retries: Optional[int] = None) -> Any: ...
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 🌐 The real oracle
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class OpenAIProvider:
+    """🌐 The OpenAI API (`base_url` overrides OPENAI_BASE_URL)."""
+    name: ClassVar[str] = "openai"
+    offline: ClassVar[bool] = False
+    base_url: str = ""
+
+    @property
+    def cache_key(self) -> str:
+        return ""
+
+    def _options(self, max_retries: Optional[int]) -> dict[str, Any]:
+        options: dict[str, Any] = {"api_key": os.getenv("OPENAI_API_KEY")}
+        if self.base_url:
+            options["base_url"] = self.base_url
+        if max_retries is not None:
+            options["max_retries"] = max_retries
+        return options
+
+    def client(self, max_retries: Optional[int] = None) -> OpenAI:
+        return OpenAI(**self._options(max_retries))
+
+    def async_client(self, max_retries: Optional[int] = None) -> AsyncOpenAI:
+        return AsyncOpenAI(**self._options(max_retries))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧮 The local oracle — hashed n-grams, no network
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _features(text: str, ngram: int) -> list[str]:
+    """🔤 Words, word bigrams and `ngram`-character grams of the normalized, lowercased text."""
+    normalized = normalize_text(text).lower()
+    words = re.findall(r"\w+", normalized)
+    padded = f" {normalized} "
+    return [
+        *(f"w:{word}" for word in words),
+        *(f"b:{first} {second}" for first, second in zip(words, words[1:])),
+        *(f"c:{padded[i:i + ngram]}" for i in range(len(padded) - ngram + 1)),
+    ]
+
+
+def local_vector(text: str, dimensions: int, ngram: int = 3) -> list[float]:
+    """🧮 Deterministic unit vector: each feature adds ±1 to the bucket its blake2b hash picks."""
+    vector = np.zeros(dimensions, dtype=np.float64)
+    digests = [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+               for f in _features(text, ngram)]
+    if digests:
+        hashes = np.array(digests, dtype=np.uint64)
+        signs = np.where(hashes >> np.uint64(63), 1.0, -1.0)
+        np.add.at(vector, (hashes % np.uint64(dimensions)).astype(np.int64), signs)
+    norm = np.linalg.norm(vector)
+    if not norm:  # 🌙 empty text: any fixed unit vector will do
+        vector[0], norm = 1.0, 1.0
+    return (vector / norm).tolist()
+
+
+@dataclass
+class LocalEmbedding:
+    index: int
+    embedding: list[float]
+    object: str = "embedding"
+
+
+@dataclass
+class LocalUsage:
+    prompt_tokens: int
+    total_tokens: int
+
+
+@dataclass
+class LocalResponse:
+    """📦 Shaped like the SDK's CreateEmbeddingResponse, as far as the ingest code looks."""
+    data: list[LocalEmbedding]
+    model: str
+    usage: LocalUsage
+    object: str = "list"
+
+
+@dataclass
+class LocalEmbeddings:
+    """🧮 `client.embeddings` of the local backend."""
+    ngram: int = 3
+
+    def create(self, *, input: str | Sequence[str], model: str, dimensions: Optional[int] = None,
+               **_: Any) -> LocalResponse:
+        texts = [input] if isinstance(input, str) else list(input)
+        native = full_dimensions(model)
+        data = []
+        for index, text in enumerate(texts):
+            vector = local_vector(text, native, self.ngram)
+            # 🌙 computed at full width then shortened, exactly as the cache shortens stored vectors
+            if dimensions and dimensions != native:
+                vector = shorten_embedding(vector, dimensions)
+            data.append(LocalEmbedding(index, vector))
+        tokens = sum(count_tokens(text) for text in texts)
+        return LocalResponse(data, model, LocalUsage(tokens, tokens))
+
+
+@dataclass
+class AsyncLocalEmbeddings:
+    """🧮 The same, awaitable (it never actually waits)."""
+    ngram: int = 3
+
+    async def create(self, **kwargs: Any) -> LocalResponse:
+        await asyncio.sleep(0)  # 🌙 let other batches interleave, as real requests would
+        return LocalEmbeddings(self.ngram).create(**kwargs)
+
+
+@dataclass
+class LocalClient:
+    embeddings: Any
+
+
+@dataclass
+class LocalProvider:
+    """🧮 Hashed n-gram embeddings computed in-process."""
+    name: ClassVar[str] = "local"
+    offline: ClassVar[bool] = True
+    ngram: int = 3
+
+    @property
+    def cache_key(self) -> str:
+        return f"local-{self.ngram}gram"
+
+    def client(self, max_retries: Optional[int] = None) -> LocalClient:
+        return LocalClient(LocalEmbeddings(self.ngram))
+
+    def async_client(self, max_retries: Optional[int] = None) -> LocalClient:
+        return LocalClient(AsyncLocalEmbeddings(self.ngram))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 🎭 The rehearsal oracle — real HTTP, simulated trouble
+# ─────────────────────────────────────────────────────────────────────────────
+
+_stub_servers: dict[tuple, StubEmbeddingServer] = {}
+
+
+@dataclass
+class StubProvider:
+    """🎭 The OpenAI client against an in-process stub server (one per configuration per process)."""
+    name: ClassVar[str] = "stub"
+    offline: ClassVar[bool] = True
+    latency: float = 0.05
+    jitter: float = 0.0
+    rpm: int = 0
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    straggler_rate: float = 0.0
+    straggler_latency: float = 10.0
+
+    @property
+    def cache_key(self) -> str:
+        return "stub"  # 🌙 stub vectors depend on the text alone, not on how grumpy the hall is
+
+    @property
+    def base_url(self) -> str:
+        key = dataclasses.astuple(self)
+        if key not in _stub_servers:
+            config = StubConfig(latency=self.latency, jitter=self.jitter, requests_per_minute=self.rpm,
+                                throttle_rate=self.throttle_rate, error_rate=self.error_rate,
+                                straggler_rate=self.straggler_rate, straggler_latency=self.straggler_latency)
+            server = StubEmbeddingServer(("127.0.0.1", 0), config)
+            server.serve_in_background()
+            _stub_servers[key] = server
+        return _stub_servers[key].base_url
+
+    def client(self, max_retries: Optional[int] = None) -> OpenAI:
+        retries = {} if max_retries is None else {"max_retries": max_retries}
+        return OpenAI(api_key="stub", base_url=self.base_url, **retries)
+
+    def async_client(self, max_retries: Optional[int] = None) -> AsyncOpenAI:
+        retries = {} if max_retries is None else {"max_retries": max_retries}
+        return AsyncOpenAI(api_key="stub", base_url=self.base_url, **retries)
+
+
+PROVIDERS: dict[str, type] = {cls.name: cls for cls in (OpenAIProvider, LocalProvider, StubProvider)}
+
+_PARAM_TYPES = {"int": int, "float": float, "str": str}
+
+
+def make_provider(spec: str = DEFAULT_PROVIDER) -> EmbeddingProvider:
+    """
+    🔮 Build a provider from a spec string: `name` or `name:key=value,...`
+
+        make_provider("local:ngram=4")
+        make_provider("stub:latency=0.2,rpm=600,error_rate=0.02")
+    """
+    name, _, params = spec.partition(":")
+    if name not in PROVIDERS:
+        raise ValueError(f"unknown embedding provider {name!r} (choose from {', '.join(PROVIDERS)})")
+    cls = PROVIDERS[name]
+    types = {f.name: f.type for f in fields(cls)}
+    kwargs: dict[str, Any] = {}
+    for pair in filter(None, params.split(",")):
+        key, sep, value = pair.partition("=")
+        if not sep or key not in types:
+            raise ValueError(f"bad parameter {pair!r} for {name} (known: {', '.join(types) or 'none'})")
+        kwargs[key] = _PARAM_TYPES[types[key]](value)
+    return cls(**kwargs)
+
+
+def describe_provider(provider: EmbeddingProvider) -> str:
+    """🏷️ The spec string that rebuilds `provider` (parameters left at their defaults are omitted)."""
+    params = ",".join(f"{f.name}={getattr(provider, f.name)}" for f in fields(provider)
+                      if getattr(provider, f.name) != f.default)
+    return f"{provider.name}:{params}" if params else provider.name
+
+
+@functools.lru_cache(maxsize=None)
+def shared_client(spec: str = DEFAULT_PROVIDER) -> Any:
+    """🔌 One synchronous client per provider spec per process, built on first use."""
+    return make_provider(spec).client()
+
+
+def cache_path_for(provider: EmbeddingProvider, cache_path: Optional[Path]) -> Optional[Path]:
+    """🏛️ The embedding cache for `provider`: offline vectors get their own file, beside the real one."""
+    if cache_path is None or not provider.cache_key:
+        return cache_path
+    cache_path = Path(cache_path)
+    return cache_path.with_name(f"{cache_path.stem}.{provider.cache_key}{cache_path.suffix}")
+
+
+def offline_output_path(provider: EmbeddingProvider, output_path: Path | str) -> Path:
+    """📍 Where an offline run writes instead of `output_path`, so fake vectors never reach shared/data."""
+    return OFFLINE_OUTPUT_DIR / provider.cache_key / Path(output_path).name
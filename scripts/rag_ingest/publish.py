@@ -0,0 +1,163 @@
+"""
+📮 The Courier — Deliver Only What Changed, Never Half a Parcel ✨
+
+"A courier who re-delivers yesterday's parcel wastes the road;
+ one who leaves half a parcel on the step wastes the customer."
+
+Publishes a finished output (embeddings.json plus any sidecars: binary
+store, quantized exports, IVF index) to the variant folders:
+
+    serialize once   the output is written once; variants get the same bytes
+    skip unchanged   each file's sha256 is compared with the target's, and
+                     equal files are left alone (the manifest's recorded
+                     size/mtime/inode spares even re-hashing the target)
+    atomic           a changed file is copied to a temp name beside the
+                     target, fsynced, then renamed over it. A dev server
+                     reading the target sees the old file or the new one,
+                     never half of one.
+    manifest         `<stem>.manifest.json` beside each target records every
+                     file published there: sha256, bytes, and whether it was
+                     copied, linked or unchanged
+
+Each variant gets its own copy by default. `link=True` hardlinks instead
+(falling back to a copy across filesystems). That saves the disk space, but
+it is only safe while *every* writer of the source and the targets replaces
+files by renaming. A tool that rewrites one in place (a `writeFileSync` on
+the path, an editor) would change every linked copy at once.
+
+ - The Cosmic Courier
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from .pdf_extract import file_sha256
+from .writer import atomic_replace, temp_path_for
+
+PUBLISH_FORMAT = "rag-ingest-publish/1"
+ACTIONS = ("copy", "hardlink", "unchanged")
+
+
+@dataclass(frozen=True)
+class Published:
+    """📦 One file delivered to one target (`action` is one of ACTIONS)."""
+    name: str
+    sha256: str
+    bytes: int
+    action: str
+
+
+def manifest_path(json_path: Path | str) -> Path:
+    """📍 `embeddings.json` → `embeddings.manifest.json`"""
+    json_path = Path(json_path)
+    return json_path.with_name(f"{json_path.stem}.manifest.json")
+
+
+def _fingerprint(path: Path) -> list[int]:
+    """🔍 (size, mtime_ns, inode): changes whenever the file is replaced or rewritten."""
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def _read_manifest(path: Path) -> dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return manifest.get("files", {}) if manifest.get("format") == PUBLISH_FORMAT else {}
+
+
+def _is_current(target: Path, sha256: str, size: int, recorded: Optional[dict[str, Any]]) -> bool:
+    """✅ Whether `target` already holds these bytes (trusting the manifest while the file is untouched)."""
+    if not target.exists():
+        return False
+    if recorded and recorded.get("sha256") == sha256 and recorded.get("fingerprint") == _fingerprint(target):
+        return True
+    return target.stat().st_size == size and file_sha256(target) == sha256
+
+
+def _place(source: Path, target: Path, link: bool) -> str:
+    """🔒 Copy (or, with `link`, hardlink) `source` to a temp name beside `target`, then rename it into place."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = temp_path_for(target)
+    temp.unlink(missing_ok=True)
+    if link:
+        try:
+            os.link(source, temp)
+        except OSError:  # 🌙 cross-device, or a filesystem without hardlinks
+            pass
+        else:
+            os.replace(temp, target)
+            return "hardlink"
+    shutil.copyfile(source, temp)
+    atomic_replace(temp, target)
+    return "copy"
+
+
+def publish(
+    files: Sequence[Path | str],
+    source_json: Path | str,
+    target_jsons: Sequence[Path | str],
+    *,
+    link: bool = False,
+) -> dict[Path, list[Published]]:
+    """
+    📮 Publish `files` (the output `source_json` and its sidecars) beside every target JSON
+
+    Each file keeps its name, with `source_json`'s stem swapped for the
+    target's (`embeddings.vectors.npy` beside `embeddings.json` goes beside
+    the target JSON under the target's stem). Unchanged files are skipped;
+    changed ones are copied (hardlinked with `link`) and replaced atomically;
+    each target gets a manifest.
+    Returns what happened to every file, per target JSON.
+    """
+    source_json = Path(source_json)
+    sources = [Path(f) for f in files]
+    for source in sources:
+        if not source.name.startswith(source_json.stem):
+            raise ValueError(f"{source} is not an output of {source_json}")
+    hashes = {source: file_sha256(source) for source in sources}  # 🌟 hashed once, compared everywhere
+
+    results: dict[Path, list[Published]] = {}
+    for target_json in map(Path, target_jsons):
+        recorded = _read_manifest(manifest_path(target_json))
+        published, entries = [], {}
+        for source in sources:
+            target = target_json.with_name(target_json.stem + source.name[len(source_json.stem):])
+            size = source.stat().st_size
+            if _is_current(target, hashes[source], size, recorded.get(target.name)):
+                action = "unchanged"
+            else:
+                action = _place(source, target, link)
+            published.append(Published(target.name, hashes[source], size, action))
+            entries[target.name] = {"sha256": hashes[source], "bytes": size, "action": action,
+                                    "fingerprint": _fingerprint(target)}
+
+        manifest = {
+            "format": PUBLISH_FORMAT,
+            "published_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "source": str(source_json),
+            "files": entries,
+        }
+        path = manifest_path(target_json)
+        temp = temp_path_for(path)
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        atomic_replace(temp, path)
+        results[target_json] = published
+    return results
+
+
+def format_published(published: Sequence[Published]) -> str:
+    """📋 `2 copied, 1 unchanged` for the run log."""
+    labels = {"unchanged": "unchanged", "hardlink": "hardlinked", "copy": "copied"}
+    counts = {action: sum(1 for p in published if p.action == action) for action in ACTIONS}
+    return ", ".join(f"{count} {labels[action]}" for action, count in counts.items() if count) or "nothing"
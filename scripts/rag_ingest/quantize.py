@@ -0,0 +1,120 @@
+"""
+🪶 The Featherweight Forge — Smaller Crystals, Same Constellations ✨
+
+"Halve the bits and the stars still shine in the same places;
+ quarter them, and we measure exactly how many wander."
+
+Exports the float32 embedding matrix as float16 and as scalar-quantized
+int8 with per-dimension scale factors, then measures how far top-k results
+drift from the float32 baseline on a set of probe queries.
+
+int8 layout: `codes[i, d] = round(x[i, d] / scales[d])`, so a dot product
+with query q is `(q * scales) @ codes[i]` — scale the query once, then do
+an integer-valued matmul against the codes.
+
+Every export is written to a temp file and renamed into place, never
+rewritten in place, so variants published with `link=True` stay intact.
+
+ - The Cosmic Featherweight Smith
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .store import store_paths
+from .writer import atomic_replace, temp_path_for
+
+DEFAULT_TOP_K = 10
+
+
+def export_paths(json_path: Path | str) -> dict[str, Path]:
+    """🧭 Where the quantized exports live beside `embeddings.json`."""
+    vectors_path = store_paths(json_path)[0]
+    stem = vectors_path.name[: -len(".vectors.npy")]
+    return {
+        "float16": vectors_path.with_name(f"{stem}.vectors.f16.npy"),
+        "int8": vectors_path.with_name(f"{stem}.vectors.int8.npy"),
+        "int8_scales": vectors_path.with_name(f"{stem}.vectors.int8-scales.npy"),
+        "report": vectors_path.with_name(f"{stem}.quantization-report.json"),
+    }
+
+
+def quantize_int8(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """🎚️ Symmetric per-dimension int8 quantization → (codes, float32 scales)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=0) / 127.0
+    scales[scales == 0] = 1.0  # 🌙 all-zero columns stay zero
+    codes = np.clip(np.rint(matrix / scales), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def int8_scores(codes: np.ndarray, scales: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """🔮 Dot products of float queries against int8 codes, shape (queries, rows)."""
+    scaled = np.atleast_2d(queries).astype(np.float32) * scales
+    return scaled @ codes.astype(np.float32).T
+
+
+def topk_overlap(reference: np.ndarray, approx: np.ndarray, k: int) -> np.ndarray:
+    """📐 Per-query fraction of the reference top-k that the approximation also ranks top-k."""
+    k = min(k, reference.shape[1])
+    ref_top = np.argpartition(-reference, k - 1, axis=1)[:, :k]
+    approx_top = np.argpartition(-approx, k - 1, axis=1)[:, :k]
+    return np.array([len(set(r) & set(a)) / k for r, a in zip(ref_top, approx_top)])
+
+
+def write_quantized_exports(
+    json_path: Path | str,
+    matrix: np.ndarray,
+    probes: np.ndarray,
+    *,
+    k: int = DEFAULT_TOP_K,
+) -> dict[str, Any]:
+    """
+    💎 Write float16 + int8 exports beside `json_path` and a recall report
+
+    `probes` are query embeddings (one per row) used to compare top-k
+    overlap against exact float32 scores. Returns the report dict.
+    """
+    paths = export_paths(json_path)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    probes = np.atleast_2d(np.asarray(probes, dtype=np.float32))
+
+    half = matrix.astype(np.float16)
+    codes, scales = quantize_int8(matrix)
+    for name, array in (("float16", half), ("int8", codes), ("int8_scales", scales)):
+        with open(temp_path_for(paths[name]), "wb") as f:
+            np.save(f, array)
+        atomic_replace(temp_path_for(paths[name]), paths[name])
+
+    baseline = probes @ matrix.T
+    candidates = {
+        "float16": probes @ half.astype(np.float32).T,
+        "int8": int8_scores(codes, scales, probes),
+    }
+    float32_bytes = matrix.nbytes
+    report: dict[str, Any] = {
+        "top_k": min(k, matrix.shape[0]),
+        "probe_queries": int(probes.shape[0]),
+        "rows": int(matrix.shape[0]),
+        "dimensions": int(matrix.shape[1]),
+        "formats": {"float32": {"bytes": float32_bytes, "compression": 1.0, "mean_overlap": 1.0, "min_overlap": 1.0}},
+    }
+    sizes = {"float16": half.nbytes, "int8": codes.nbytes + scales.nbytes}
+    for name, scores in candidates.items():
+        overlap = topk_overlap(baseline, scores, k)
+        report["formats"][name] = {
+            "bytes": int(sizes[name]),
+            "compression": round(float32_bytes / sizes[name], 2),
+            "mean_overlap": round(float(overlap.mean()), 4),
+            "min_overlap": round(float(overlap.min()), 4),
+        }
+
+    with open(temp_path_for(paths["report"]), "w") as f:
+        json.dump(report, f, indent=2)
+    atomic_replace(temp_path_for(paths["report"]), paths["report"])
+    return report
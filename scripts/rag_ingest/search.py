@@ -0,0 +1,331 @@
+"""
+🔭 The Observatory — The Whole Sky Measured at Once ✨
+
+"The astronomer does not ride out to each star in turn;
+ the telescope is pointed once, and every star answers."
+
+Exact top-k cosine search over an `embeddings.json` (or its binary store) in
+NumPy: the Python counterpart of `searchEmbeddings` in the TypeScript apps,
+for offline evaluation and tooling, and the reference that faster,
+approximate engines are measured against.
+
+Loading normalizes every row once into a contiguous float32 matrix, so the
+cosine scores of a query are one matrix product, and a batch of queries is
+one matrix-matrix product. Top-k is an `argpartition` (linear time); only
+the k winners are sorted. Block-type filters mask scores instead of copying rows.
+With an IVF index beside the file (`rag_ingest.ann`), `nprobe=` searches
+approximately instead, and the exact matrix is never built.
+
+    index = VectorIndex.load("shared/data/embeddings.json")
+    hits = index.search(query_vector, k=5, block_types=["Anger"])
+    rows, scores = index.search_batch(query_matrix, k=10)
+
+    cd scripts && python -m rag_ingest.search "Why do I get so angry?" --provider local
+    cd scripts && python -m rag_ingest.search --bench
+    cd scripts && python -m rag_ingest.search --bench --nprobe 8
+
+ - The Cosmic Astronomer
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Collection, Optional
+
+import numpy as np
+
+from .cache import PROJECT_ROOT
+from .dimensions import api_dimensions
+from .store import current_binary_store
+
+if TYPE_CHECKING:
+    from .ann import IVFIndex
+
+DEFAULT_EMBEDDINGS_PATH = PROJECT_ROOT / "shared" / "data" / "embeddings.json"
+DEFAULT_K = 5  # 🌙 searchEmbeddings' topK
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """🌟 One result: the chunk's row in the index, its id, cosine score and block type."""
+    row: int
+    id: str
+    score: float
+    block_type: str
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """📏 A contiguous in-memory float32 copy with every row scaled to unit length (zero rows stay zero)."""
+    matrix = np.array(matrix, dtype=np.float32, order="C")  # 🌙 copies, so a memory-mapped store is left alone
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """🏆 (rows, scores) of the k best scores in each row of `scores`, best first."""
+    count = scores.shape[1]
+    k = min(k, count)
+    if k <= 0:
+        return np.empty((len(scores), 0), dtype=np.intp), np.empty((len(scores), 0), dtype=scores.dtype)
+    if k < count:
+        rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        rows = np.broadcast_to(np.arange(count), scores.shape)
+    best = np.take_along_axis(scores, rows, axis=1)
+    order = np.argsort(-best, axis=1, kind="stable")
+    return np.take_along_axis(rows, order, axis=1), np.take_along_axis(best, order, axis=1)
+
+
+class VectorIndex:
+    """
+    🔭 Exact cosine search over pre-normalized float32 rows
+
+    Usage:
+        index = VectorIndex.load(json_path)          # binary store if present, else the JSON
+        index.search(vector, k=5, block_types=["Anger", "Guilt"])
+        rows, scores = index.search_batch(matrix, k=10)
+        index.record(rows[0, 0])                     # {"text": ..., "metadata": ...}
+        VectorIndex.load(json_path, ann=True).search(vector, nprobe=8)   # approximate, via the IVF index
+
+    A `block_types` filter keeps only chunks of those types; one that
+    includes "General" keeps everything, as `filterByBlockType` does.
+    The normalized matrix is built on first exact search, so an index used
+    only through `nprobe=` never holds a second copy of the vectors.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        ids: list[str],
+        block_types: list[str],
+        *,
+        header: Optional[dict[str, Any]] = None,
+        records: Optional[Callable[[int], dict[str, Any]]] = None,
+        ann: Optional["IVFIndex"] = None,
+    ) -> None:
+        self._raw = np.atleast_2d(vectors)
+        if not len(ids) == len(block_types) == len(self._raw):
+            raise ValueError(f"{len(self._raw)} vectors, {len(ids)} ids and {len(block_types)} block types")
+        self.ann = ann
+        self.ids = list(ids)
+        self.block_types = list(block_types)
+        self.header = header or {}
+        self._records = records
+        self._codes = {name: code for code, name in enumerate(sorted(set(self.block_types)))}
+        self._block_codes = np.array([self._codes[name] for name in self.block_types], dtype=np.int32)
+        self._excluded: dict[frozenset[str], np.ndarray] = {}
+
+    @classmethod
+    def load(cls, json_path: Path | str = DEFAULT_EMBEDDINGS_PATH, *, ann: bool = False) -> "VectorIndex":
+        """
+        🔮 Load an index from the binary store beside `json_path` if it is current, else from the JSON
+
+        A store written for an earlier JSON is skipped with a warning. With
+        `ann`, also open the IVF index saved beside it (a stale one is refused).
+        """
+        json_path = Path(json_path)
+        store = current_binary_store(json_path)
+        if store is not None:
+            index = cls(store.vectors, store.ids, store.block_types, header=store.header, records=store.record)
+        else:
+            with open(json_path, encoding="utf-8") as f:
+                data = json.load(f)
+            chunks = data.pop("chunks")
+            records = [{"text": chunk.get("text", ""), "metadata": chunk.get("metadata", {})} for chunk in chunks]
+            index = cls(
+                np.asarray([chunk["embedding"] for chunk in chunks], dtype=np.float32).reshape(len(chunks), -1),
+                [chunk["id"] for chunk in chunks],
+                [chunk.get("block_type", "General") for chunk in chunks],
+                header=data,
+                records=records.__getitem__,
+            )
+        if ann:
+            from .ann import load_ivf
+            index.ann = load_ivf(json_path, index)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimensions(self) -> int:
+        return self._raw.shape[1]
+
+    def vectors_sha256(self) -> str:
+        """🔑 sha256 of the stored float32 rows in order — what a saved IVF index is tied to."""
+        digest = hashlib.sha256()
+        for start in range(0, len(self._raw), 8192):  # 🌙 a block at a time, so a memmap is never copied whole
+            digest.update(np.ascontiguousarray(self._raw[start:start + 8192], dtype=np.float32).tobytes())
+        return digest.hexdigest()
+
+    @cached_property
+    def vectors(self) -> np.ndarray:
+        """📏 The unit-length float32 matrix exact search scores against."""
+        return normalize_rows(self._raw)
+
+    def record(self, row: int) -> dict[str, Any]:
+        """📖 The text and metadata of the chunk in `row`."""
+        if self._records is None:
+            raise LookupError("this index was built from vectors alone; it has no chunk records")
+        return self._records(int(row))
+
+    def _excluded_rows(self, block_types: Optional[str | Collection[str]]) -> Optional[np.ndarray]:
+        """🎭 Rows a block-type filter leaves out (None when it keeps everything), computed once per filter."""
+        if block_types is None:
+            return None
+        wanted = frozenset([block_types] if isinstance(block_types, str) else block_types)
+        if "General" in wanted:
+            return None
+        if wanted not in self._excluded:
+            codes = [self._codes[name] for name in wanted if name in self._codes]
+            self._excluded[wanted] = np.flatnonzero(~np.isin(self._block_codes, codes))
+        return self._excluded[wanted]
+
+    def _queries(self, queries: np.ndarray) -> np.ndarray:
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if queries.shape[1] != self.dimensions:
+            raise ValueError(f"queries have {queries.shape[1]} dimensions, the index has {self.dimensions}")
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return queries / norms
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """🌊 Cosine similarity of every query (row) with every chunk, shape (queries, chunks)."""
+        return self._queries(queries) @ self.vectors.T
+
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        k: int = DEFAULT_K,
+        *,
+        block_types: Optional[str | Collection[str]] = None,
+        nprobe: Optional[int] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        🎯 (rows, scores), each shaped (queries, k): every query's k nearest chunks, best first
+
+        Fewer than k columns come back when the filter leaves fewer chunks.
+        With `nprobe`, only that many IVF lists are searched; a query whose
+        lists hold fewer than k matches is padded with row -1, score -inf.
+        """
+        excluded = self._excluded_rows(block_types)
+        if nprobe is not None:
+            if self.ann is None:
+                raise ValueError("nprobe needs an IVF index: load with ann=True (build one with rag_ingest.ann)")
+            allowed = None
+            if excluded is not None:
+                allowed = np.ones(len(self), dtype=bool)
+                allowed[excluded] = False
+            return self.ann.search_batch(self._queries(queries), k, nprobe=nprobe, allowed=allowed)
+        scores = self.scores(queries)
+        if excluded is not None:
+            scores[:, excluded] = -np.inf
+            k = min(k, len(self) - len(excluded))
+        return top_k(scores, k)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = DEFAULT_K,
+        *,
+        block_types: Optional[str | Collection[str]] = None,
+        min_score: Optional[float] = None,
+        nprobe: Optional[int] = None,
+    ) -> list[SearchHit]:
+        """🔍 The k chunks nearest one query vector, best first (only those scoring at least `min_score`)."""
+        rows, scores = self.search_batch(np.asarray(query)[None, :], k, block_types=block_types, nprobe=nprobe)
+        return [
+            SearchHit(int(row), self.ids[row], float(score), self.block_types[row])
+            for row, score in zip(rows[0], scores[0])
+            if row >= 0 and (min_score is None or score >= min_score)
+        ]
+
+
+def benchmark(
+    index: VectorIndex,
+    queries: np.ndarray,
+    *,
+    k: int = DEFAULT_K,
+    batch_size: int = 256,
+    block_types: Optional[Collection[str]] = None,
+    nprobe: Optional[int] = None,
+) -> dict[str, float]:
+    """⏱️ Queries per second, one at a time and in batches of `batch_size`."""
+    started = time.perf_counter()
+    for query in queries:
+        index.search_batch(query, k, block_types=block_types, nprobe=nprobe)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for start in range(0, len(queries), batch_size):
+        index.search_batch(queries[start:start + batch_size], k, block_types=block_types, nprobe=nprobe)
+    batched = time.perf_counter() - started
+    return {
+        "queries": len(queries),
+        "single_qps": round(len(queries) / single),
+        "single_ms": round(single / len(queries) * 1000, 4),
+        "batched_qps": round(len(queries) / batched),
+        "batch_size": batch_size,
+    }
+
+
+def sample_queries(index: VectorIndex, count: int, *, noise: float = 0.5, seed: int = 0) -> np.ndarray:
+    """🎲 Query-like vectors: random chunks, blurred with Gaussian noise (the right shape for benchmarks)."""
+    rng = np.random.default_rng(seed)
+    rows = index.vectors[rng.integers(len(index), size=count)]
+    blur = rng.standard_normal(rows.shape).astype(np.float32) * noise / np.sqrt(index.dimensions)
+    return normalize_rows(rows + blur)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """🚀 Search an embeddings file for a question, or benchmark the engine, from the command line."""
+    parser = argparse.ArgumentParser(description="Exact top-k search over embeddings.json")
+    parser.add_argument("query", nargs="?", help="question to search for (embedded with --provider)")
+    parser.add_argument("--input", type=Path, default=DEFAULT_EMBEDDINGS_PATH,
+                        help=f"embeddings file (default {DEFAULT_EMBEDDINGS_PATH}); its binary store is used if present")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help=f"results per query (default {DEFAULT_K})")
+    parser.add_argument("--block", action="append", dest="block_types", metavar="BLOCK_TYPE",
+                        help="only search chunks of this block type (repeatable)")
+    parser.add_argument("--provider", default=None,
+                        help="embedding provider spec for the query (default EMBEDDING_PROVIDER, or openai)")
+    parser.add_argument("--nprobe", type=int, default=None,
+                        help="search approximately, probing this many lists of the IVF index beside --input")
+    parser.add_argument("--bench", action="store_true", help="measure queries/sec with sampled query vectors")
+    parser.add_argument("--queries", type=int, default=10_000, help="queries for --bench (default 10000)")
+    args = parser.parse_args(argv)
+    if not args.bench and not args.query:
+        parser.error("give a query, or --bench")
+
+    started = time.perf_counter()
+    index = VectorIndex.load(args.input, ann=args.nprobe is not None)
+    print(f"🔭 {len(index):,} chunks x {index.dimensions} loaded in {time.perf_counter() - started:.2f}s")
+
+    if args.bench:
+        report = benchmark(index, sample_queries(index, args.queries), k=args.k, block_types=args.block_types,
+                           nprobe=args.nprobe)
+        print(f"⏱️ single: {report['single_qps']:,} q/s ({report['single_ms']} ms/query); "
+              f"batched x{report['batch_size']}: {report['batched_qps']:,} q/s")
+        return
+
+    from dotenv import load_dotenv
+    from .providers import DEFAULT_PROVIDER, make_provider
+    load_dotenv()
+    model = index.header.get("model", "text-embedding-3-small")
+    extra = {"dimensions": dims} if (dims := api_dimensions(model, index.dimensions)) else {}
+    client = make_provider(args.provider or DEFAULT_PROVIDER).client()
+    vector = client.embeddings.create(input=[args.query], model=model, **extra).data[0].embedding
+    for rank, hit in enumerate(index.search(vector, args.k, block_types=args.block_types, nprobe=args.nprobe), 1):
+        text = " ".join(index.record(hit.row)["text"].split())
+        print(f"{rank:>2}. {hit.score:.3f}  [{hit.block_type}] {hit.id}\n    {text[:160]}")
+
+
+if __name__ == "__main__":
+    main()
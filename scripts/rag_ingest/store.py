@@ -0,0 +1,265 @@
+"""
+🗄️ The Binary Reliquary — Vectors as Raw Crystal, Not Pretty-Printed Prose ✨
+
+"Fifteen hundred floats spelled out digit by digit is poetry;
+ six kilobytes of float32 laid end to end is architecture."
+
+An alternate on-disk layout for `embeddings.json` that consumers can
+memory-map instead of parsing:
+
+    embeddings.vectors.npy    float32 matrix, shape (total_chunks, dimensions)
+    embeddings.meta.json      header + ids + block_types + record byte offsets
+    embeddings.records.jsonl  one {"text", "metadata"} line per chunk
+
+Row i of the matrix, `ids[i]`, `block_types[i]` and the record at
+`record_offsets[i]` all describe the same chunk. The sidecar also records
+the sha256 of the JSON it was written with; a store whose JSON has since
+been replaced (by a run without --binary, say) is ignored by
+`current_binary_store` rather than served in the JSON's place.
+
+ - The Cosmic Reliquary Curator
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from .writer import atomic_replace, temp_path_for
+
+STORE_FORMAT = "rag-ingest-binary/1"
+VECTORS_SUFFIX = ".vectors.npy"
+META_SUFFIX = ".meta.json"
+RECORDS_SUFFIX = ".records.jsonl"
+
+
+def store_paths(json_path: Path | str) -> tuple[Path, Path, Path]:
+    """🧭 The (vectors, meta, records) paths that sit beside `embeddings.json`."""
+    json_path = Path(json_path)
+    stem = json_path.with_suffix("")
+    return (
+        stem.with_name(stem.name + VECTORS_SUFFIX),
+        stem.with_name(stem.name + META_SUFFIX),
+        stem.with_name(stem.name + RECORDS_SUFFIX),
+    )
+
+
+def json_sha256(json_path: Path | str) -> str:
+    """🔑 sha256 of the JSON's bytes — the fingerprint a store is tied to (hashing is far cheaper than parsing)."""
+    digest = hashlib.sha256()
+    with open(json_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def remove_binary_store(json_path: Path | str) -> list[Path]:
+    """🧹 Delete the store beside `json_path` so a run without --binary leaves no stale one; returns what went."""
+    removed = []
+    for path in store_paths(json_path):
+        if path.exists():
+            path.unlink()
+            removed.append(path)
+    return removed
+
+
+class BinaryStoreWriter:
+    """
+    🌊 Row-at-a-time writer for the binary layout
+
+    The float32 matrix is pre-allocated as a memory-mapped `.npy` of shape
+    (rows, dimensions) and filled as chunks arrive, so nothing accumulates in
+    memory. Files are written under temp names and renamed into place by
+    `close`; `abort` (or leaving a `with` block on error) discards them.
+    """
+
+    def __init__(self, json_path: Path | str, rows: int, dimensions: int) -> None:
+        self.paths = store_paths(json_path)
+        self.rows = rows
+        self.dimensions = dimensions
+        self.ids: list[str] = []
+        self.block_types: list[str] = []
+        self.offsets: list[int] = []
+        self._closed = False
+
+        vectors_path, _, records_path = self.paths
+        vectors_path.parent.mkdir(parents=True, exist_ok=True)
+        self._matrix = np.lib.format.open_memmap(
+            temp_path_for(vectors_path), mode="w+", dtype=np.float32, shape=(rows, dimensions)
+        )
+        self._records = open(temp_path_for(records_path), "wb")
+
+    def write_chunk(self, chunk: dict[str, Any]) -> None:
+        """💎 Append one chunk: its row, id, block type and text/metadata record."""
+        row = len(self.ids)
+        if row >= self.rows:
+            raise IndexError(f"store was sized for {self.rows} rows")
+        self._matrix[row] = chunk["embedding"]
+        self.ids.append(chunk["id"])
+        self.block_types.append(chunk.get("block_type", "General"))
+        self.offsets.append(self._records.tell())
+        line = json.dumps({"text": chunk.get("text", ""), "metadata": chunk.get("metadata", {})})
+        self._records.write(line.encode("utf-8") + b"\n")
+
+    def close(self, header: dict[str, Any], *, json_sha256: Optional[str]) -> list[Path]:
+        """🎉 Write the meta sidecar (tied to the JSON with sha256 `json_sha256`), then publish all three files."""
+        if len(self.ids) != self.rows:
+            raise ValueError(f"store expects {self.rows} rows, got {len(self.ids)}")
+        vectors_path, meta_path, records_path = self.paths
+        self._matrix.flush()
+        del self._matrix
+        self._records.close()
+
+        meta = {key: value for key, value in header.items() if key != "chunks"}
+        meta.update({
+            "format": STORE_FORMAT,
+            "dtype": "float32",
+            "shape": [self.rows, self.dimensions],
+            "vectors_file": vectors_path.name,
+            "records_file": records_path.name,
+            "ids": self.ids,
+            "block_types": self.block_types,
+            "record_offsets": self.offsets,
+            "json_sha256": json_sha256,
+        })
+        with open(temp_path_for(meta_path), "w") as f:
+            json.dump(meta, f, separators=(",", ":"))
+
+        for path in (vectors_path, records_path, meta_path):  # 🌙 sidecar last: it vouches for the rest
+            atomic_replace(temp_path_for(path), path)
+        self._closed = True
+        return list(self.paths)
+
+    def abort(self) -> None:
+        """🌙 Discard the temp files."""
+        if hasattr(self, "_matrix"):
+            del self._matrix
+        self._records.close()
+        for path in self.paths:
+            temp_path_for(path).unlink(missing_ok=True)
+        self._closed = True
+
+    def __enter__(self) -> "BinaryStoreWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self._closed:
+            self.abort()
+
+
+def write_binary_store(output_data: dict[str, Any], json_path: Path | str) -> list[Path]:
+    """
+    💎 Write the binary layout for an `embeddings.json`-shaped dict
+
+    `output_data` is the same structure the scripts hand to `json.dump`;
+    the files land beside `json_path`. Write the JSON first: the store
+    records its sha256 (a store written before its JSON is never current).
+    Returns the written paths.
+    """
+    json_path = Path(json_path)
+    chunks = output_data.get("chunks", [])
+    dimensions = len(chunks[0]["embedding"]) if chunks else int(output_data.get("dimensions", 0))
+    with BinaryStoreWriter(json_path, len(chunks), dimensions) as writer:
+        for chunk in chunks:
+            writer.write_chunk(chunk)
+        return writer.close(output_data, json_sha256=json_sha256(json_path) if json_path.exists() else None)
+
+
+@dataclass
+class EmbeddingStore:
+    """
+    🏛️ A memory-mapped view of the binary layout
+
+    `vectors` is a read-only `np.memmap` — rows are paged in on demand, so
+    opening the store costs only the small meta sidecar.
+    """
+    header: dict[str, Any]
+    vectors: np.ndarray
+    ids: list[str]
+    block_types: list[str]
+    record_offsets: list[int]
+    records_path: Path
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def record(self, row: int) -> dict[str, Any]:
+        """📖 Read one chunk's text + metadata by seeking to its offset."""
+        with open(self.records_path, "rb") as f:
+            f.seek(self.record_offsets[row])
+            return json.loads(f.readline())
+
+    def chunk(self, row: int) -> dict[str, Any]:
+        """🎨 Rebuild the `embeddings.json` chunk dict for one row (copies the vector)."""
+        record = self.record(row)
+        return {
+            "id": self.ids[row],
+            "text": record["text"],
+            "embedding": self.vectors[row].tolist(),
+            "block_type": self.block_types[row],
+            "metadata": record["metadata"],
+        }
+
+
+def load_binary_store(json_path: Path | str, *, mmap_mode: Optional[str] = "r") -> EmbeddingStore:
+    """🔮 Open the binary layout beside `json_path`, memory-mapping the matrix zero-copy."""
+    vectors_path, meta_path, records_path = store_paths(json_path)
+    with open(meta_path) as f:
+        header = json.load(f)
+    if header.get("format") != STORE_FORMAT:
+        raise ValueError(f"{meta_path} is not a {STORE_FORMAT} sidecar")
+
+    vectors = np.load(vectors_path, mmap_mode=mmap_mode)
+    if list(vectors.shape) != header["shape"]:
+        raise ValueError(f"{vectors_path} has shape {vectors.shape}, sidecar says {header['shape']}")
+
+    return EmbeddingStore(
+        header=header,
+        vectors=vectors,
+        ids=header.pop("ids"),
+        block_types=header.pop("block_types"),
+        record_offsets=header.pop("record_offsets"),
+        records_path=records_path,
+    )
+
+
+def current_binary_store(json_path: Path | str) -> Optional[EmbeddingStore]:
+    """
+    🔍 The binary store beside `json_path`, or None when there is none or it describes another JSON
+
+    A store whose recorded sha256 no longer matches the JSON is stale; it is
+    skipped with a warning so callers read the JSON instead. With no JSON
+    beside it at all, the store is all there is and is returned as it stands.
+    """
+    json_path = Path(json_path)
+    if not store_paths(json_path)[1].exists():
+        return None
+    store = load_binary_store(json_path)
+    if json_path.exists() and store.header.get("json_sha256") != json_sha256(json_path):
+        warnings.warn(f"the binary store beside {json_path} was written for a different {json_path.name}; "
+                      f"reading the JSON instead (rerun with --binary to refresh the store)")
+        return None
+    return store
+
+
+def load_embedding_matrix(json_path: Path | str) -> tuple[list[str], list[str], np.ndarray]:
+    """
+    🧲 (ids, block_types, float32 matrix) from the binary store if it is current, else the JSON
+
+    Handy for offline tooling that only needs the vectors and their labels.
+    """
+    json_path = Path(json_path)
+    store = current_binary_store(json_path)
+    if store is not None:
+        return store.ids, store.block_types, store.vectors
+
+    with open(json_path) as f:
+        chunks = json.load(f)["chunks"]
+    matrix = np.asarray([chunk["embedding"] for chunk in chunks], dtype=np.float32)
+    return [c["id"] for c in chunks], [c.get("block_type", "General") for c in chunks], matrix
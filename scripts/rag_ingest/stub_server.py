@@ -0,0 +1,212 @@
+"""
+🎭 The Rehearsal Hall — A Local Stand-in for the Embeddings API ✨
+
+"Before opening night, the orchestra rehearses in an empty hall
+ that answers slowly, sometimes grumbles, and never sends a bill."
+
+A tiny OpenAI-compatible `POST /v1/embeddings` server for offline load tests.
+It simulates per-request latency, stragglers (rare requests that hang far
+longer before succeeding), a requests/min quota that answers 429 with
+Retry-After when exceeded, random 429s and random 5xx failures. Vectors are
+derived from a hash of each input so the same text always gets the same
+embedding.
+
+Run it, then point an ingest script at it:
+
+    python -m rag_ingest.stub_server --port 8089 --latency 0.2 --rpm 600 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=stub python scripts/ingest_pdf_rag.py
+
+ - The Cosmic Rehearsal Stage Manager
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+@dataclass
+class StubConfig:
+    """🎛️ How grumpy the rehearsal hall should be."""
+    latency: float = 0.05          # 🌙 base seconds per request
+    jitter: float = 0.0            # 🌙 extra uniform random seconds
+    requests_per_minute: int = 0   # 🌙 0 = unlimited
+    throttle_rate: float = 0.0     # 🌙 probability of a random 429 ...
+    retry_after: float = 1.0       # 🌙 ... advertising this Retry-After
+    error_rate: float = 0.0        # 🌙 probability of a 500
+    straggler_rate: float = 0.0    # 🌙 probability a request hangs ...
+    straggler_latency: float = 10.0  # 🌙 ... this many extra seconds, then succeeds
+    dimensions: int = 1536
+
+
+def stub_vector(text: str, dimensions: int) -> list[float]:
+    """🔮 Deterministic unit vector seeded from the text's sha256."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    values = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "StubEmbeddingServer"
+
+    def log_message(self, format: str, *args) -> None:  # 🌙 keep the hall quiet
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):  # 🌙 the caller gave up (a hedged straggler)
+            self.server.stats["abandoned"] += 1
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/embeddings"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        config = self.server.config
+        self.server.stats["requests"] += 1
+
+        retry_after = self.server.admit()
+        if retry_after is None and config.throttle_rate and random.random() < config.throttle_rate:
+            retry_after = config.retry_after
+        if retry_after is not None:
+            self.server.stats["throttled"] += 1
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (stub)", "type": "requests"}},
+                {"Retry-After": f"{retry_after:.3f}"},
+            )
+            return
+
+        delay = config.latency + random.uniform(0, config.jitter)
+        if config.straggler_rate and random.random() < config.straggler_rate:
+            self.server.stats["stragglers"] += 1
+            delay += config.straggler_latency
+        time.sleep(delay)
+
+        if config.error_rate and random.random() < config.error_rate:
+            self.server.stats["errors"] += 1
+            self._send_json(500, {"error": {"message": "Simulated server error (stub)"}})
+            return
+
+        inputs = request.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = request.get("dimensions") or config.dimensions
+        data = [
+            {"object": "embedding", "index": i, "embedding": stub_vector(text, dimensions)}
+            for i, text in enumerate(inputs)
+        ]
+        tokens = sum(len(text) // 4 + 1 for text in inputs)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "stub"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+
+class StubEmbeddingServer(ThreadingHTTPServer):
+    """
+    🎪 Threaded stub server
+
+    Usage:
+        server = StubEmbeddingServer(("127.0.0.1", 0), StubConfig(latency=0.1, requests_per_minute=120))
+        server.serve_in_background()
+        base_url = server.base_url  # e.g. http://127.0.0.1:54321/v1
+        ...
+        server.shutdown()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: Optional[StubConfig] = None) -> None:
+        super().__init__(address, _Handler)
+        self.config = config or StubConfig()
+        self.stats: collections.Counter = collections.Counter()
+        self._window: collections.deque = collections.deque()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def admit(self) -> Optional[float]:
+        """🚪 Sliding one-minute window: None to admit, else seconds until a slot frees up."""
+        limit = self.config.requests_per_minute
+        if not limit:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 60.0:
+                self._window.popleft()
+            if len(self._window) >= limit:
+                return 60.0 - (now - self._window[0])
+            self._window.append(now)
+            return None
+
+    def serve_in_background(self) -> threading.Thread:
+        """🌙 Serve from a daemon thread and return it."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """🚀 Open the rehearsal hall from the command line."""
+    parser = argparse.ArgumentParser(description="Local stub of the OpenAI embeddings API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05, help="base seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random seconds")
+    parser.add_argument("--rpm", type=int, default=0, help="requests/min before answering 429 (0 = unlimited)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="probability of a random 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on random 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a simulated 500")
+    parser.add_argument("--straggler-rate", type=float, default=0.0, help="probability a request hangs")
+    parser.add_argument("--straggler-latency", type=float, default=10.0, help="extra seconds a straggler hangs")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    args = parser.parse_args(argv)
+
+    config = StubConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        requests_per_minute=args.rpm,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        straggler_rate=args.straggler_rate,
+        straggler_latency=args.straggler_latency,
+        dimensions=args.dimensions,
+    )
+    server = StubEmbeddingServer((args.host, args.port), config)
+    print(f"🎭 Stub embeddings API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n🌙 Hall closed. {dict(server.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+📈 The Run Ledger — Where Did the Time (and the Money) Go? ✨
+
+"Emoji progress lines cheer a run along;
+ numbers written down let you compare it with the next one."
+
+`RunTelemetry` records one ingest run and writes a machine-readable metrics
+file next to its output (`embeddings.metrics.json` beside
+`embeddings.json`). It also appends the same record as one line to a
+history file, `.cache/metrics/<script>.jsonl`, so runs can be compared over
+time:
+
+    stages      exclusive wall seconds per stage (extract, chunk, classify,
+                embed, write, ...). Nested stages pause their parent, so
+                streamed extraction inside chunking is not counted twice.
+    requests    count, retries, throttles, hedges (and hedges that won),
+                latency percentiles and a histogram (milliseconds)
+    tokens      tokens and inputs in successful requests
+    cost        estimated USD at the model's list price
+    chunks      written / embedded by the API / served from cache or journal,
+                plus chunks per second
+
+ - The Cosmic Ledger Keeper
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+import numpy as np
+
+from .async_embed import AsyncEmbedStats
+from .cache import PROJECT_ROOT
+from .writer import atomic_replace, temp_path_for
+
+METRICS_FORMAT = "rag-ingest-metrics/1"
+DEFAULT_HISTORY_DIR = PROJECT_ROOT / ".cache" / "metrics"
+
+# 💸 List prices, USD per million input tokens
+USD_PER_MILLION_TOKENS = {
+    "text-embedding-3-small": 0.02,
+    "text-embedding-3-large": 0.13,
+    "text-embedding-ada-002": 0.10,
+}
+
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)  # 🌙 upper edges; the rest is "inf"
+
+T = TypeVar("T")
+
+
+def metrics_path(output_path: Path | str) -> Path:
+    """📍 `embeddings.json` → `embeddings.metrics.json`"""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}.metrics.json")
+
+
+def estimate_cost(model: str, tokens: int) -> Optional[float]:
+    """💸 USD for `tokens` input tokens of `model`, or None for an unknown model."""
+    price = USD_PER_MILLION_TOKENS.get(model)
+    return None if price is None else round(tokens * price / 1_000_000, 6)
+
+
+def latency_summary(latencies: list[float]) -> dict[str, Any]:
+    """⏱️ Mean, percentiles, max and a bucketed histogram of latencies (seconds in, milliseconds out)."""
+    if not latencies:
+        return {"count": 0}
+    ms = np.asarray(latencies) * 1000
+    edges = [*LATENCY_BUCKETS_MS, float("inf")]
+    counts = np.bincount(np.searchsorted(edges, ms), minlength=len(edges))  # 🌙 bucket i holds edges[i-1] < ms <= edges[i]
+    return {
+        "count": len(ms),
+        "mean_ms": round(float(ms.mean()), 2),
+        **{f"p{q}_ms": round(float(np.percentile(ms, q)), 2) for q in LATENCY_PERCENTILES},
+        "max_ms": round(float(ms.max()), 2),
+        "histogram_ms": {f"<={edge:g}" if edge != float("inf") else "inf": int(count)
+                         for edge, count in zip(edges, counts)},
+    }
+
+
+class RunTelemetry:
+    """
+    📈 Stage timers and request stats for one run
+
+    Usage:
+        telemetry = RunTelemetry("ingest_pdf_rag", model=EMBEDDING_MODEL, config={...})
+        pages = telemetry.timed("extract", iter_pages(pdf))
+        with telemetry.stage("chunk"):
+            chunks = list(chunker.chunk(pages))
+        embed_texts_async(..., stats=telemetry.requests)
+        telemetry.write(OUTPUT_PATH, chunks={"written": len(chunks)})
+    """
+
+    def __init__(
+        self,
+        script: str,
+        *,
+        model: str,
+        config: Optional[dict[str, Any]] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.script = script
+        self.model = model
+        self.config = config or {}
+        self.requests = AsyncEmbedStats()
+        self.stages: dict[str, float] = defaultdict(float)
+        self.started_at = datetime.now(timezone.utc)
+        self._clock = clock
+        self._start = clock()
+        self._stack: list[str] = []
+        self._since = self._start
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """⏱️ Charge the time inside the block to `name` (and not to any enclosing stage)."""
+        now = self._clock()
+        if self._stack:
+            self.stages[self._stack[-1]] += now - self._since
+        self._stack.append(name)
+        self._since = now
+        try:
+            yield
+        finally:
+            now = self._clock()
+            self.stages[self._stack.pop()] += now - self._since
+            self._since = now
+
+    def timed(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """🌊 Yield from `items`, charging the time spent producing each one to `name`."""
+        iterator = iter(items)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def report(self, chunks: Optional[dict[str, int]] = None, **extra: Any) -> dict[str, Any]:
+        """📋 Everything recorded so far, as one JSON-ready dict."""
+        wall = self._clock() - self._start
+        chunks = dict(chunks or {})
+        stats = self.requests
+        embed_seconds = self.stages.get("embed", 0.0)
+        report = {
+            "format": METRICS_FORMAT,
+            "script": self.script,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(wall, 3),
+            "config": {"model": self.model, **self.config},
+            "stages": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+            "chunks": chunks,
+            "throughput": {
+                "chunks_per_sec": round(chunks.get("written", 0) / wall, 2) if wall else None,
+                "embedded_per_embed_sec": (
+                    round(chunks.get("embedded", 0) / embed_seconds, 2) if embed_seconds else None
+                ),
+            },
+            "requests": {
+                "attempts": stats.requests,
+                "retries": stats.retries,
+                "throttled": stats.throttled,
+                "hedged": stats.hedged,
+                "hedge_wins": stats.hedge_wins,
+                "latency": latency_summary(stats.latencies),
+            },
+            "tokens": {"sent": stats.tokens, "inputs": stats.inputs},
+            "cost": {
+                "model": self.model,
+                "usd_per_million_tokens": USD_PER_MILLION_TOKENS.get(self.model),
+                "estimated_usd": estimate_cost(self.model, stats.tokens),
+            },
+        }
+        report.update(extra)
+        return report
+
+    def write(
+        self,
+        output_path: Path | str,
+        *,
+        history_dir: Optional[Path] = DEFAULT_HISTORY_DIR,
+        chunks: Optional[dict[str, int]] = None,
+        **extra: Any,
+    ) -> Path:
+        """💾 Write the report beside `output_path` (atomically) and append it to the run history."""
+        report = self.report(chunks, **extra)
+        path = metrics_path(output_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = temp_path_for(path)  # 🔒 fsynced and renamed, like every other output
+        with open(temp, "w") as f:
+            json.dump(report, f, indent=2)
+        atomic_replace(temp, path)
+        if history_dir is not None:
+            history_dir.mkdir(parents=True, exist_ok=True)
+            with open(history_dir / f"{self.script}.jsonl", "a") as f:
+                f.write(json.dumps(report) + "\n")
+        return path
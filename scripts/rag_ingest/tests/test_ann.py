@@ -0,0 +1,112 @@
+"""
+🧪 Tests for the Signposts — IVF search agrees with exact search, respects filters, refuses stale indexes.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.ann import ann_paths, build_ann_index, load_ivf, remove_ann_index  # noqa: E402
+from rag_ingest.search import VectorIndex, sample_queries  # noqa: E402
+from rag_ingest.store import write_binary_store  # noqa: E402
+
+BLOCKS = ["Anger", "Guilt", "General", "Anxiety"]
+
+
+def _embeddings(tmp_path: Path, rows: int = 400, dimensions: int = 16, *, tag: str = "") -> Path:
+    """Clustered vectors, like real chunks: a few topics, each a cloud of neighbors."""
+    rng = np.random.default_rng(3)
+    topics = rng.standard_normal((20, dimensions))
+    matrix = topics[rng.integers(len(topics), size=rows)] + 0.3 * rng.standard_normal((rows, dimensions))
+    data = {
+        "version": "3.0", "model": "text-embedding-3-small", "dimensions": dimensions,
+        "chunks": [{"id": f"doc{tag}:p{i}:{i:04x}", "text": f"chunk {i}", "embedding": matrix[i].tolist(),
+                    "block_type": BLOCKS[i % len(BLOCKS)], "metadata": {"page": i}} for i in range(rows)],
+    }
+    path = tmp_path / "embeddings.json"
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_recall_rises_with_nprobe_and_probing_every_list_is_exact(tmp_path):
+    path = _embeddings(tmp_path)
+    report = build_ann_index(path, nlist=16, queries=50)
+
+    assert all(file.exists() for file in ann_paths(path).values())
+    assert json.loads(ann_paths(path)["report"].read_text())["nlist"] == report["nlist"] == 16
+    recalls = [row["recall"] for row in report["nprobe"]]
+    assert recalls == sorted(recalls) and recalls[-1] == 1.0 and recalls[0] < 1.0
+    assert [row["nprobe"] for row in report["nprobe"]] == [1, 2, 4, 8, 16]  # 🌙 capped at nlist
+
+    index = VectorIndex.load(path, ann=True)
+    queries = sample_queries(index, 20, seed=5)
+    exact_rows, exact_scores = index.search_batch(queries, k=5)
+    rows, scores = index.search_batch(queries, k=5, nprobe=16)
+    assert np.array_equal(rows, exact_rows) and np.allclose(scores, exact_scores, atol=1e-6)
+    assert [hit.row for hit in index.search(queries[0], k=5, nprobe=16)] == list(exact_rows[0])
+
+
+def test_block_type_filters_hold_and_short_lists_are_padded(tmp_path):
+    path = _embeddings(tmp_path)
+    build_ann_index(path, nlist=16, queries=10)
+    index = VectorIndex.load(path, ann=True)
+    query = sample_queries(index, 1, seed=9)[0]
+
+    hits = index.search(query, k=5, block_types=["Guilt"], nprobe=4)
+    assert len(hits) == 5 and {hit.block_type for hit in hits} == {"Guilt"}
+    assert index.search(query, k=5, block_types=["Guilt", "General"], nprobe=4) == index.search(query, k=5, nprobe=4)
+
+    rows, scores = index.search_batch(query, k=len(index), nprobe=1)  # 🌙 one list cannot hold every chunk
+    found = rows[0] >= 0
+    assert 0 < found.sum() < len(index) and np.all(np.isneginf(scores[0][~found]))
+    assert len(index.search(query, k=len(index), nprobe=1)) == found.sum()
+
+    with pytest.raises(ValueError, match="IVF index"):
+        VectorIndex.load(path).search(query, nprobe=4)
+
+
+def test_index_built_from_the_binary_store_is_refused_once_the_embeddings_change(tmp_path):
+    path = _embeddings(tmp_path)
+    write_binary_store(json.loads(path.read_text()), path)
+    build_ann_index(path, nlist=8, queries=10)
+
+    ivf = load_ivf(path)
+    assert isinstance(ivf.vectors, np.memmap) and ivf.header["rows"] == 400
+    assert sorted(ivf.rows) == list(range(400)) and ivf.offsets[-1] == 400
+    assert VectorIndex.load(path, ann=True).ann.nlist == 8
+
+    rebuilt = _embeddings(tmp_path, tag="-v2")  # 🌙 a new ingest, without --ann
+    write_binary_store(json.loads(rebuilt.read_text()), rebuilt)
+    with pytest.raises(ValueError, match="rebuild"):
+        VectorIndex.load(rebuilt, ann=True)
+
+
+def test_same_ids_with_a_new_width_or_new_vectors_are_refused_and_a_run_without_ann_cleans_up(tmp_path):
+    path = _embeddings(tmp_path, dimensions=8)
+    build_ann_index(path, nlist=8, queries=10)
+
+    _embeddings(tmp_path, dimensions=4)  # 🌙 same content-derived ids, --dimensions changed
+    with pytest.raises(ValueError, match=r"\(dimensions differs\); rebuild"):
+        VectorIndex.load(path, ann=True)
+
+    build_ann_index(path, nlist=8, queries=10)
+    data = json.loads(path.read_text())
+    data["chunks"][0]["embedding"] = [-x for x in data["chunks"][0]["embedding"]]  # 🌙 same width, other vectors
+    path.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match=r"\(vectors_sha256 differs\)"):
+        VectorIndex.load(path, ann=True)
+    data["model"] = "text-embedding-3-large"
+    path.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match=r"\(model differs\)"):
+        VectorIndex.load(path, ann=True)
+
+    assert sorted(remove_ann_index(path)) == sorted(ann_paths(path).values())
+    assert not any(file.exists() for file in ann_paths(path).values()) and remove_ann_index(path) == []
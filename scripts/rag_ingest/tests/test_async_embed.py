@@ -0,0 +1,87 @@
+"""
+🧪 Tests for the Concurrent Conductor — rehearsed against the local stub hall.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from openai import AsyncOpenAI
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.async_embed import (  # noqa: E402
+    AsyncEmbedStats,
+    RetryPolicy,
+    TokenBucket,
+    embed_texts_async,
+    parse_retry_after,
+)
+from rag_ingest.stub_server import StubConfig, StubEmbeddingServer, stub_vector  # noqa: E402
+
+
+@pytest.fixture
+def stub_hall():
+    """🎭 A throttling, slightly flaky stub API on a free port."""
+    server = StubEmbeddingServer(
+        ("127.0.0.1", 0),
+        StubConfig(latency=0.01, jitter=0.02, throttle_rate=0.3, retry_after=0.05, error_rate=0.1, dimensions=8),
+    )
+    server.serve_in_background()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_embed_texts_async_keeps_order_through_throttles_and_errors(stub_hall):
+    """🧪 Retried, out-of-order batches still land at their original positions."""
+    texts = [f"wisdom nugget {i}" for i in range(40)]
+    stats = AsyncEmbedStats()
+    client = AsyncOpenAI(api_key="stub", base_url=stub_hall.base_url, max_retries=0)
+
+    vectors = asyncio.run(embed_texts_async(
+        client, texts, concurrency=4, max_items=3, stats=stats,
+        retry=RetryPolicy(max_attempts=20, base_delay=0.01, max_delay=0.1),
+    ))
+
+    assert vectors == [pytest.approx(stub_vector(text, 8)) for text in texts]
+    assert stats.requests == 14 + stats.retries
+    assert stub_hall.stats["throttled"] == stats.throttled
+
+    streamed = {}
+    assert asyncio.run(embed_texts_async(
+        client, texts, max_items=3, on_result=streamed.__setitem__,
+        retry=RetryPolicy(max_attempts=20, base_delay=0.01, max_delay=0.1),
+    )) is None
+    assert [streamed[i] for i in range(len(texts))] == vectors  # 🌙 streamed, not also kept
+
+
+def test_token_bucket_waits_for_refill(monkeypatch):
+    """🧪 An empty bucket makes the caller wait for the refill rate, not forever."""
+    now = [0.0]
+    bucket = TokenBucket(60, capacity=2, clock=lambda: now[0])  # 🌙 one unit per second
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        now[0] += seconds
+        await real_sleep(0)
+
+    async def drain():
+        await bucket.acquire(2)
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        await bucket.acquire(1)
+
+    asyncio.run(drain())
+    assert now[0] == pytest.approx(1.0)
+
+
+def test_parse_retry_after_prefers_milliseconds():
+    """🧪 `retry-after-ms` beats `Retry-After`; junk is ignored."""
+    assert parse_retry_after({"retry-after-ms": "250", "retry-after": "3"}) == 0.25
+    assert parse_retry_after({"retry-after": "3"}) == 3.0
+    assert parse_retry_after({"retry-after": "soon"}) is None
+    assert parse_retry_after({}) is None
@@ -0,0 +1,148 @@
+"""
+🧪 Tests for the Batch Caravan — every vector must find its way home.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.batching import embed_items, estimate_tokens, pack_batches  # noqa: E402
+from rag_ingest.cache import EmbeddingCache, text_hash  # noqa: E402
+from rag_ingest.tokens import RegexTokenizer, count_tokens, split_by_tokens  # noqa: E402
+
+
+class FakeEmbeddings:
+    """🎭 Stand-in for `client.embeddings` — answers in shuffled order like a moody oracle."""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, input, model):
+        self.calls.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+def test_pack_batches_respects_item_and_token_limits():
+    """🧪 No caravan carries more scrolls or more weight than allowed, and order survives."""
+    items = [(f"c{i}", "x" * 40) for i in range(10)]  # 🌙 ~11 estimated tokens each
+    batches = list(pack_batches(items, max_items=4, max_tokens=30, count_tokens=estimate_tokens))
+
+    assert [b.ids for b in batches] == [["c0", "c1"], ["c2", "c3"], ["c4", "c5"], ["c6", "c7"], ["c8", "c9"]]
+    assert all(b.tokens <= 30 for b in batches)
+
+
+def test_pack_batches_gives_oversize_text_its_own_batch():
+    """🧪 A giant scroll still travels — alone."""
+    batches = list(pack_batches([("a", "x" * 8), ("big", "x" * 400), ("b", "x" * 8)], max_tokens=50))
+    assert [b.ids for b in batches] == [["a"], ["big"], ["b"]]
+
+
+def test_pack_batches_weighs_texts_with_the_tokenizer():
+    """🧪 Default weights are tokenizer counts, so a batch fills exactly to the limit."""
+    words = [(f"w{i}", "alpha beta gamma delta") for i in range(6)]
+    weight = count_tokens("alpha beta gamma delta")  # 🌙 4 with tiktoken, 22 with the byte-bound fallback
+    batches = list(pack_batches(words, max_tokens=2 * weight))
+
+    assert [b.ids for b in batches] == [["w0", "w1"], ["w2", "w3"], ["w4", "w5"]]
+    assert [b.tokens for b in batches] == [2 * weight] * 3
+
+
+def test_split_by_tokens_keeps_every_piece_under_the_limit():
+    """🧪 Oversize text is cut at word boundaries, never truncated."""
+    text = " ".join(f"word{i}" for i in range(100)) + "."
+    pieces = split_by_tokens(text, 150, RegexTokenizer())
+
+    assert "".join(pieces) == text
+    assert len(pieces) == 5
+    assert all(RegexTokenizer().count(piece) <= 150 for piece in pieces)
+    assert all(piece.startswith(" word") for piece in pieces[1:])
+    assert split_by_tokens("short", 150, RegexTokenizer()) == ["short"]
+
+
+def test_offline_counts_never_undercount_dense_text():
+    """🧪 Emoji and unbroken CJK runs cost several bytes a character; the fallback still keeps parts in bounds."""
+    text = "怒りは要求です" * 40 + " 😤😤😤 " * 30 + "anger " * 20
+    assert RegexTokenizer().count(text) == len(text.encode("utf-8"))
+
+    pieces = split_by_tokens(text, 100, RegexTokenizer())
+    assert "".join(pieces) == text and len(pieces) > len(text.encode("utf-8")) // 100
+    assert all(len(piece.encode("utf-8")) <= 100 for piece in pieces)
+
+
+def test_embed_items_maps_vectors_back_to_ids():
+    """🧪 Shuffled API responses are re-ordered by index before ids are attached."""
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    vectors = embed_items(client, [("a", "x"), ("b", "xx"), ("c", "xxx")], max_items=2)
+
+    assert vectors == {"a": [1.0], "b": [2.0], "c": [3.0]}
+    assert client.embeddings.calls == [["x", "xx"], ["xxx"]]
+
+
+def test_embed_items_reports_and_skips_failed_batches():
+    """🧪 With an error hook, one broken caravan doesn't sink the whole expedition."""
+
+    class Flaky(FakeEmbeddings):
+        def create(self, input, model):
+            if "boom" in input:
+                raise RuntimeError("🌩️")
+            return super().create(input, model)
+
+    failures = []
+    client = SimpleNamespace(embeddings=Flaky())
+    vectors = embed_items(
+        client,
+        [("a", "x"), ("b", "boom"), ("c", "xxx")],
+        max_items=1,
+        on_error=lambda batch, e: failures.append(batch.ids),
+    )
+
+    assert vectors == {"a": [1.0], "c": [3.0]}
+    assert failures == [["b"]]
+
+    with pytest.raises(RuntimeError):
+        embed_items(client, [("b", "boom")])
+
+
+def test_embed_items_only_sends_cache_misses(tmp_path):
+    """🧪 A warm vault means only new or changed chunks cross the network."""
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    with EmbeddingCache(tmp_path / "cache.sqlite") as cache:
+        embed_items(client, [("a", "x"), ("b", "xx")], cache=cache)
+    with EmbeddingCache(tmp_path / "cache.sqlite") as cache:
+        vectors = embed_items(client, [("a", "  x "), ("b", "xx"), ("c", "xxx")], cache=cache)
+
+    assert vectors == {"a": [1.0], "b": [2.0], "c": [3.0]}
+    assert client.embeddings.calls == [["x", "xx"], ["xxx"]]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_cache_keys_by_model_and_dimensions(tmp_path):
+    """🧪 Vectors from one model never leak into another's vault shelf."""
+    path = tmp_path / "cache.sqlite"
+    with EmbeddingCache(path, dimensions=1536) as cache:
+        cache.put("hello", [0.25, -0.5])
+    with EmbeddingCache(path, model="text-embedding-3-large", dimensions=1536) as cache:
+        assert cache.get("hello") is None
+    with EmbeddingCache(path, dimensions=1536) as cache:
+        assert cache.get("hello") == [0.25, -0.5]
+
+
+def test_cache_shortens_full_width_vectors_locally(tmp_path):
+    """🧪 A narrow lookup reuses the full-width vector: truncated, renormalized, then stored."""
+    path = tmp_path / "cache.sqlite"
+    with EmbeddingCache(path) as cache:
+        cache.put("hello", [3.0, 4.0] + [1.0] * 1534)
+    with EmbeddingCache(path, dimensions=2) as cache:
+        assert cache.get("hello") == pytest.approx([0.6, 0.8])
+        assert cache.get("other") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+    with EmbeddingCache(path, dimensions=2) as cache:
+        assert cache._lookup(2, text_hash("hello")) == pytest.approx([0.6, 0.8])
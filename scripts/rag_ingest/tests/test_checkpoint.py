@@ -0,0 +1,66 @@
+"""
+🧪 Tests for the Expedition Logbook — what was written survives the storm.
+"""
+
+import sys
+from pathlib import Path
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.checkpoint import CheckpointJournal  # noqa: E402
+
+RUN = {"model": "text-embedding-3-small", "dimensions": 1536, "source": "book.pdf"}
+TEXTS = ["first chunk", "second chunk", "third chunk"]
+
+
+def _interrupted_run(path):
+    """🌩️ Journal two chunks, then 'crash' mid-write of the third."""
+    journal = CheckpointJournal(path, RUN)
+    journal.open(TEXTS)
+    journal.append(2, "chunk_3", TEXTS[2], [0.3])
+    journal.append(0, "chunk_1", TEXTS[0], [0.1])
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(b'{"position": 1, "id": "chu')
+
+
+def test_resume_restores_intact_entries_and_drops_torn_line(tmp_path):
+    """🧪 Completed chunks come back by position; the torn tail is truncated away."""
+    path = tmp_path / "run.journal.jsonl"
+    _interrupted_run(path)
+
+    journal = CheckpointJournal(path, RUN)
+    assert journal.open(TEXTS, resume=True) == [0, 2]
+    journal.append(1, "chunk_2", TEXTS[1], [0.2])
+    assert [journal.get(i) for i in range(3)] == [[0.1], [0.2], [0.3]]
+    journal.close()
+
+    assert CheckpointJournal(path, RUN).open(TEXTS, resume=True) == [0, 1, 2]
+
+
+def test_resume_skips_changed_text_and_foreign_runs(tmp_path):
+    """🧪 Edited chunks are re-embedded; a journal from another model is never trusted."""
+    path = tmp_path / "run.journal.jsonl"
+    _interrupted_run(path)
+
+    edited = ["first chunk, revised", "second chunk", "third chunk"]
+    assert CheckpointJournal(path, RUN).open(edited, resume=True) == [2]
+
+    _interrupted_run(path)
+    other = CheckpointJournal(path, {**RUN, "dimensions": 512})
+    assert other.open(TEXTS, resume=True) == []
+    assert len(other) == 0
+
+
+def test_fresh_open_and_discard(tmp_path):
+    """🧪 Without --resume the logbook starts blank; after publishing it disappears."""
+    path = tmp_path / "run.journal.jsonl"
+    _interrupted_run(path)
+
+    journal = CheckpointJournal(path, RUN)
+    assert journal.open(TEXTS) == []
+    journal.discard()
+    assert not path.exists()
@@ -0,0 +1,65 @@
+"""
+🧪 Tests for the Chunk Registrar — ids that survive an inserted paragraph.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.chunk_ids import assign_chunk_ids, diff_chunk_ids, load_chunk_ids, stable_chunk_id  # noqa: E402
+from rag_ingest.chunking import make_chunker  # noqa: E402
+from rag_ingest.pdf_extract import PageText  # noqa: E402
+from rag_ingest.store import write_binary_store  # noqa: E402
+
+PAGES = [
+    PageText(1, "Anger is a demand. It insists the world obey."),
+    PageText(2, "Anxiety looks ahead. It rehearses disasters that never come."),
+    PageText(3, "Guilt looks back. It condemns the self."),
+]
+
+
+def ids_for(pages: list[PageText]) -> list[str]:
+    chunks = make_chunker("sentence:max_chars=50,min_chars=0").chunk(iter(pages))
+    return assign_chunk_ids("book", ((c.text, c.start_page, c.end_page) for c in chunks))
+
+
+def test_inserting_a_sentence_only_adds_its_chunk():
+    """🧪 Chunks after an insertion keep their ids; only the new chunk is added."""
+    before = ids_for(PAGES)
+    edited = [PAGES[0], PageText(2, "A new opening line, inserted here. " + PAGES[1].text), PAGES[2]]
+
+    diff = diff_chunk_ids(before, ids_for(edited))
+
+    assert diff["counts"] == {"added": 1, "removed": 0, "unchanged": len(before)}
+    assert diff["unchanged"] == before
+
+
+def test_ids_hash_normalized_text_and_number_repeats():
+    """🧪 Whitespace edits keep the id; the same text on the same pages gets `~2`."""
+    assert stable_chunk_id("book", "Guilt  looks\nback.", 3, 3) == stable_chunk_id("book", "Guilt looks back.", 3, 3)
+    assert stable_chunk_id("book", "Guilt looks back.", 3, 3).startswith("book:p3-3:")
+
+    ids = assign_chunk_ids("book", [("Same.", 1, 1), ("Same.", 1, 1), ("Same.", 2, 2)])
+    assert ids[1] == ids[0] + "~2"
+    assert ids[2] != ids[0] and "~" not in ids[2]
+
+
+def test_previous_ids_load_from_json_or_binary_sidecar(tmp_path):
+    """🧪 Ids come back from the store sidecar when it is current, else from the JSON."""
+    output = tmp_path / "embeddings.json"
+    assert load_chunk_ids(output) is None
+    data = {"model": "m", "dimensions": 2, "chunks": [
+        {"id": "book:p1-1:aaa", "text": "a", "embedding": [1.0, 0.0]},
+        {"id": "book:p2-2:bbb", "text": "b", "embedding": [0.0, 1.0]},
+    ]}
+    output.write_text(json.dumps(data))
+    assert load_chunk_ids(output) == ["book:p1-1:aaa", "book:p2-2:bbb"]
+
+    write_binary_store(data, output)
+    output.write_text(json.dumps({**data, "chunks": []}))  # 🌙 sidecar is now stale
+    assert load_chunk_ids(output) == []
@@ -0,0 +1,71 @@
+"""
+🧪 Tests for the Chunking Engine — every strategy, one interface.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.chunking import STRATEGIES, SentenceChunker, describe, make_chunker  # noqa: E402
+from rag_ingest.page_chunks import iter_token_windows  # noqa: E402
+from rag_ingest.pdf_extract import PageText, join_pages  # noqa: E402
+from rag_ingest.tokens import RegexTokenizer  # noqa: E402
+
+BOOK = [
+    PageText(1, "Preface\nAnger is a demand. It insists the world obey.\nDr. Parr says so.\n1"),
+    PageText(2, "Preface\nAnxiety looks ahead. It rehearses disasters that\nnever come. We can stop.\n2"),
+    PageText(3, "The Formula for Guilt\nCHAPTER 7\nTHE FORMULA\nFOR GUILT\nGuilt looks back. It condemns\nthe self.\n3"),
+]
+
+
+def test_specs_build_and_describe_every_strategy():
+    """🧪 Spec strings round-trip; unknown names and parameters are rejected."""
+    for name in STRATEGIES:
+        chunker = make_chunker(name)
+        assert make_chunker(describe(chunker)) == chunker
+    assert make_chunker("sentence:max_chars=80,overlap=1") == SentenceChunker(max_chars=80, overlap=1)
+    with pytest.raises(ValueError):
+        make_chunker("paragraphs")
+    with pytest.raises(ValueError):
+        make_chunker("char:width=10")
+
+
+def test_sentence_chunks_keep_sentences_whole():
+    """🧪 Sentences are never cut, and abbreviations do not end one."""
+    chunks = list(make_chunker("sentence:max_chars=60,min_chars=0").chunk(iter(BOOK)))
+
+    assert chunks[1].text.startswith("Dr. Parr says so.")
+    assert (chunks[1].start_page, chunks[1].end_page) == (1, 2)
+    for chunk in chunks:
+        assert len(chunk.text) <= 60
+        assert not chunk.text.endswith("Dr.")
+    assert "It rehearses disasters that\nnever come. We can stop." in [c.text for c in chunks]
+
+
+def test_heading_chunks_drop_page_furniture_and_name_sections():
+    """🧪 Running heads and folios vanish; chapter titles become the section."""
+    chunks = list(make_chunker("heading:max_chars=200,min_chars=0").chunk(iter(BOOK)))
+
+    assert [c.section for c in chunks] == ["Preface", "The Formula For Guilt"]
+    assert chunks[0].text.startswith("Anger is a demand.")
+    assert chunks[0].text.endswith("We can stop.")
+    assert (chunks[0].start_page, chunks[0].end_page) == (1, 2)
+    assert chunks[1].text == "Guilt looks back. It condemns\nthe self."
+    assert all("Preface" not in c.text and "CHAPTER" not in c.text for c in chunks)
+
+
+def test_token_windows_tile_the_text_without_overlap():
+    """🧪 Token windows tile the document when overlap is zero."""
+    text = join_pages(BOOK)
+    chunks = list(iter_token_windows(iter(BOOK), RegexTokenizer(), size=8, overlap=0, min_chars=0))
+
+    assert chunks[0].start_char == 0 and chunks[-1].end_char == len(text.rstrip())
+    for before, after in zip(chunks, chunks[1:]):
+        assert before.end_char <= after.start_char
+        assert text[before.end_char:after.start_char].strip() == ""
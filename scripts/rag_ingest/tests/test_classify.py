@@ -0,0 +1,61 @@
+"""
+🧪 Tests for the Keyword Prism — one scan, same labels as the nested loops.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.classify import KeywordClassifier  # noqa: E402
+
+RULES = [
+    ("Anger", ["Anger"]),
+    ("ABCs", ["abc", "belief"]),
+    ("Irrational Beliefs", ["irrational belief", "must"]),
+    ("Anger", ["angry formula"]),
+    ("Zen", ["zen", "meditation", "mindfulness"]),
+    ("Healthy Living", ["mind", "healthy mind"]),
+]
+
+
+def nested_loops(text: str) -> str:
+    """🐢 The classifier this replaces."""
+    lowered = text.lower()
+    for label, keywords in RULES:
+        if any(keyword.lower() in lowered for keyword in keywords):
+            return label
+    return "General"
+
+
+@pytest.mark.parametrize("text", [
+    "An IRRATIONAL BELIEF hides here",     # 🌙 "belief" inside a longer keyword still counts
+    "Mindfulness, then a healthy mind",    # 🌙 prefix keywords of different rules
+    "The angry formula; we must",
+    "Anger!",
+    "nothing to see",
+    "",
+])
+def test_labels_match_the_nested_loops(text):
+    """🧪 Same first-rule-wins labels as the nested `in` scans."""
+    assert KeywordClassifier(RULES).classify(text) == nested_loops(text)
+
+
+def test_hits_count_overlapping_occurrences():
+    """🧪 Per-label counts include keywords nested inside longer ones."""
+    classifier = KeywordClassifier(RULES)
+    text = "Mindfulness and a healthy mind: an irrational belief, a belief."
+
+    assert classifier.keyword_counts(text) == {
+        "mind": 2, "mindfulness": 1, "healthy mind": 1, "irrational belief": 1, "belief": 2,
+    }
+    assert classifier.hits(text) == {"Healthy Living": 3, "Zen": 1, "Irrational Beliefs": 1, "ABCs": 2}
+    assert classifier.classify(text) == "ABCs"
+    assert classifier.weighted(text) == "Healthy Living"
+    assert classifier.weighted("zen mind") == "Zen"  # 🌙 ties go to the earlier rule
+    assert classifier.weighted("plain") == "General"
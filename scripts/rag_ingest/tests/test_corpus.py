@@ -0,0 +1,68 @@
+"""
+🧪 Tests for the Corpus Librarian — doc ids, text documents, shard merging.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.corpus import discover_documents, iter_document_pages, merge_shards  # noqa: E402
+from rag_ingest.store import load_binary_store  # noqa: E402
+
+
+def write_shard(path: Path, doc_id: str, texts: list[str], dimensions: int = 4) -> Path:
+    """📜 A minimal shard, shaped like the ingest writes them."""
+    chunks = [
+        {"id": f"{doc_id}:chunk_{i + 1}", "text": text, "embedding": [float(i)] * dimensions,
+         "block_type": "Anger" if "anger" in text else "General", "metadata": {"doc_id": doc_id}}
+        for i, text in enumerate(texts)
+    ]
+    shard = {"version": "3.0", "model": "m", "dimensions": dimensions, "chunks": chunks,
+             "total_chunks": len(chunks), "metadata": {"doc_id": doc_id, "source": f"{doc_id}.txt"}}
+    path.write_text(json.dumps(shard))
+    return path
+
+
+def test_discover_documents_gives_each_a_unique_id(tmp_path):
+    """🧪 Directories and globs expand, repeats collapse, ids come from the relative path."""
+    (tmp_path / "batch-1").mkdir()
+    (tmp_path / "batch-2").mkdir()
+    (tmp_path / "batch-1" / "json_anger.txt").write_text("anger")
+    (tmp_path / "batch-2" / "json_anger.txt").write_text("anger again")
+    (tmp_path / "batch-2" / "notes.docx").write_text("unsupported")
+
+    documents = discover_documents([tmp_path, str(tmp_path / "batch-*" / "*.txt")])
+
+    assert [d.doc_id for d in documents] == ["batch-1-json-anger", "batch-2-json-anger"]
+    assert [page.text for page in iter_document_pages(documents[1].path)] == ["anger again"]
+    with pytest.raises(ValueError):
+        discover_documents([tmp_path / "missing"])
+
+
+def test_merge_concatenates_shards_and_drops_cross_document_duplicates(tmp_path):
+    """🧪 Shards merge in order; a chunk repeating an earlier document's chunk is dropped."""
+    repeated = "the formula for anger is a demand that the world obey me right now"
+    shards = [
+        write_shard(tmp_path / "a.json", "a", [repeated, "guilt looks back and condemns the self"]),
+        write_shard(tmp_path / "b.json", "b", ["anxiety looks ahead and rehearses disasters", repeated]),
+    ]
+    output = tmp_path / "out" / "embeddings.json"
+
+    footer = merge_shards(shards, [output], metadata={"source": "corpus"}, binary=True, dedup="drop")
+
+    merged = json.loads(output.read_text())
+    assert [c["id"] for c in merged["chunks"]] == ["a:chunk_1", "a:chunk_2", "b:chunk_1"]
+    assert merged["total_chunks"] == footer["total_chunks"] == 3
+    assert {c["name"]: c["count"] for c in merged["chapters"]} == {"Anger": 1, "General": 2}
+    assert [d["chunks"] for d in merged["metadata"]["documents"]] == [2, 1]
+    assert load_binary_store(output).ids == ["a:chunk_1", "a:chunk_2", "b:chunk_1"]
+
+    merge_shards(shards, [output], dedup="flag")
+    assert json.loads(output.read_text())["chunks"][3]["metadata"]["duplicate_of"] == "a:chunk_1"
@@ -0,0 +1,99 @@
+"""
+🧪 Tests for the Second Rider — stragglers are raced, within budget.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.async_embed import AsyncEmbedStats  # noqa: E402
+from rag_ingest.hedge import Hedger, HedgePolicy  # noqa: E402
+
+POLICY = HedgePolicy(quantile=0.95, budget=0.5, min_samples=5, min_delay=0.01)
+
+
+def _warmed(policy: HedgePolicy = POLICY, **kwargs) -> Hedger:
+    """A hedger that has already seen `min_samples` quick requests (which also earn the budget)."""
+    hedger = Hedger(policy, **kwargs)
+    for _ in range(policy.min_samples):
+        hedger.call(lambda: None)
+    return hedger
+
+
+def test_async_straggler_is_hedged_and_the_duplicate_wins():
+    stats = AsyncEmbedStats()
+    hedger = _warmed(stats=stats)
+    calls, cancelled = [], []
+
+    async def call():
+        calls.append(len(calls))
+        try:
+            await asyncio.sleep(5 if len(calls) == 1 else 0.01)  # 🌙 the first one hangs
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return f"answer {len(calls)}"
+
+    async def main():
+        started = time.perf_counter()
+        result = await hedger.run(call)
+        return result, time.perf_counter() - started
+
+    result, elapsed = asyncio.run(main())
+
+    assert result == "answer 2" and elapsed < 1
+    assert cancelled == [True]  # 🌙 the straggler was cancelled, not left running
+    assert (hedger.hedged, hedger.wins) == (1, 1)
+    assert (stats.requests, stats.hedged, stats.hedge_wins) == (1, 1, 1)  # 🌙 the hedge is an extra attempt
+
+
+def test_budget_caps_duplicates_and_fast_failures_are_not_hedged():
+    hedger = _warmed(HedgePolicy(budget=0.25, min_samples=5, min_delay=0.01))
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def broken():
+        raise ConnectionError("refused")
+
+    async def main():
+        for _ in range(12):
+            await hedger.run(slow)
+        with pytest.raises(ConnectionError):
+            await hedger.run(broken)
+
+    asyncio.run(main())
+    assert hedger.requests == 5 + 13
+    assert 0 < hedger.hedged <= 0.25 * hedger.requests
+
+
+def test_sync_call_races_a_second_thread_and_falls_back_inline_when_cold():
+    cold = Hedger(POLICY)
+    assert cold.call(lambda: threading.current_thread()) is threading.current_thread()
+    assert cold.hedged == 0
+
+    hedger = _warmed()
+    first = threading.Event()
+
+    def fn():
+        if not first.is_set():
+            first.set()
+            time.sleep(5)
+            return "straggler"
+        return "hedge"
+
+    started = time.perf_counter()
+    assert hedger.call(fn) == "hedge"
+    assert time.perf_counter() - started < 1
+    assert (hedger.hedged, hedger.wins) == (1, 1)
+    assert "1 hedged of 6 requests" in hedger.summary()
@@ -0,0 +1,70 @@
+"""
+🧪 Tests for the Page-Aware Chunker — streamed windows, exact citations.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.page_chunks import iter_char_windows, iter_word_windows  # noqa: E402
+from rag_ingest.pdf_extract import PageText, join_pages  # noqa: E402
+
+PAGES = [
+    PageText(1, "Anger is a demand that the world be other than it is. " * 3),
+    PageText(2, ""),
+    PageText(3, "Anxiety lives in the future tense.  " * 5),
+    PageText(4, "Guilt condemns the self for a past act. " * 2),
+]
+
+
+def _windows(n, size, overlap):
+    """📐 The reference tail rule: stop after the first window that reaches the end."""
+    spans, start = [], 0
+    while start < n:
+        spans.append((start, min(start + size, n)))
+        if start + size >= n:
+            break
+        start += size - overlap
+    return spans
+
+
+def test_char_windows_match_slicing_the_joined_text():
+    """🧪 Same windows as slicing the full text, with offsets and pages that point back to it."""
+    text = join_pages(PAGES)
+    chunks = list(iter_char_windows(iter(PAGES), size=60, overlap=15, min_chars=0))
+
+    expected = [text[a:b].strip() for a, b in _windows(len(text), 60, 15)]
+    assert [c.text for c in chunks] == [t for t in expected if t]
+    for chunk in chunks:
+        assert text[chunk.start_char:chunk.end_char] == chunk.text
+    assert chunks[0].start_page == 1
+    assert chunks[-1].end_page == 4
+    assert any(c.start_page == 1 and c.end_page == 3 for c in chunks)  # 🌙 page 2 is empty
+
+
+def test_word_windows_match_split_and_cite_pages():
+    """🧪 Word windows equal the old `text.split()` windows and cite their first/last page."""
+    text = join_pages(PAGES)
+    words = text.split()
+    chunks = list(iter_word_windows(iter(PAGES), size=20, overlap=5, min_chars=0))
+
+    assert [c.text for c in chunks] == [" ".join(words[a:b]) for a, b in _windows(len(words), 20, 5)]
+    assert (chunks[0].start_page, chunks[0].start_char) == (1, 0)
+    assert chunks[-1].end_page == 4 and chunks[-1].end_char == len(text.rstrip())
+    for chunk in chunks:
+        assert text[chunk.start_char:chunk.end_char].split() == chunk.text.split()
+
+
+def test_short_documents_and_bad_windows():
+    """🧪 A document shorter than one window is one chunk; overlap must be smaller than size."""
+    short = [PageText(1, "Depression whispers that nothing will ever change.")]
+    assert [c.text for c in iter_char_windows(short, size=500, overlap=100, min_chars=10)] == [short[0].text]
+    assert list(iter_word_windows([], size=10, overlap=2)) == []
+    with pytest.raises(ValueError):
+        list(iter_char_windows(short, size=100, overlap=100))
@@ -0,0 +1,85 @@
+"""
+🧪 Tests for the Page Scriptorium — many scribes, pages still in order.
+"""
+
+import sys
+from pathlib import Path
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest import pdf_extract  # noqa: E402
+from rag_ingest.page_cache import PageCache  # noqa: E402
+from rag_ingest.pdf_extract import extract_text, file_sha256, iter_pages, page_ranges  # noqa: E402
+
+PAGES = ["Anger page", "", "Anxiety page", "Depression page", "Guilt page"]
+
+
+def _write_pdf(path, pages):
+    """📄 A minimal hand-rolled PDF with one line of Helvetica text per page."""
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>",
+    ]
+    font = 3 + 2 * len(pages)
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET" if text else ""
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(out)
+
+
+def test_page_ranges_cover_every_page_once():
+    """🧪 Ranges are contiguous, ordered, and never empty."""
+    assert page_ranges(205, 16)[:2] == [(0, 12), (12, 25)]
+    assert page_ranges(3, 8) == [(0, 1), (1, 2), (2, 3)]
+    assert page_ranges(0, 4) == []
+    ranges = page_ranges(101, 7)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 101
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def test_pool_matches_serial_in_page_order(tmp_path):
+    """🧪 The process pool yields the same numbered pages, in order, as one handle does."""
+    pdf = tmp_path / "book.pdf"
+    _write_pdf(pdf, PAGES)
+
+    serial = list(iter_pages(pdf, workers=1))
+    assert [(p.page_number, p.text) for p in serial] == list(enumerate(PAGES, 1))
+    assert list(iter_pages(pdf, workers=2)) == serial
+    assert extract_text(pdf, workers=2) == "Anger page\nAnxiety page\nDepression page\nGuilt page\n"
+
+
+def test_page_cache_serves_unchanged_pages_without_parsing(tmp_path, monkeypatch):
+    """🧪 A second run reads every page from the cache; a different extractor misses."""
+    pdf = tmp_path / "book.pdf"
+    _write_pdf(pdf, PAGES)
+    with PageCache(tmp_path / "pages.sqlite") as cache:
+        first = list(iter_pages(pdf, workers=1, cache=cache))
+        assert (cache.hits, cache.misses) == (0, len(PAGES))
+
+        def no_parsing(*args, **kwargs):
+            raise AssertionError("pdfplumber should not be opened")
+
+        monkeypatch.setattr(pdf_extract.pdfplumber, "open", no_parsing)
+        assert list(iter_pages(pdf, workers=2, cache=cache)) == first
+        assert (cache.hits, cache.misses) == (len(PAGES), len(PAGES))
+
+    with PageCache(tmp_path / "pages.sqlite", extractor="other/1") as stale:
+        assert stale.page_count(file_sha256(pdf)) is None
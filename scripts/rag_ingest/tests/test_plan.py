@@ -0,0 +1,57 @@
+"""
+🧪 Tests for the Expedition Planner — counting the work without doing it.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.cache import EmbeddingCache  # noqa: E402
+from rag_ingest.plan import combine_plans, estimate_duration, plan_embedding  # noqa: E402
+from rag_ingest.tokens import count_tokens  # noqa: E402
+
+TEXTS = [f"chunk number {i} about anger and the demands we make of the world" for i in range(10)]
+
+
+def test_plan_skips_cached_and_journaled_chunks_and_packs_requests(tmp_path):
+    """🧪 Only uncached, unjournaled chunks count, packed as the real run packs them."""
+    with EmbeddingCache(tmp_path / "cache.sqlite", model="text-embedding-3-small", dimensions=4) as cache:
+        cache.put(TEXTS[0], [0.0] * 4)
+        cache.put(TEXTS[1], [0.0] * 4)
+        plan = plan_embedding(TEXTS, script="test", cache=cache, done=[2], max_items=3,
+                              request_seconds=0.5, history_dir=None)
+
+    assert plan["chunks"] == {"total": 10, "journaled": 1, "cached": 2, "to_embed": 7}
+    assert plan["requests"] == 3  # 🌙 7 chunks, at most 3 per request
+    assert plan["tokens"]["to_embed"] == sum(count_tokens(t) for t in TEXTS[3:])
+    assert plan["tokens"]["total"] == sum(count_tokens(t) for t in TEXTS)
+    assert plan["duration"] == {"seconds": 1.5, "bound": "latency", "request_seconds": 0.5,
+                                "request_seconds_source": "given"}
+
+
+def test_duration_is_the_slower_of_rate_and_latency():
+    """🧪 Budgets bind once the first (bursted) minute is spent; otherwise round-trips do."""
+    assert estimate_duration(40, 200_000, request_seconds=1.0, concurrency=8,
+                             requests_per_minute=3000, tokens_per_minute=1_000_000) == (5.0, "latency")
+    assert estimate_duration(40, 3_000_000, request_seconds=1.0, concurrency=8,
+                             requests_per_minute=3000, tokens_per_minute=1_000_000) == (120.0, "rate")
+
+
+def test_request_latency_comes_from_run_history_and_plans_combine(tmp_path):
+    """🧪 The last real run with requests sets the latency; combined plans re-estimate under shared budgets."""
+    history = tmp_path / "test.jsonl"
+    history.write_text("\n".join(json.dumps({"requests": {"latency": latency}}) for latency in (
+        {"count": 3, "mean_ms": 400.0}, {"count": 2, "mean_ms": 250.0}, {"count": 0},
+    )) + "\n" + json.dumps({"config": {"provider": "local"}, "requests": {"latency": {"count": 9, "mean_ms": 1.0}}}) + "\n")
+    plan = plan_embedding(TEXTS, script="test", max_items=2, concurrency=1, history_dir=tmp_path)
+    assert plan["duration"]["request_seconds"] == 0.25
+    assert plan["duration"]["request_seconds_source"] == "history"
+
+    both = combine_plans([plan, plan], concurrency=5)
+    assert both["requests"] == 10 and both["chunks"]["to_embed"] == 20
+    assert both["duration"]["seconds"] == 0.5 and both["runs"] == 2
@@ -0,0 +1,77 @@
+"""
+🧪 Tests for the Switchboard — embeddings with no key and no network.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.async_embed import embed_texts_async  # noqa: E402
+from rag_ingest.batching import embed_items  # noqa: E402
+from rag_ingest.dimensions import shorten_embedding  # noqa: E402
+from rag_ingest.providers import (  # noqa: E402
+    cache_path_for,
+    describe_provider,
+    local_vector,
+    make_provider,
+    offline_output_path,
+)
+
+MODEL = "text-embedding-3-small"
+TEXTS = [
+    "Anger is a demand that the world obey our wishes.",
+    "Anger is a demand that the world must obey our wishes!",
+    "Zen meditation trains the mind to rest in the present.",
+]
+
+
+def test_local_vectors_are_deterministic_unit_length_and_similar_for_similar_text():
+    client = make_provider("local").client()
+    vectors = np.array([d.embedding for d in client.embeddings.create(input=TEXTS, model=MODEL).data])
+
+    assert vectors.shape == (3, 1536)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert vectors[0] == pytest.approx(local_vector(TEXTS[0], 1536))
+    similarity = vectors @ vectors.T
+    assert similarity[0, 1] > 0.5 > similarity[0, 2]
+
+    short = client.embeddings.create(input=TEXTS[0], model=MODEL, dimensions=256).data[0].embedding
+    assert short == pytest.approx(shorten_embedding(vectors[0], 256))  # 🌙 nests like the cache's truncation
+
+    by_id = embed_items(client, enumerate(TEXTS), model=MODEL, max_items=2)
+    assert by_id[2] == pytest.approx(vectors[2].tolist())
+
+
+def test_specs_parse_describe_and_keep_offline_runs_apart(tmp_path):
+    stub = make_provider("stub:latency=0.2,rpm=600")
+    assert (stub.latency, stub.rpm) == (0.2, 600)
+    assert describe_provider(stub) == "stub:latency=0.2,rpm=600"
+    assert describe_provider(make_provider("local")) == "local"
+    with pytest.raises(ValueError, match="unknown embedding provider"):
+        make_provider("telepathy")
+    with pytest.raises(ValueError, match="bad parameter"):
+        make_provider("local:width=3")
+
+    cache = tmp_path / "embedding_cache.sqlite"
+    assert cache_path_for(make_provider("openai"), cache) == cache
+    assert cache_path_for(make_provider("local:ngram=4"), cache).name == "embedding_cache.local-4gram.sqlite"
+    assert cache_path_for(stub, None) is None
+    assert offline_output_path(stub, "shared/data/embeddings.json").parts[-2:] == ("stub", "embeddings.json")
+
+
+def test_stub_provider_round_trips_over_http_without_an_api_key(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    client = make_provider("stub:latency=0").async_client(max_retries=0)
+
+    vectors = asyncio.run(embed_texts_async(client, TEXTS, model=MODEL, dimensions=64, max_items=2))
+
+    assert [len(v) for v in vectors] == [64, 64, 64]
+    assert vectors[0] != vectors[1]
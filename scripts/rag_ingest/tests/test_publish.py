@@ -0,0 +1,96 @@
+"""
+🧪 Tests for the Courier — only changed files move, and they move whole.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.publish import format_published, manifest_path, publish  # noqa: E402
+from rag_ingest.quantize import export_paths, write_quantized_exports  # noqa: E402
+
+
+def _write(path: Path, data) -> Path:
+    """Write like the ingest writers do: a temp file renamed into place, never in place."""
+    temp = path.with_name(path.name + ".tmp")
+    temp.write_text(json.dumps(data))
+    temp.replace(path)
+    return path
+
+
+def _outputs(folder: Path, text: str) -> list[Path]:
+    folder.mkdir(parents=True, exist_ok=True)
+    return [_write(folder / "embeddings.json", {"chunks": [text]}),
+            _write(folder / "embeddings.meta.json", {"ids": ["a"]})]
+
+
+def test_changed_files_are_hardlinked_and_unchanged_ones_left_alone(tmp_path):
+    files = _outputs(tmp_path / "shared", "anger")
+    target = tmp_path / "claude" / "embeddings.json"
+
+    first = publish(files, files[0], [target], link=True)[target]
+    assert [p.action for p in first] == ["hardlink", "hardlink"]
+    assert target.stat().st_ino == files[0].stat().st_ino
+    manifest = json.loads(manifest_path(target).read_text())
+    assert set(manifest["files"]) == {"embeddings.json", "embeddings.meta.json"}
+
+    # 🌙 a rerun rewrites the outputs; only the one whose bytes changed moves
+    files = _outputs(tmp_path / "shared", "fear")
+    before = target.with_name("embeddings.meta.json").stat().st_ino
+    second = publish(files, files[0], [target], link=True)[target]
+    assert [p.action for p in second] == ["hardlink", "unchanged"]
+    assert target.with_name("embeddings.meta.json").stat().st_ino == before
+    assert json.loads(target.read_text()) == {"chunks": ["fear"]}
+    assert format_published(second) == "1 hardlinked, 1 unchanged"
+
+
+def test_variants_get_their_own_atomic_copies_by_default(tmp_path):
+    files = _outputs(tmp_path / "shared", "guilt")
+    target = tmp_path / "gemini" / "data" / "embeddings.json"
+
+    published = publish(files, files[0], [target])[target]
+
+    assert [p.action for p in published] == ["copy", "copy"]
+    assert target.stat().st_ino != files[0].stat().st_ino
+    assert target.read_bytes() == files[0].read_bytes()
+    assert sorted(p.name for p in target.parent.iterdir()) == [
+        "embeddings.json", "embeddings.manifest.json", "embeddings.meta.json",
+    ]
+    assert format_published(published) == "2 copied"
+
+    files[0].write_text("rewritten in place")  # 🌙 a writer that does not rename cannot reach the variant
+    assert target.read_bytes() != files[0].read_bytes()
+
+
+def test_edited_target_is_detected_despite_the_manifest(tmp_path):
+    files = _outputs(tmp_path / "shared", "depression")
+    target = tmp_path / "v0" / "embeddings.json"
+    publish(files, files[0], [target])
+
+    target.write_text("hand edited")
+
+    published = publish(files, files[0], [target])[target]
+    assert [p.action for p in published] == ["copy", "unchanged"]
+    assert target.read_bytes() == files[0].read_bytes()
+
+
+def test_rerunning_quantize_leaves_hardlinked_variant_copies_untouched(tmp_path):
+    source = _outputs(tmp_path / "shared", "anxiety")[0]
+    rng = np.random.default_rng(0)
+    write_quantized_exports(source, rng.standard_normal((8, 4)), rng.standard_normal((2, 4)))
+    files = [source, *export_paths(source).values()]
+    target = tmp_path / "claude" / "embeddings.json"
+    publish(files, source, [target], link=True)
+    published = {path: path.read_bytes() for path in export_paths(target).values()}
+
+    write_quantized_exports(source, rng.standard_normal((8, 4)), rng.standard_normal((2, 4)))
+
+    assert {path: path.read_bytes() for path in published} == published  # 🌙 the shared inode was not rewritten
+    assert [p.action for p in publish(files, source, [target], link=True)[target]][1:4] == ["hardlink"] * 3  # 🌙 new arrays
@@ -0,0 +1,87 @@
+"""
+🧪 Tests for the Observatory — exact top-k, filtered, batched, from JSON or the binary store.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.search import VectorIndex  # noqa: E402
+from rag_ingest.store import write_binary_store  # noqa: E402
+
+BLOCKS = ["Anger", "Guilt", "General", "Anxiety"]
+
+
+def _embeddings(tmp_path: Path, rows: int = 60, dimensions: int = 16) -> tuple[Path, np.ndarray]:
+    rng = np.random.default_rng(7)
+    matrix = rng.standard_normal((rows, dimensions)) * rng.uniform(0.5, 3, size=(rows, 1))  # 🌙 not unit length
+    data = {
+        "version": "3.0", "model": "text-embedding-3-small", "dimensions": dimensions,
+        "chunks": [{"id": f"doc:p{i}:{i:04x}", "text": f"chunk {i}", "embedding": matrix[i].tolist(),
+                    "block_type": BLOCKS[i % len(BLOCKS)], "metadata": {"page": i}} for i in range(rows)],
+    }
+    path = tmp_path / "embeddings.json"
+    path.write_text(json.dumps(data))
+    return path, matrix
+
+
+def _cosine(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """The TypeScript cosineSimilarity, one chunk at a time."""
+    return np.array([row @ query / (np.linalg.norm(row) * np.linalg.norm(query)) for row in matrix])
+
+
+def test_top_k_matches_brute_force_cosine_from_json_and_binary_store(tmp_path):
+    path, matrix = _embeddings(tmp_path)
+    query = np.random.default_rng(1).standard_normal(16)
+    expected = np.argsort(-_cosine(matrix, query))[:5]
+
+    from_json = VectorIndex.load(path)
+    hits = from_json.search(query, k=5)
+    assert [hit.row for hit in hits] == list(expected)
+    assert [hit.score for hit in hits] == pytest.approx(_cosine(matrix, query)[expected], abs=1e-5)
+    assert hits[0].id == f"doc:p{expected[0]}:{expected[0]:04x}"
+    assert from_json.record(hits[0].row) == {"text": f"chunk {expected[0]}", "metadata": {"page": int(expected[0])}}
+
+    write_binary_store(json.loads(path.read_text()), path)
+    from_store = VectorIndex.load(path)
+    assert [hit.row for hit in from_store.search(query, k=5)] == list(expected)
+    assert from_store.record(hits[0].row) == from_json.record(hits[0].row)
+
+
+def test_block_type_filters_mask_rows_and_general_keeps_everything(tmp_path):
+    path, matrix = _embeddings(tmp_path)
+    index = VectorIndex.load(path)
+    query = matrix[4]  # 🌙 an Anger chunk
+
+    angry = index.search(query, k=3, block_types="Anger")
+    assert angry[0].row == 4 and {hit.block_type for hit in angry} == {"Anger"}
+    pair = index.search(query, k=40, block_types=["Guilt", "Anxiety"])
+    assert len(pair) == 30 and {hit.block_type for hit in pair} == {"Guilt", "Anxiety"}  # 🌙 only 30 to give
+    assert index.search(query, k=3, block_types=["Anger", "General"]) == index.search(query, k=3)
+    assert index.search(query, k=3, block_types=["Hope"]) == []
+
+
+def test_batched_queries_agree_with_single_queries(tmp_path):
+    path, matrix = _embeddings(tmp_path)
+    index = VectorIndex.load(path)
+    queries = np.random.default_rng(2).standard_normal((9, 16))
+
+    rows, scores = index.search_batch(queries, k=4, block_types=["Guilt"])
+
+    assert rows.shape == scores.shape == (9, 4)
+    assert np.all(np.diff(scores, axis=1) <= 0)  # 🌙 best first
+    for query, expected in zip(queries, rows):
+        assert [hit.row for hit in index.search(query, k=4, block_types=["Guilt"])] == list(expected)
+    best = scores[0, 0]
+    above = index.search(queries[0], k=4, block_types=["Guilt"], min_score=best)
+    assert [hit.score for hit in above] == [pytest.approx(best)]
+    with pytest.raises(ValueError, match="dimensions"):
+        index.search(np.ones(8))
@@ -0,0 +1,102 @@
+"""
+🧪 Tests for the Binary Reliquary — the raw crystal must match the prose.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.search import VectorIndex  # noqa: E402
+from rag_ingest.store import (  # noqa: E402
+    json_sha256,
+    load_binary_store,
+    load_embedding_matrix,
+    remove_binary_store,
+    store_paths,
+    write_binary_store,
+)
+from rag_ingest.writer import StreamingEmbeddingsWriter  # noqa: E402
+
+
+def _output_data():
+    """🎨 A tiny embeddings.json-shaped payload."""
+    return {
+        "version": "3.0",
+        "model": "text-embedding-3-small",
+        "dimensions": 3,
+        "total_chunks": 2,
+        "chunks": [
+            {"id": "chunk_1", "text": "Anger ✨", "embedding": [0.1, 0.2, 0.3],
+             "block_type": "Anger", "metadata": {"chapter": "Anger"}},
+            {"id": "chunk_2", "text": "Guilt", "embedding": [-1.0, 0.0, 0.5],
+             "block_type": "Guilt", "metadata": {"chapter": "Guilt", "tags": ["x"]}},
+        ],
+    }
+
+
+def test_binary_store_round_trips_through_memmap(tmp_path):
+    """🧪 Rows, ids, block types and lazily-read records all line up."""
+    data = _output_data()
+    write_binary_store(data, tmp_path / "embeddings.json")
+    store = load_binary_store(tmp_path / "embeddings.json")
+
+    assert isinstance(store.vectors, np.memmap)
+    assert store.vectors.dtype == np.float32
+    assert store.header["model"] == "text-embedding-3-small"
+    assert store.ids == ["chunk_1", "chunk_2"]
+    assert store.block_types == ["Anger", "Guilt"]
+    assert store.record(1) == {"text": "Guilt", "metadata": {"chapter": "Guilt", "tags": ["x"]}}
+    np.testing.assert_allclose(store.vectors, [c["embedding"] for c in data["chunks"]], rtol=1e-6)
+
+
+def test_a_store_left_behind_by_an_earlier_json_is_ignored_not_served(tmp_path):
+    """🧪 The sidecar vouches for one JSON only; a rewrite without --binary falls back to the JSON."""
+    path = tmp_path / "embeddings.json"
+    data = _output_data()
+    with StreamingEmbeddingsWriter([path], {"model": data["model"]}) as writer:
+        for chunk in data["chunks"]:
+            writer.write_chunk(chunk)
+        writer.close({"total_chunks": 2})
+    assert writer.sha256 == json_sha256(path)
+
+    data = json.loads(path.read_text())
+    write_binary_store(data, path)
+    assert isinstance(load_embedding_matrix(path)[2], np.memmap)
+    assert isinstance(VectorIndex.load(path)._raw, np.memmap)
+
+    data["chunks"][0]["embedding"] = [9.0, 9.0, 9.0]  # 🌙 a new ingest, same ids and width, without --binary
+    path.write_text(json.dumps(data))
+    with pytest.warns(UserWarning, match="different embeddings.json"):
+        _, _, matrix = load_embedding_matrix(path)
+    assert not isinstance(matrix, np.memmap) and matrix[0].tolist() == [9.0, 9.0, 9.0]
+    with pytest.warns(UserWarning, match="reading the JSON instead"):
+        assert VectorIndex.load(path)._raw[0].tolist() == [9.0, 9.0, 9.0]
+
+    assert remove_binary_store(path) == list(store_paths(path))
+    assert not any(p.exists() for p in store_paths(path)) and remove_binary_store(path) == []
+
+
+def test_int8_quantization_preserves_top_k(tmp_path):
+    """🧪 Featherweight crystals keep nearly the same constellations — and report it."""
+    from rag_ingest.quantize import export_paths, int8_scores, quantize_int8, write_quantized_exports
+
+    rng = np.random.default_rng(7)
+    matrix = rng.normal(size=(200, 32)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    codes, scales = quantize_int8(matrix)
+    assert codes.dtype == np.int8 and scales.shape == (32,)
+    np.testing.assert_allclose(int8_scores(codes, scales, matrix[:5]), matrix[:5] @ matrix.T, atol=0.05)
+
+    report = write_quantized_exports(tmp_path / "embeddings.json", matrix, matrix[:20], k=10)
+    assert report["formats"]["float16"]["compression"] == 2.0
+    assert report["formats"]["int8"]["mean_overlap"] >= 0.9
+    assert all(path.exists() for path in export_paths(tmp_path / "embeddings.json").values())
@@ -0,0 +1,73 @@
+"""
+🧪 Tests for the Run Ledger — stage clocks, latency percentiles, metrics files.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.telemetry import RunTelemetry, estimate_cost, latency_summary, metrics_path  # noqa: E402
+
+
+class FakeClock:
+    """⏰ Advances only when told to."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_nested_stages_are_charged_exclusively():
+    """🧪 Time inside a nested stage is not charged to its parent too."""
+    clock = FakeClock()
+    telemetry = RunTelemetry("test", model="text-embedding-3-small", clock=clock)
+
+    def pages():
+        for _ in range(3):
+            clock.now += 1.0  # 🌙 each page takes a second to extract
+            yield "page"
+
+    with telemetry.stage("chunk"):
+        for _ in telemetry.timed("extract", pages()):
+            clock.now += 0.5
+    with telemetry.stage("embed"):
+        clock.now += 2.0
+
+    assert telemetry.stages == {"chunk": 1.5, "extract": 3.0, "embed": 2.0}
+    assert telemetry.report()["wall_seconds"] == 6.5
+
+
+def test_latency_summary_percentiles_and_histogram():
+    """🧪 Percentiles come out in milliseconds and every latency lands in one bucket."""
+    summary = latency_summary([i / 1000 for i in range(1, 101)])  # 1..100 ms
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 50.5 and summary["max_ms"] == 100.0
+    assert summary["histogram_ms"]["<=25"] == 25
+    assert summary["histogram_ms"]["<=100"] == 50
+    assert sum(summary["histogram_ms"].values()) == 100
+    assert latency_summary([]) == {"count": 0}
+
+
+def test_write_puts_metrics_beside_output_and_appends_history(tmp_path):
+    """🧪 `embeddings.json` gets `embeddings.metrics.json`, and history grows one line per run."""
+    output = tmp_path / "out" / "embeddings.json"
+    for _ in range(2):
+        telemetry = RunTelemetry("ingest", model="text-embedding-3-small", config={"dims": 256})
+        telemetry.requests.record(0.2, tokens=500_000, inputs=10)  # 🌙 counts the request too
+        path = telemetry.write(output, history_dir=tmp_path / "history", chunks={"written": 10})
+
+    assert path == metrics_path(output) == tmp_path / "out" / "embeddings.metrics.json"
+    report = json.loads(path.read_text())
+    assert report["config"] == {"model": "text-embedding-3-small", "dims": 256}
+    assert report["tokens"] == {"sent": 500_000, "inputs": 10}
+    assert report["cost"]["estimated_usd"] == estimate_cost("text-embedding-3-small", 500_000) == 0.01
+    assert len((tmp_path / "history" / "ingest.jsonl").read_text().splitlines()) == 2
+    assert estimate_cost("mystery-model", 1000) is None
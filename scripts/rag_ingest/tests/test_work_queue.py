@@ -0,0 +1,116 @@
+"""
+🧪 Tests for the Dispatch Board — leases expire, first commit wins, nothing is lost.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest import work_queue  # noqa: E402
+from rag_ingest.async_embed import AsyncEmbedStats, RetryPolicy  # noqa: E402
+from rag_ingest.providers import make_provider  # noqa: E402
+from rag_ingest.work_queue import WorkQueue, embed_via_queue  # noqa: E402
+
+MODEL = "text-embedding-3-small"
+CONFIG = {"model": MODEL, "dimensions": 64, "provider": "local"}
+TEXTS = [f"Chunk {n}: anger is a demand that the world obey our wishes." for n in range(10)]
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_expired_lease_is_reissued_and_the_first_commit_wins(tmp_path):
+    clock = Clock()
+    queue = WorkQueue(tmp_path / "q.sqlite", lease_seconds=60, clock=clock)
+    queue.submit(TEXTS[:2], config=CONFIG, max_items=2)
+
+    crashed = queue.lease("worker-a")
+    assert queue.lease("worker-b") is None  # 🌙 the only job is signed out
+    clock.now += 61
+    rescued = queue.lease("worker-b")
+    assert (rescued.job_id, rescued.texts, rescued.attempt) == (crashed.job_id, TEXTS[:2], 2)
+
+    assert queue.complete(rescued, [[1.0, 0.0], [0.0, 1.0]])
+    assert not queue.complete(crashed, [[9.0, 9.0], [9.0, 9.0]])  # 🌙 back from the dead, too late
+    assert not queue.fail(crashed, ConnectionError("reset"))  # 🌙 and its failure no longer counts either
+    assert list(queue.vectors(rescued.hashes).values()) == [[1.0, 0.0], [0.0, 1.0]]
+    progress = queue.progress()
+    assert (progress.done, progress.reissued, progress.workers) == (1, 1, {"worker-b": 1})
+    assert queue.drained()
+    queue.close()
+
+    hung = WorkQueue(tmp_path / "hung.sqlite", lease_seconds=60, retry=RetryPolicy(max_attempts=2), clock=clock)
+    hashes = hung.submit(TEXTS[:1], config=CONFIG)
+    for _ in range(2):
+        assert hung.lease("sleepy") is not None
+        clock.now += 61
+    assert hung.lease("sleepy") is None and hung.drained()  # 🌙 hung past its last lease: given up on
+    assert "lease expired after 2 attempts" in hung.failures(hashes)[0][1]
+    hung.close()
+
+
+def test_submit_dedups_by_content_checks_config_and_retries_with_backoff(tmp_path):
+    clock = Clock()
+    queue = WorkQueue(tmp_path / "q.sqlite", retry=RetryPolicy(max_attempts=2), clock=clock)
+    hashes = queue.submit(TEXTS[:3] + TEXTS[:1], config=CONFIG, max_items=2)
+    queue.submit(TEXTS[:3], config=CONFIG, max_items=2)
+    assert hashes[0] == hashes[3] and queue.progress().total == 2  # 🌙 queued once, however often submitted
+    with pytest.raises(ValueError, match="another queue file"):
+        queue.submit(TEXTS, config={**CONFIG, "dimensions": 128})
+
+    lease = queue.lease("w")
+    assert queue.fail(lease, ConnectionError("reset"))  # 🌙 retryable: back on the board, after a backoff
+    assert queue.lease("w").job_id != lease.job_id
+    clock.now += RetryPolicy().max_delay
+    retried = queue.lease("w")
+    assert retried.job_id == lease.job_id and not queue.fail(retried, ConnectionError("reset"))  # 🌙 out of attempts
+    assert [job_id for job_id, _ in queue.failures(hashes)] == [lease.job_id]
+
+    queue.submit(TEXTS[:1], config=CONFIG)  # 🌙 a rerun re-arms what was given up on
+    assert queue.failures(hashes) == [] and queue.lease("w").job_id == lease.job_id
+    queue.close()
+
+
+def test_workers_rescue_a_crashed_workers_job_and_the_coordinator_collects_everything(tmp_path):
+    path = tmp_path / "q.sqlite"
+    with WorkQueue(path, lease_seconds=0.5) as queue:
+        queue.submit(TEXTS, config=CONFIG, max_items=3)
+        assert queue.lease("crashed-worker") is not None  # 🌙 signs for a job and is never heard from again
+
+    landed, stats = {}, AsyncEmbedStats()
+    streamed = embed_via_queue(TEXTS, config=CONFIG, path=path, workers=2, lease_seconds=0.5, max_items=3,
+                               stats=stats, on_result=landed.__setitem__)
+
+    client = make_provider("local").client()
+    expected = [d.embedding for d in client.embeddings.create(input=TEXTS, model=MODEL, dimensions=64).data]
+    assert streamed is None and np.allclose([landed[i] for i in range(len(TEXTS))], expected)
+    assert np.allclose(embed_via_queue(TEXTS, config=CONFIG, path=path, workers=0), expected)  # 🌙 all in the queue
+    with WorkQueue(path) as queue:
+        progress = queue.progress()
+    assert (progress.done, progress.reissued) == (4, 1)
+    assert stats.requests == 5 and stats.inputs == len(TEXTS)  # 🌙 the crashed attempt counts too
+
+
+def test_coordinator_raises_instead_of_hanging_when_its_workers_crash(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with pytest.raises(RuntimeError, match="given up on"):  # 🌙 the client cannot even be built: job failed, not stuck
+        embed_via_queue(TEXTS[:2], config={**CONFIG, "provider": "openai"}, path=tmp_path / "nokey.sqlite", workers=2)
+
+    monkeypatch.setattr(work_queue, "embed_batch", lambda *args, **kwargs: os._exit(3))  # 🌙 dies holding a lease
+    with pytest.raises(RuntimeError, match=r"all 2 local workers exited \(exit codes \[3\]\)"):
+        embed_via_queue(TEXTS[:2], config=CONFIG, path=tmp_path / "crash.sqlite", workers=2, lease_seconds=0.5)
+    with WorkQueue(tmp_path / "crash.sqlite") as queue:
+        assert queue.progress().leased == 1  # 🌙 a rerun's workers pick it up once the lease expires
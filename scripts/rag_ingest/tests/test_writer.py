@@ -0,0 +1,70 @@
+"""
+🧪 Tests for the Streaming Scribe — streamed ink must read like the bulk-printed scroll.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 🎨 Make the package importable when running from the repo root
+PKG_PARENT = Path(__file__).resolve().parents[2]  # .../scripts
+if str(PKG_PARENT) not in sys.path:
+    sys.path.insert(0, str(PKG_PARENT))
+
+from rag_ingest.writer import ReorderBuffer, StreamingEmbeddingsWriter  # noqa: E402
+
+CHUNKS = [
+    {"id": "chunk_1", "text": "Anger\nline two", "embedding": [0.1, -0.2], "metadata": {"tags": []}},
+    {"id": "chunk_2", "text": "Guilt ✨", "embedding": [0.3, 0.4], "metadata": {"tags": ["x"]}},
+]
+
+
+def test_streamed_output_matches_bulk_dump_in_every_destination(tmp_path):
+    """🧪 Same bytes as json.dump(indent=2) (summary keys last), teed to all targets."""
+    targets = [tmp_path / "shared" / "embeddings.json", tmp_path / "v0" / "embeddings.json"]
+    header = {"version": "3.0", "dimensions": 2}
+    footer = {"total_chunks": 2, "metadata": {"blocks": ["Anger"]}}
+
+    with StreamingEmbeddingsWriter(targets, header) as writer:
+        for chunk in CHUNKS:
+            writer.write_chunk(chunk)
+        writer.close(footer)
+
+    expected = json.dumps({**header, "chunks": CHUNKS, **footer}, indent=2)
+    assert [t.read_text() for t in targets] == [expected, expected]
+    assert sorted(p.name for p in targets[0].parent.iterdir()) == ["embeddings.json"]
+
+
+def test_empty_stream_is_valid_json(tmp_path):
+    """🧪 Zero chunks still seal into a parseable scroll."""
+    with StreamingEmbeddingsWriter([tmp_path / "e.json"], {"version": "3.0"}) as writer:
+        writer.close({"total_chunks": 0})
+    assert json.loads((tmp_path / "e.json").read_text()) == {"version": "3.0", "chunks": [], "total_chunks": 0}
+
+
+def test_failed_stream_leaves_previous_output_untouched(tmp_path):
+    """🧪 A crash mid-stream never half-writes the file a dev server is reading."""
+    target = tmp_path / "embeddings.json"
+    target.write_text('{"old": true}')
+
+    with pytest.raises(RuntimeError):
+        with StreamingEmbeddingsWriter([target], {"version": "3.0"}) as writer:
+            writer.write_chunk(CHUNKS[0])
+            raise RuntimeError("network blip")
+
+    assert target.read_text() == '{"old": true}'
+    assert [p.name for p in tmp_path.iterdir()] == ["embeddings.json"]
+
+
+def test_reorder_buffer_emits_in_position_order():
+    """🧪 Stragglers wait; everything else flows the moment its turn comes."""
+    emitted = []
+    buffer = ReorderBuffer(lambda position, value: emitted.append((position, value)))
+
+    buffer.put(2, "c")
+    buffer.put(0, "a")
+    assert emitted == [(0, "a")] and buffer.pending == 1
+    buffer.put(1, "b")
+    assert emitted == [(0, "a"), (1, "b"), (2, "c")] and buffer.pending == 0
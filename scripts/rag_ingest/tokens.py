@@ -0,0 +1,142 @@
+"""
+🔢 The Token Abacus — Counting What the Model Will Actually Count ✨
+
+"Four characters to a token is a proverb;
+ the tokenizer's own ledger is the truth."
+
+Local tokenization for chunking and request sizing. `get_tokenizer()`
+returns a tiktoken encoding (exact counts) when it can be loaded; tiktoken
+downloads encodings on first use, so offline machines fall back to a
+regex imitation of the same pre-tokenizer (`tokenizer.name` says which
+one is in use). Its spans are only approximate, but its count is the text's
+UTF-8 byte length: every cl100k token covers at least one byte, so the
+fallback may overcount (smaller batches, more parts) but never sends an
+input over the model's limit.
+
+Both expose `spans(text)` — (start, end) character offsets of each token —
+and `count(text)`. `split_by_tokens()` cuts a text that is over an input
+limit into consecutive pieces, each within the limit, at word boundaries
+where possible.
+
+ - The Cosmic Abacus Keeper
+"""
+
+from __future__ import annotations
+
+import re
+import warnings
+from functools import lru_cache
+from typing import Protocol
+
+DEFAULT_ENCODING = "cl100k_base"  # 🌟 the text-embedding-3 family's encoding
+
+# 🧩 cl100k-style pre-tokenizer pieces (contractions, words, 1-3 digit runs,
+#    punctuation runs, whitespace); long runs are then cut into sub-word pieces
+_PIECE = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)|[^\r\n\w]?[^\W\d_]+|\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+",
+    re.IGNORECASE,
+)
+_SUBWORD = 6  # 🌙 BPE keeps common words whole; longer runs split roughly this often
+
+
+class Tokenizer(Protocol):
+    """🧮 What chunkers and batch packers need from a tokenizer."""
+    name: str
+
+    def spans(self, text: str) -> list[tuple[int, int]]: ...
+
+    def count(self, text: str) -> int: ...
+
+
+class TiktokenTokenizer:
+    """🎯 Exact token counts from a tiktoken encoding."""
+
+    def __init__(self, encoding) -> None:
+        self._encoding = encoding
+        self.name = f"tiktoken:{encoding.name}"
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        tokens = self._encoding.encode(text, disallowed_special=())
+        _, starts = self._encoding.decode_with_offsets(tokens)
+        return list(zip(starts, [*starts[1:], len(text)]))
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+class RegexTokenizer:
+    """🪄 Offline fallback: cl100k-style pieces (long runs split every few characters), UTF-8 bytes as the count."""
+
+    name = "regex-utf8-bound"
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        spans = []
+        for match in _PIECE.finditer(text):
+            start, end = match.span()
+            while end - start > _SUBWORD + 2 and not text[start:end].isspace():
+                spans.append((start, start + _SUBWORD))
+                start += _SUBWORD
+            spans.append((start, end))
+        return spans
+
+    def count(self, text: str) -> int:
+        return len(text.encode("utf-8"))  # 🌙 an upper bound on cl100k tokens, never an underestimate
+
+
+def get_tokenizer(encoding: str = DEFAULT_ENCODING) -> Tokenizer:
+    """🔮 tiktoken's `encoding` if it can be loaded, else the regex approximation (warns once)."""
+    return _load_tokenizer(encoding)
+
+
+@lru_cache(maxsize=None)
+def _load_tokenizer(encoding: str) -> Tokenizer:
+    try:
+        import tiktoken
+
+        return TiktokenTokenizer(tiktoken.get_encoding(encoding))
+    except Exception as exc:  # 🌙 not installed, or the encoding can't be downloaded
+        warnings.warn(f"tiktoken encoding {encoding!r} unavailable ({type(exc).__name__}); "
+                      f"using approximate token counts", stacklevel=3)
+        return RegexTokenizer()
+
+
+def count_tokens(text: str) -> int:
+    """🧮 Tokens in `text` by the default tokenizer — what batch packing and input guards use."""
+    return get_tokenizer().count(text)
+
+
+def split_by_tokens(text: str, max_tokens: int, tokenizer: Tokenizer | None = None) -> list[str]:
+    """
+    ✂️ Cut `text` into the fewest near-equal pieces of at most `max_tokens` tokens
+
+    The pieces concatenate back to `text`. Each cut moves back to the nearest
+    token that starts with whitespace, so words stay whole, unless that would
+    shrink the piece below half its share. Pieces are sized by
+    `tokenizer.count`, so they fit even when it counts more than one per span.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be positive")
+    tokenizer = tokenizer or get_tokenizer()
+    count = tokenizer.count(text)
+    if count <= max_tokens:
+        return [text]
+    spans = tokenizer.spans(text)
+    if len(spans) <= 1:
+        return [text]  # 🌙 one indivisible token; nothing more to cut
+    budget = max(1, min(max_tokens, max_tokens * len(spans) // count))  # 🌙 spans per piece
+
+    pieces, first = [], 0
+    while len(spans) - first > budget:
+        remaining = -(-(len(spans) - first) // budget)  # 🌙 pieces still needed, rounded up
+        share = -(-(len(spans) - first) // remaining)
+        cut = first + share
+        for candidate in range(cut, first + share // 2, -1):
+            if text[spans[candidate][0]].isspace():
+                cut = candidate
+                break
+        pieces.append(text[spans[first][0]:spans[cut][0]])
+        first = cut
+    pieces.append(text[spans[first][0]:])
+    pieces[0] = text[:spans[0][0]] + pieces[0]  # 🌙 keep any text before the first token
+    return [part for piece in pieces for part in  # 🌙 a piece denser than average is cut again
+            (split_by_tokens(piece, max_tokens, tokenizer) if tokenizer.count(piece) > max_tokens else [piece])]
@@ -0,0 +1,519 @@
+"""
+🗂️ The Dispatch Board — Errands on the Wall, Any Free Hand Takes One ✨
+
+"Pin every errand to the board. Whoever is free signs for one;
+ an errand whose runner never returns goes back on the board."
+
+A durable, SQLite-backed work queue for embedding requests, so one re-embed
+can be spread over many worker processes — on one machine, or on several
+that share the filesystem (the queue file needs working file locks: a local
+disk, or a network filesystem that honors them).
+
+    coordinator  submits chunk texts, packed into jobs of one request each,
+                 then streams the vectors back as jobs complete and writes
+                 the index. Items are keyed by text hash, so a text already
+                 queued (by this run or another coordinator) is not queued twice.
+    workers      lease a job, embed it, commit the vectors, and repeat until
+                 nothing is left to do
+
+A lease lasts `lease_seconds`. A job whose worker crashed or hung past its
+lease is re-issued to the next worker that asks; should the first worker
+commit after all, the first commit wins. A failed request goes back on the
+board after the `RetryPolicy` backoff (honoring Retry-After) and is given up
+after `max_attempts`. The queue outlives the run, so a coordinator that is
+interrupted picks up wherever the workers got to.
+
+    python scripts/ingest_pdf_rag.py --queue --queue-workers 4    # coordinator + 4 local workers
+    cd scripts && python -m rag_ingest.work_queue work            # one more worker, from any machine
+    cd scripts && python -m rag_ingest.work_queue status
+
+ - The Cosmic Dispatcher
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from .async_embed import AsyncEmbedStats, RetryPolicy, classify_error
+from .batching import DEFAULT_BATCH_ITEMS, DEFAULT_BATCH_TOKENS, embed_batch, pack_batches
+from .cache import PROJECT_ROOT, text_hash
+from .providers import make_provider
+
+DEFAULT_QUEUE_PATH = Path(os.getenv("EMBEDDING_QUEUE_PATH", PROJECT_ROOT / ".cache" / "queue" / "embedding_queue.sqlite"))
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_QUEUE_WORKERS = 4
+
+# 🌙 How often idle workers and the waiting coordinator look at the board again
+_POLL_SECONDS = 0.5
+# 🌙 SQLite's default limit on bound parameters is 999; stay well under it
+_IN_CHUNK = 500
+
+
+@dataclass
+class Lease:
+    """📝 One job signed out to one worker: the texts to embed and the token that proves the lease."""
+    job_id: int
+    token: str
+    hashes: list[str]
+    texts: list[str]
+    attempt: int
+
+
+@dataclass
+class QueueProgress:
+    """📊 Jobs by state, how many were re-issued after a lease expired, and who did the work."""
+    pending: int = 0
+    leased: int = 0
+    done: int = 0
+    failed: int = 0
+    reissued: int = 0
+    workers: dict[str, int] = field(default_factory=dict)  # 🌙 jobs done per worker
+
+    @property
+    def total(self) -> int:
+        return self.pending + self.leased + self.done + self.failed
+
+    def summary(self) -> str:
+        """📋 One line for the run log."""
+        return (f"🗂️ Queue: {self.done}/{self.total} jobs done, {self.leased} leased, {self.pending} pending, "
+                f"{self.failed} failed ({self.reissued} re-issued after lease expiry; {len(self.workers)} workers)")
+
+
+def _chunks(values: Sequence[Any], size: int = _IN_CHUNK) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class WorkQueue:
+    """
+    🗂️ SQLite-backed embedding job queue
+
+    Usage:
+        with WorkQueue(path) as queue:
+            hashes = queue.submit(texts, config={"model": ..., "dimensions": ..., "provider": ...})
+            lease = queue.lease("worker-1")             # a worker, anywhere
+            queue.complete(lease, vectors)              # ... or queue.fail(lease, error)
+            vectors = queue.vectors(hashes)             # the coordinator, as jobs land
+
+    One queue serves one embedding configuration (model, dimensions,
+    provider); submitting texts for another raises ValueError.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = DEFAULT_QUEUE_PATH,
+        *,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        retry: Optional[RetryPolicy] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.retry = retry or RetryPolicy()
+        self._clock = clock  # 🌙 wall clock: leases are compared across processes and machines
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)  # 🌙 explicit transactions
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS config (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                state TEXT NOT NULL DEFAULT 'pending',
+                due REAL NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_token TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                reissued INTEGER NOT NULL DEFAULT 0,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                seconds REAL,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                text_sha256 TEXT PRIMARY KEY,
+                job_id INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                vector BLOB
+            );
+            CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, due);
+            CREATE INDEX IF NOT EXISTS items_by_job ON items (job_id);
+            """
+        )
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """🔒 BEGIN IMMEDIATE: take the write lock up front, so two workers can never sign for one job."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    # ──────────────────────────────────────────────────────────────────────
+    # 📥 The coordinator's side
+    # ──────────────────────────────────────────────────────────────────────
+
+    @property
+    def config(self) -> Optional[dict[str, Any]]:
+        """🎛️ The embedding configuration this queue serves (None until something is submitted)."""
+        row = self._conn.execute("SELECT value FROM config WHERE key = 'embedding'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def submit(
+        self,
+        texts: Sequence[str],
+        *,
+        config: dict[str, Any],
+        max_items: int = DEFAULT_BATCH_ITEMS,
+        max_tokens: int = DEFAULT_BATCH_TOKENS,
+    ) -> list[str]:
+        """
+        📥 Queue every text not queued yet, packed into jobs of one request each
+
+        Returns each text's hash, in order. Jobs that had failed for good and
+        hold any of these texts are re-armed, so a rerun retries them.
+        """
+        hashes = [text_hash(text) for text in texts]
+        with self._transaction() as conn:
+            current = self.config
+            if current is None:
+                conn.execute("INSERT INTO config (key, value) VALUES ('embedding', ?)", (json.dumps(config),))
+            elif current != config:
+                raise ValueError(f"{self.path} queues embeddings for {current}, not {config}; "
+                                 f"use another queue file (or delete this one)")
+
+            queued: set[str] = set()
+            for chunk in _chunks(list(dict.fromkeys(hashes))):
+                marks = ",".join("?" * len(chunk))
+                queued.update(h for (h,) in conn.execute(
+                    f"SELECT text_sha256 FROM items WHERE text_sha256 IN ({marks})", chunk))
+                conn.execute(
+                    f"UPDATE jobs SET state = 'pending', due = 0, attempts = 0, error = NULL WHERE state = 'failed' "
+                    f"AND job_id IN (SELECT job_id FROM items WHERE text_sha256 IN ({marks}))", chunk)
+
+            fresh = {h: text for h, text in zip(hashes, texts) if h not in queued}
+            for batch in pack_batches(fresh.items(), max_items=max_items, max_tokens=max_tokens):
+                job_id = conn.execute("INSERT INTO jobs (tokens) VALUES (?)", (batch.tokens,)).lastrowid
+                conn.executemany("INSERT INTO items (text_sha256, job_id, text) VALUES (?, ?, ?)",
+                                 [(h, job_id, text) for h, text in zip(batch.ids, batch.texts)])
+        return hashes
+
+    def vectors(self, hashes: Sequence[str]) -> dict[str, list[float]]:
+        """🔮 The vectors already committed for any of `hashes`."""
+        found = {}
+        for chunk in _chunks(list(hashes)):
+            rows = self._conn.execute(
+                f"SELECT text_sha256, vector FROM items WHERE vector IS NOT NULL "
+                f"AND text_sha256 IN ({','.join('?' * len(chunk))})", chunk)
+            found.update((h, array("d", blob).tolist()) for h, blob in rows)
+        return found
+
+    def failures(self, hashes: Sequence[str]) -> list[tuple[int, str]]:
+        """💥 (job id, last error) of every job holding one of `hashes` that was given up on."""
+        failed = {}
+        for chunk in _chunks(list(hashes)):
+            failed.update(self._conn.execute(
+                f"SELECT DISTINCT jobs.job_id, jobs.error FROM jobs JOIN items USING (job_id) "
+                f"WHERE jobs.state = 'failed' AND items.text_sha256 IN ({','.join('?' * len(chunk))})", chunk))
+        return sorted(failed.items())
+
+    def job_stats(self, hashes: Sequence[str]) -> dict[int, tuple[int, int, float, int]]:
+        """📈 {job id: (attempts, tokens, seconds, items)} of every finished job holding one of `hashes`."""
+        jobs = {}
+        for chunk in _chunks(list(hashes)):
+            jobs.update((row[0], row[1:]) for row in self._conn.execute(
+                f"SELECT jobs.job_id, attempts, tokens, seconds, "
+                f"(SELECT COUNT(*) FROM items AS own WHERE own.job_id = jobs.job_id) "
+                f"FROM jobs JOIN items USING (job_id) "
+                f"WHERE jobs.state = 'done' AND items.text_sha256 IN ({','.join('?' * len(chunk))})", chunk))
+        return jobs
+
+    # ──────────────────────────────────────────────────────────────────────
+    # 🛠️ The workers' side
+    # ──────────────────────────────────────────────────────────────────────
+
+    def lease(self, worker: str) -> Optional[Lease]:
+        """
+        📝 Sign out the oldest job that is due — pending, or leased by a worker whose lease expired
+
+        An expired job that has already used the policy's `max_attempts` is
+        given up on instead, so a job that always hangs cannot circulate forever.
+        """
+        now = self._clock()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'failed', lease_token = NULL, due = 0, "
+                "error = 'lease expired after ' || attempts || ' attempts' "
+                "WHERE state = 'leased' AND due <= ? AND attempts >= ?", (now, self.retry.max_attempts))
+            row = conn.execute(
+                "SELECT job_id, state, attempts FROM jobs WHERE state IN ('pending', 'leased') AND due <= ? "
+                "ORDER BY job_id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            job_id, state, attempts = row
+            token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE jobs SET state = 'leased', due = ?, worker = ?, lease_token = ?, attempts = attempts + 1, "
+                "reissued = reissued + ? WHERE job_id = ?",
+                (now + self.lease_seconds, worker, token, int(state == "leased"), job_id))
+            items = conn.execute("SELECT text_sha256, text FROM items WHERE job_id = ? ORDER BY rowid",
+                                 (job_id,)).fetchall()
+        return Lease(job_id, token, [h for h, _ in items], [text for _, text in items], attempts + 1)
+
+    def complete(self, lease: Lease, vectors: Sequence[Sequence[float]], *, seconds: Optional[float] = None) -> bool:
+        """✅ Commit a job's vectors. False when another worker already finished it (its vectors stand)."""
+        if len(vectors) != len(lease.hashes):
+            raise ValueError(f"job {lease.job_id} has {len(lease.hashes)} texts, got {len(vectors)} vectors")
+        with self._transaction() as conn:
+            (state,) = conn.execute("SELECT state FROM jobs WHERE job_id = ?", (lease.job_id,)).fetchone()
+            if state == "done":
+                return False
+            conn.executemany("UPDATE items SET vector = ? WHERE text_sha256 = ?",
+                             [(array("d", vector).tobytes(), h) for h, vector in zip(lease.hashes, vectors)])
+            conn.execute("UPDATE jobs SET state = 'done', lease_token = NULL, error = NULL, seconds = ? "
+                         "WHERE job_id = ?", (seconds, lease.job_id))
+        return True
+
+    def fail(self, lease: Lease, error: Exception) -> bool:
+        """
+        💥 Hand a failed job back: retried after the policy's backoff, given up on when it
+        is not retryable or out of attempts. True when it will be retried.
+
+        A worker that lost its lease in the meantime changes nothing (and gets False).
+        """
+        retryable, retry_after = classify_error(error)
+        retry = retryable and lease.attempt < self.retry.max_attempts
+        due = self._clock() + self.retry.delay(lease.attempt, retry_after) if retry else 0
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET state = ?, due = ?, lease_token = NULL, error = ? "
+                "WHERE job_id = ? AND lease_token = ?",
+                ("pending" if retry else "failed", due, repr(error), lease.job_id, lease.token)).rowcount
+        return retry and updated == 1
+
+    def drained(self) -> bool:
+        """🌙 Whether no job is pending or leased (everything is done or given up on)."""
+        return self._conn.execute("SELECT 1 FROM jobs WHERE state IN ('pending', 'leased') LIMIT 1").fetchone() is None
+
+    def progress(self) -> QueueProgress:
+        """📊 The whole board at a glance."""
+        progress = QueueProgress()
+        for state, count, reissued in self._conn.execute(
+                "SELECT state, COUNT(*), SUM(reissued) FROM jobs GROUP BY state"):
+            setattr(progress, state, count)
+            progress.reissued += reissued
+        progress.workers = dict(self._conn.execute(
+            "SELECT worker, COUNT(*) FROM jobs WHERE state = 'done' GROUP BY worker ORDER BY worker"))
+        return progress
+
+    def close(self) -> None:
+        """🌙 Close the connection; the queue itself stays on disk."""
+        self._conn.close()
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def default_worker_id() -> str:
+    """🏷️ host:pid — unique across the machines sharing a queue."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(
+    path: Path | str = DEFAULT_QUEUE_PATH,
+    *,
+    worker_id: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    follow: bool = False,
+    stop: Optional[Any] = None,
+) -> int:
+    """
+    🛠️ Lease, embed, commit, repeat; returns how many jobs this worker completed
+
+    Embeds with the provider, model and dimensions recorded in the queue
+    (OPENAI_API_KEY comes from this worker's environment). Stops once nothing
+    is pending or leased — a job leased by a crashed worker keeps the others
+    around until its lease expires and one of them re-runs it — or, with
+    `follow`, keeps polling for new work. `stop` (a multiprocessing Event)
+    asks it to stop between jobs.
+    """
+    worker_id = worker_id or default_worker_id()
+    client, config, completed = None, None, 0
+    with WorkQueue(path, lease_seconds=lease_seconds) as queue:
+        while not (stop is not None and stop.is_set()):
+            lease = queue.lease(worker_id)
+            if lease is None:
+                if not follow and queue.drained():
+                    break
+                time.sleep(_POLL_SECONDS)
+                continue
+            started = time.perf_counter()
+            try:
+                if client is None:
+                    config = queue.config
+                    # 🌙 Retries happen through the queue, so a backoff never holds a lease
+                    client = make_provider(config["provider"]).client(max_retries=0)
+                vectors = embed_batch(client, lease.texts, model=config["model"], dimensions=config["dimensions"])
+                completed += queue.complete(lease, vectors, seconds=time.perf_counter() - started)
+            except Exception as error:  # 🌙 a missing API key too: the job is failed, not left leased
+                retried = queue.fail(lease, error)
+                print(f"💥 {worker_id}: job {lease.job_id} attempt {lease.attempt} failed ({error!r}); "
+                      f"{'will retry' if retried else 'giving up'}")
+    return completed
+
+
+def embed_via_queue(
+    texts: Sequence[str],
+    *,
+    config: dict[str, Any],
+    path: Path | str = DEFAULT_QUEUE_PATH,
+    workers: int = DEFAULT_QUEUE_WORKERS,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    max_items: int = DEFAULT_BATCH_ITEMS,
+    max_tokens: int = DEFAULT_BATCH_TOKENS,
+    stats: Optional[AsyncEmbedStats] = None,
+    on_result: Optional[Callable[[int, list[float]], None]] = None,
+) -> Optional[list[list[float]]]:
+    """
+    🧭 Coordinate: queue `texts`, start `workers` local worker processes, and collect the vectors
+
+    With `workers=0` the vectors come only from workers started elsewhere
+    (`python -m rag_ingest.work_queue work`). The returned list lines up
+    with `texts`; with `on_result`, `on_result(position, vector)` fires as
+    each job lands instead and None is returned (no vector is kept). Raises
+    RuntimeError if any job was given up on, or if every local worker has
+    exited while texts are still missing (nobody is left to re-issue an
+    expired lease). The attempts, tokens and latencies of the jobs finished
+    meanwhile are added to `stats`.
+    """
+    with WorkQueue(path, lease_seconds=lease_seconds) as queue:
+        hashes = queue.submit(texts, config=config, max_items=max_items, max_tokens=max_tokens)
+        finished_before = set(queue.job_stats(hashes))  # 🌙 done by an earlier run: no requests of ours
+    if finished_before:
+        print(f"🗂️ {len(finished_before)} jobs were already done in the queue")
+    positions: dict[str, list[int]] = {}
+    for position, h in enumerate(hashes):
+        positions.setdefault(h, []).append(position)
+
+    # 🌙 Forked after the submit connection is closed, so no worker inherits an open SQLite handle
+    stop = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(path,),
+                                kwargs={"lease_seconds": lease_seconds, "stop": stop}, daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    results: Optional[list[Optional[list[float]]]] = [None] * len(texts) if on_result is None else None
+    remaining = list(positions)
+    reported = -1
+    try:
+        with WorkQueue(path, lease_seconds=lease_seconds) as queue:
+            while remaining:
+                # 🌙 Checked before reading, so a worker's last commit is always seen before we give up on it
+                workers_gone = bool(processes) and all(process.exitcode is not None for process in processes)
+                landed = queue.vectors(remaining)
+                for h, vector in landed.items():
+                    for position in positions[h]:
+                        if results is not None:
+                            results[position] = vector
+                        else:
+                            on_result(position, vector)
+                remaining = [h for h in remaining if h not in landed]
+                if not remaining:
+                    break
+                failed = queue.failures(remaining)
+                if failed:
+                    job_id, error = failed[0]
+                    raise RuntimeError(f"{len(failed)} queued jobs were given up on (job {job_id}: {error}); "
+                                       f"rerun to retry them")
+                if workers_gone:
+                    codes = sorted({process.exitcode for process in processes})
+                    raise RuntimeError(f"all {len(processes)} local workers exited (exit codes {codes}) with "
+                                       f"{len(remaining)} texts still unembedded; rerun to retry them")
+                if len(remaining) != reported:
+                    reported = len(remaining)
+                    progress = queue.progress()
+                    print(f"🗂️ {len(positions) - len(remaining)}/{len(positions)} texts embedded "
+                          f"({progress.done}/{progress.total} jobs done, {progress.leased} leased)")
+                time.sleep(_POLL_SECONDS)
+
+            if stats is not None:
+                for job_id, (attempts, tokens, seconds, items) in queue.job_stats(list(positions)).items():
+                    if job_id in finished_before:
+                        continue
+                    stats.requests += attempts - 1  # 🌙 the failed attempts; record() counts the one that landed
+                    stats.retries += attempts - 1
+                    stats.record(seconds or 0.0, tokens, items)
+            print(queue.progress().summary())
+    finally:
+        stop.set()  # 🌙 local workers finish the job in hand, then leave
+        for process in processes:
+            process.join()
+    return results  # type: ignore[return-value]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """🚀 Run a worker, or show the board, from the command line."""
+    parser = argparse.ArgumentParser(description="Durable embedding work queue: workers and status")
+    parser.add_argument("command", choices=("work", "status"))
+    parser.add_argument("--queue", type=Path, default=DEFAULT_QUEUE_PATH,
+                        help=f"queue file (default {DEFAULT_QUEUE_PATH})")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to run here (default 1)")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help=f"re-issue a job whose worker has not committed after this long "
+                             f"(default {DEFAULT_LEASE_SECONDS:g})")
+    parser.add_argument("--follow", action="store_true", help="keep waiting for new jobs instead of exiting when drained")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        if not args.queue.exists():
+            print(f"🗂️ No queue at {args.queue}")
+            return
+        with WorkQueue(args.queue) as queue:
+            progress = queue.progress()
+            print(f"🎛️ {queue.config}")
+        print(progress.summary())
+        for worker, jobs in progress.workers.items():
+            print(f"   {worker}: {jobs} jobs")
+        return
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    kwargs = {"lease_seconds": args.lease_seconds, "follow": args.follow}
+    if args.workers == 1:
+        print(f"🛠️ {default_worker_id()} completed {run_worker(args.queue, **kwargs)} jobs")
+        return
+    processes = [multiprocessing.Process(target=run_worker, args=(args.queue,), kwargs=kwargs)
+                 for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    print(f"🛠️ {args.workers} workers finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+🌊 The Streaming Scribe — Ink Hits the Page as Each Vector Lands ✨
+
+"Why hoard a thousand scrolls in the study
+ when each can be shelved the moment its ink is dry?"
+
+Writes an `embeddings.json` incrementally: the header goes out first, each
+chunk is appended as soon as it is ready, and the summary keys
+(`total_chunks`, `chapters`, ...) follow the chunk list at the end. Every
+piece is serialized once and teed to all destinations (the shared output
+plus each variant copy) through temp files that are atomically renamed into
+place on success — a crash leaves the previous files untouched.
+
+The layout matches `json.dump(..., indent=2)` except that the summary keys
+come after `chunks`; key order is irrelevant to JSON consumers.
+
+ - The Cosmic Streaming Scribe
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import textwrap
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+INDENT = 2
+
+
+def temp_path_for(path: Path) -> Path:
+    """🌙 Sibling temp path, so the final rename never crosses filesystems."""
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+def atomic_replace(temp_path: Path, final_path: Path) -> None:
+    """🔒 Flush temp file contents to disk and rename over the destination."""
+    with open(temp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, final_path)
+
+
+class StreamingEmbeddingsWriter:
+    """
+    📜 Tee-writing, atomically-committed embeddings.json
+
+    Usage:
+        with StreamingEmbeddingsWriter([output, *variants], {"version": "3.0", ...}) as writer:
+            for chunk in chunks:
+                writer.write_chunk(chunk)
+            writer.close({"total_chunks": n, "chapters": [...], "metadata": {...}})
+
+    Leaving the block with an exception (or without calling `close`) aborts:
+    temp files are removed and existing outputs stay as they were.
+    """
+
+    def __init__(self, paths: Sequence[Path | str], header: dict[str, Any]) -> None:
+        self.paths = [Path(p) for p in paths]
+        self.count = 0
+        self._closed = False
+        self._digest = hashlib.sha256()
+        self._files = []
+        for path in self.paths:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._files.append(open(temp_path_for(path), "wb"))
+
+        opening = "{\n" + "".join(self._entry(key, value) + ",\n" for key, value in header.items())
+        self._write(opening + ' ' * INDENT + '"chunks": [')
+
+    @staticmethod
+    def _entry(key: str, value: Any) -> str:
+        body = json.dumps(value, indent=INDENT)
+        return textwrap.indent(f"{json.dumps(key)}: {body}", " " * INDENT)
+
+    def _write(self, text: str) -> None:
+        data = text.encode("utf-8")  # 🌟 serialized once, teed to every destination
+        self._digest.update(data)
+        for f in self._files:
+            f.write(data)
+
+    def write_chunk(self, chunk: dict[str, Any]) -> None:
+        """💎 Append one chunk to the `chunks` array."""
+        body = textwrap.indent(json.dumps(chunk, indent=INDENT), " " * (INDENT * 2))
+        self._write(("," if self.count else "") + "\n" + body)
+        self.count += 1
+
+    def close(self, footer: dict[str, Any]) -> None:
+        """🎉 Write the summary keys, then atomically publish every destination."""
+        closing = ("\n" + " " * INDENT if self.count else "") + "]"
+        for key, value in footer.items():
+            closing += ",\n" + self._entry(key, value)
+        self._write(closing + "\n}")
+
+        for f in self._files:
+            f.close()
+        for path in self.paths:
+            atomic_replace(temp_path_for(path), path)
+        self._closed = True
+
+    @property
+    def sha256(self) -> str:
+        """🔑 sha256 of the bytes written so far — after `close`, of the whole JSON."""
+        return self._digest.hexdigest()
+
+    def abort(self) -> None:
+        """🌙 Drop every temp file; the previous outputs are left untouched."""
+        for f in self._files:
+            f.close()
+        for path in self.paths:
+            temp_path_for(path).unlink(missing_ok=True)
+        self._closed = True
+
+    def __enter__(self) -> "StreamingEmbeddingsWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self._closed:
+            self.abort()
+
+
+class ReorderBuffer:
+    """
+    🧵 Re-sequences out-of-order results
+
+    `put(position, value)` may be called in any order; `emit(position, value)`
+    is called strictly in position order as soon as the next one is available,
+    so only the out-of-order stragglers are ever held in memory.
+    """
+
+    def __init__(self, emit: Callable[[int, Any], None], start: int = 0) -> None:
+        self._emit = emit
+        self.next_position = start
+        self._pending: dict[int, Any] = {}
+
+    def put(self, position: int, value: Optional[Any]) -> None:
+        self._pending[position] = value
+        while self.next_position in self._pending:
+            self._emit(self.next_position, self._pending.pop(self.next_position))
+            self.next_position += 1
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
@@ -40,6 +40,20 @@ export interface ChunkMetadata {
   related: string[];
   audience: "general" | "first_responder";
   category: string;
+  /** 📍 Page citation (PDF ingest only): pages spanned and offsets in the extracted text */
+  start_page?: number;
+  end_page?: number;
+  start_char?: number;
+  end_char?: number;
+  /** 👯 Set when ingested with `--dedup flag`: id of the earlier chunk this one nearly repeats */
+  duplicate_of?: string;
+  /** ✂️ Set on parts of a chunk too long to embed whole: the chunk's id, this part (1-based) and the part count */
+  parent_id?: string;
+  part?: number;
+  parts?: number;
+  /** 📚 Set by corpus ingest (`--corpus`): the source document's id and file name */
+  doc_id?: string;
+  source?: string;
 }
 
 /**